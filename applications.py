@@ -0,0 +1,232 @@
+from datetime import datetime
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+from cache import invalidate
+from model import Application, Professor, Project, Student
+from ranking import match_scores
+from skills import student_skill_names
+
+# Page size for the application inboxes (HTML first page and the JSON API)
+APPLICATIONS_PAGE_SIZE = 25
+APPLICATION_STATUSES = ("pending", "shortlisted", "accepted", "rejected")
+# Professor inbox orders: newest first, or best skill match first (newest
+# first between equal scores)
+APPLICATION_SORTS = ("newest", "match")
+
+CURSOR_TIME_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+# Keyset cursor over (applied_at, id), newest first: "<applied_at>-<id>" of the
+# last row already shown
+
+def encode_cursor(applied_at: datetime, application_id: int) -> str:
+    return f"{applied_at.strftime(CURSOR_TIME_FORMAT)}-{application_id}"
+
+
+def decode_cursor(cursor: str):
+    # (applied_at, id), or None for a missing or malformed cursor
+    try:
+        applied_at, application_id = cursor.split("-", 1)
+        return datetime.strptime(applied_at, CURSOR_TIME_FORMAT), int(application_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _filter(query, status: str, project_id: int):
+    if status:
+        query = query.filter(Application.status == status.lower())
+    if project_id:
+        query = query.filter(Application.project_id == project_id)
+    return query
+
+
+def _page(query, status: str, project_id: int, cursor: str, limit: int):
+    query = _filter(query, status, project_id)
+    after = decode_cursor(cursor)
+    if after:
+        applied_at, application_id = after
+        query = query.filter(or_(
+            Application.applied_at < applied_at,
+            and_(Application.applied_at == applied_at, Application.id < application_id),
+        ))
+    rows = query.order_by(Application.applied_at.desc(), Application.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].applied_at, rows[-1].id)
+    return rows, next_cursor
+
+
+# Match order cursor: "<score>_<applied_at>-<id>" of the last row shown, the
+# score rounded as on the page
+
+def _match_key(score: float, applied_at: datetime, application_id: int):
+    return round(score, 4), applied_at, application_id
+
+
+def _match_page(db: Session, professor_id: int, status: str, project_id: int, cursor: str, limit: int):
+    # Scores are not a column, so the keyset runs in Python over the ids of
+    # every matching application; the page's rows are then loaded by id.
+    # (ids, scores, next_cursor)
+    keys = _filter(
+        db.query(Application.id, Application.project_id, Application.student_id, Application.applied_at)
+        .join(Project, Application.project_id == Project.id)
+        .filter(Project.professor_id == professor_id),
+        status, project_id,
+    ).all()
+    scores = match_scores(db, {row.project_id for row in keys})
+    ordered = sorted(
+        (_match_key(scores.get((row.project_id, row.student_id), 0.0), row.applied_at or datetime.min, row.id)
+         for row in keys),
+        reverse=True,
+    )
+    try:
+        score, after = cursor.split("_", 1)
+        after = (round(float(score), 4), *decode_cursor(after))
+    except (AttributeError, TypeError, ValueError):
+        after = None
+    if after:
+        ordered = [key for key in ordered if key < after]
+    next_cursor = None
+    if len(ordered) > limit:
+        ordered = ordered[:limit]
+        score, applied_at, application_id = ordered[-1]
+        next_cursor = f"{score}_{encode_cursor(applied_at, application_id)}"
+    return [application_id for _, _, application_id in ordered], scores, next_cursor
+
+
+def professor_application_page(
+    db: Session,
+    professor_id: int,
+    status: str = None,
+    project_id: int = None,
+    cursor: str = None,
+    limit: int = APPLICATIONS_PAGE_SIZE,
+    sort: str = "newest",
+):
+    # One page of the applications received on the professor's projects, as
+    # JSON-ready dicts. Only the columns the table shows are selected; skills
+    # and match scores are looked up for this page's students only (for
+    # sort="match", for every applicant of the matching projects).
+    query = (
+        db.query(
+            Application.id,
+            Application.status,
+            Application.applied_at,
+            Application.project_id,
+            Project.title.label("project_title"),
+            Application.student_id,
+            Student.name.label("student_name"),
+        )
+        .join(Project, Application.project_id == Project.id)
+        .join(Student, Application.student_id == Student.id)
+        .filter(Project.professor_id == professor_id)
+    )
+    if sort == "match":
+        ids, scores, next_cursor = _match_page(db, professor_id, status, project_id, cursor, limit)
+        order = {application_id: position for position, application_id in enumerate(ids)}
+        rows = query.filter(Application.id.in_(ids)).all() if ids else []
+        rows.sort(key=lambda row: order[row.id])
+    else:
+        rows, next_cursor = _page(query, status, project_id, cursor, limit)
+        scores = match_scores(db, {row.project_id for row in rows})
+
+    skills = student_skill_names(db, {row.student_id for row in rows})
+    return [
+        {
+            "id": row.id,
+            "status": (row.status or "pending").lower(),
+            "applied_on": row.applied_at.strftime("%Y-%m-%d") if row.applied_at else None,
+            "project_id": row.project_id,
+            "project_title": row.project_title,
+            "student_id": row.student_id,
+            "student_name": row.student_name,
+            "skills": skills[row.student_id],
+            "match": round(scores.get((row.project_id, row.student_id), 0.0), 4),
+        }
+        for row in rows
+    ], next_cursor
+
+
+def student_application_page(
+    db: Session,
+    student_id: int,
+    status: str = None,
+    project_id: int = None,
+    cursor: str = None,
+    limit: int = APPLICATIONS_PAGE_SIZE,
+):
+    # One page of the student's own applications, as JSON-ready dicts
+    query = (
+        db.query(
+            Application.id,
+            Application.status,
+            Application.applied_at,
+            Application.project_id,
+            Project.title.label("project_title"),
+            Professor.name.label("professor_name"),
+            Professor.department.label("department"),
+        )
+        .join(Project, Application.project_id == Project.id)
+        .join(Professor, Project.professor_id == Professor.id)
+        .filter(Application.student_id == student_id)
+    )
+    rows, next_cursor = _page(query, status, project_id, cursor, limit)
+    return [
+        {
+            "id": row.id,
+            "status": (row.status or "pending").lower(),
+            "applied_on": row.applied_at.strftime("%Y-%m-%d") if row.applied_at else None,
+            "project_id": row.project_id,
+            "project_title": row.project_title,
+            "professor_name": row.professor_name,
+            "department": row.department or "",
+        }
+        for row in rows
+    ], next_cursor
+
+
+def professor_project_options(db: Session, professor_id: int):
+    # (id, title) pairs for the project filter on the applications page
+    return (
+        db.query(Project.id, Project.title)
+        .filter(Project.professor_id == professor_id)
+        .order_by(Project.created_at.desc())
+        .all()
+    )
+
+
+def update_application_statuses(db: Session, professor_id: int, application_ids, status: str):
+    # Sets the status of many applications in one UPDATE, limited to the
+    # professor's own projects. Returns {application_id: "updated" |
+    # "unchanged" | "not_found"}; ids on other professors' projects count as
+    # not found. Call before db.commit().
+    status = status.lower()
+    if status not in APPLICATION_STATUSES:
+        raise ValueError(f"Unknown application status: {status}")
+    application_ids = set(application_ids)
+    owned = (
+        db.query(Application.id, Application.student_id, Application.status)
+        .join(Project, Application.project_id == Project.id)
+        .filter(Application.id.in_(application_ids), Project.professor_id == professor_id)
+        .all()
+    )
+    changed = [row for row in owned if row.status != status]
+    if changed:
+        db.execute(
+            update(Application)
+            .where(
+                Application.id.in_([row.id for row in changed]),
+                Application.project_id.in_(select(Project.id).where(Project.professor_id == professor_id)),
+            )
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        # Only the per-student dashboard counters depend on the status
+        invalidate(db, "application_counts", *{row.student_id for row in changed})
+
+    results = {application_id: "not_found" for application_id in application_ids}
+    results.update({row.id: "unchanged" for row in owned})
+    results.update({row.id: "updated" for row in changed})
+    return results
@@ -0,0 +1,27 @@
+import json
+import os
+
+STATIC_DIR = "static"
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+_manifest = None
+
+
+def load_manifest():
+    # {"css/portal-shell.css": "dist/portal-shell.<hash>.css", ...} written by
+    # build_assets.py; empty when the build step has not been run (dev)
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(path: str) -> str:
+    # Jinja global: the content-hashed bundle for a static source file, which
+    # CachedStaticFiles serves as immutable; falls back to the source file
+    return f"/static/{load_manifest().get(path, path)}"
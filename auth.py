@@ -0,0 +1,217 @@
+import hashlib
+import heapq
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from fastapi import HTTPException, Request
+from sqlalchemy import update
+from database import AsyncSessionLocal
+from model import Professor, Student
+from utils import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, create_access_token, create_refresh_token, decode_access_token
+from cache_backend import get_cache_backend, run_with_backend
+
+# Cookie auth for every request handler (controller.get_current_user).
+#
+# Access tokens live ACCESS_TOKEN_EXPIRE_MINUTES. Once one is verified its
+# payload is kept in a bounded LRU keyed by the token's SHA-256, so repeat
+# requests skip the HS256 check. When the access token has expired the
+# refresh token (REFRESH_TOKEN_EXPIRE_DAYS) is checked against the user's
+# token_version, a fresh access token is issued (with the current name and
+# email) and main.py sets it on the response.
+#
+# Logout puts both token ids (jti) on a revocation list in the shared cache
+# backend until they expire. A token found not revoked is not looked up again
+# for REVOCATION_CHECK_SECONDS, so with Redis most requests make no round
+# trip; a logout in another worker takes effect there within that time.
+# Revocation lists need a shared backend (CACHE_BACKEND_URL=redis://...):
+# with memory:// a logout only revokes the tokens in the worker that served it.
+#
+# /logout/all calls revoke_user_tokens(), which bumps token_version in the
+# database. Refresh tokens issued before stop working in every worker, so all
+# of the user's sessions end within one access token lifetime.
+
+ACCESS_COOKIE = "access_token"
+REFRESH_COOKIE = "refresh_token"
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "10000"))
+REVOCATION_CHECK_SECONDS = float(os.getenv("REVOCATION_CHECK_SECONDS", "5"))
+
+USER_MODELS = {"student": Student, "professor": Professor}
+
+
+class VerifiedTokenCache:
+    # token digest -> payload. Full: expired tokens go first (soonest exp),
+    # then the least recently used.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._expiries = []  # heap of (exp, digest)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str):
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is None or payload["exp"] <= time():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def set(self, digest: str, payload: dict):
+        with self._lock:
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            heapq.heappush(self._expiries, (payload["exp"], digest))
+            if len(self._entries) > self.max_entries:
+                self._evict_expired()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if len(self._expiries) > 2 * self.max_entries:
+                # Drop heap entries for tokens already evicted
+                self._expiries = [(exp, key) for exp, key in self._expiries if key in self._entries]
+                heapq.heapify(self._expiries)
+
+    def _evict_expired(self):
+        now = time()
+        while self._expiries and self._expiries[0][0] <= now:
+            _, digest = heapq.heappop(self._expiries)
+            self._entries.pop(digest, None)
+
+    def discard(self, digest: str):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_tokens = VerifiedTokenCache(VERIFIED_TOKEN_CACHE_SIZE)
+
+
+class RecentChecks:
+    # jti -> time it was last found not revoked; bounded, oldest first
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._checked = OrderedDict()
+
+    def fresh(self, jti: str) -> bool:
+        with self._lock:
+            checked_at = self._checked.get(jti)
+            return checked_at is not None and time() - checked_at < REVOCATION_CHECK_SECONDS
+
+    def add(self, jti: str):
+        with self._lock:
+            self._checked[jti] = time()
+            self._checked.move_to_end(jti)
+            while len(self._checked) > self.max_entries:
+                self._checked.popitem(last=False)
+
+    def discard(self, jti: str):
+        with self._lock:
+            self._checked.pop(jti, None)
+
+
+not_revoked = RecentChecks(VERIFIED_TOKEN_CACHE_SIZE)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def is_revoked(payload: dict) -> bool:
+    jti = payload.get("jti")
+    if not jti or not_revoked.fresh(jti):
+        return False
+    revoked = get_cache_backend().get(f"revoked:{jti}") is not None
+    if not revoked:
+        not_revoked.add(jti)
+    return revoked
+
+
+def revoke_token(token: str, token_type: str = "access"):
+    payload = decode_access_token(token, token_type)
+    if not payload or not payload.get("jti"):
+        return
+    remaining = payload["exp"] - time()
+    if remaining > 0:
+        get_cache_backend().set(f"revoked:{payload['jti']}", 1, remaining)
+    not_revoked.discard(payload["jti"])
+    verified_tokens.discard(token_digest(token))
+
+
+def verify_access_token(token: str):
+    # Payload of a valid, unrevoked access token, else None
+    digest = token_digest(token)
+    payload = verified_tokens.get(digest)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            return None
+        verified_tokens.set(digest, payload)
+    if is_revoked(payload):
+        return None
+    return payload
+
+
+def token_claims(user, role: str) -> dict:
+    return {"sub": str(user.id), "role": role, "id": user.id, "email": user.email, "name": user.name,
+            "ver": user.token_version or 0}
+
+
+def issue_tokens(user, role: str):
+    # (access token, refresh token) for a freshly authenticated user
+    claims = token_claims(user, role)
+    refresh_claims = {key: claims[key] for key in ("sub", "role", "id", "ver")}
+    return create_access_token(claims), create_refresh_token(refresh_claims)
+
+
+def set_auth_cookies(response, access_token: str, refresh_token: str = None):
+    response.set_cookie(ACCESS_COOKIE, access_token, httponly=True, max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    if refresh_token:
+        response.set_cookie(REFRESH_COOKIE, refresh_token, httponly=True, max_age=REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
+async def refresh_access_token(request: Request):
+    # New access token from the refresh cookie; None if it is missing, invalid,
+    # revoked or older than the user's token_version
+    token = request.cookies.get(REFRESH_COOKIE)
+    payload = decode_access_token(token, "refresh") if token else None
+    if payload is None or await run_with_backend(is_revoked, payload):
+        return None
+    model = USER_MODELS.get(payload.get("role"))
+    if model is None:
+        return None
+    async with AsyncSessionLocal() as db:
+        user = await db.get(model, int(payload["sub"]))
+    if user is None or (user.token_version or 0) != payload.get("ver", 0):
+        return None
+    access_token = create_access_token(token_claims(user, payload["role"]))
+    request.state.refreshed_access_token = access_token  # set as a cookie in main.py
+    return await run_with_backend(verify_access_token, access_token)
+
+
+def reissue_access_token(request: Request, user, role: str):
+    # After a profile change, so the name/email claims are current again
+    request.state.refreshed_access_token = create_access_token(token_claims(user, role))
+
+
+async def current_user(request: Request):
+    token = request.cookies.get(ACCESS_COOKIE)
+    payload = await run_with_backend(verify_access_token, token) if token else None
+    if payload is None:
+        payload = await refresh_access_token(request)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Not authenticated" if not token else "Invalid or expired token")
+    return payload
+
+
+def revoke_user_tokens(db, role: str, user_id: int):
+    # Invalidates every refresh token of the user (/logout/all); call before
+    # db.commit()
+    model = USER_MODELS[role]
+    db.execute(update(model).where(model.id == user_id).values(token_version=model.token_version + 1))
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy import select
+from database import AsyncSessionLocal, SessionLocal, init_db
+from main import app
+from model import Application, Professor, Project, Student
+from recommend import recommend_projects
+from service import student_application_counts
+from skills import student_skill_names
+from templating import templates
+from utils import hash_password
+
+# Throughput of 200 parallel student dashboard requests, with the same work
+# (the body of controller.student_dashboard) done two ways: on a sync Session
+# inside async def, where every query blocks the loop, and on an AsyncSession
+# through run_sync, where each query yields to the loop. Point DATABASE_URL at
+# the database to measure, e.g.
+#
+#   DATABASE_URL=sqlite:///./bench.db python bench_async_dashboard.py
+#   python bench_async_dashboard.py 500        # number of parallel requests
+
+PARALLEL = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def dashboard_context(db, student_id: int):
+    # What student_dashboard reads, as plain sync Session code
+    recent_applications = db.execute(
+        select(Application, Project, Professor)
+        .join(Project, Application.project_id == Project.id)
+        .join(Professor, Project.professor_id == Professor.id)
+        .where(Application.student_id == student_id)
+        .order_by(Application.applied_at.desc())
+        .limit(5)
+    ).all()
+    return {
+        **student_application_counts(db, student_id),
+        "skills": student_skill_names(db, [student_id])[student_id],
+        "recommended": recommend_projects(db, student_id),
+        "recent_applications": recent_applications,
+    }
+
+
+def render(request: Request, context: dict):
+    user = {"role": "student", "id": int(request.query_params["student_id"]), "name": "Bench Student"}
+    return templates.TemplateResponse("student_dashboard.html", {"request": request, "user": user, **context})
+
+
+@app.get("/bench/blocking-dashboard", response_class=HTMLResponse, include_in_schema=False)
+async def blocking_dashboard(request: Request):
+    db = SessionLocal()
+    try:
+        context = dashboard_context(db, int(request.query_params["student_id"]))
+    finally:
+        db.close()
+    return render(request, context)
+
+
+@app.get("/bench/async-dashboard", response_class=HTMLResponse, include_in_schema=False)
+async def async_dashboard(request: Request):
+    async with AsyncSessionLocal() as db:
+        context = await db.run_sync(dashboard_context, int(request.query_params["student_id"]))
+    return render(request, context)
+
+
+def bench_student():
+    init_db()  # the ASGI client does not run the app's startup hook
+    db = SessionLocal()
+    try:
+        student = db.query(Student).filter(Student.email == "bench.student@example.com").first()
+        if not student:
+            student = Student(name="Bench Student", email="bench.student@example.com", password=hash_password("bench-pass"))
+            db.add(student)
+            db.commit()
+        return student.id
+    finally:
+        db.close()
+
+
+async def run(client, url):
+    async def one():
+        start = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one() for _ in range(PARALLEL))))
+    elapsed = time.perf_counter() - start
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    return PARALLEL / elapsed, p50, p99
+
+
+async def main():
+    student_id = bench_student()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, url in (
+            ("blocking", f"/bench/blocking-dashboard?student_id={student_id}"),
+            ("async", f"/bench/async-dashboard?student_id={student_id}"),
+        ):
+            await client.get(url)  # warm-up
+            rps, p50, p99 = await run(client, url)
+            print(f"{label:<18} {PARALLEL} parallel  {rps:8.1f} req/s  p50 {p50:7.1f}ms  p99 {p99:7.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
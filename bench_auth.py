@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import time
+
+import httpx
+from auth import verify_access_token, verified_tokens
+from database import SessionLocal, init_db
+from main import app
+from model import Student
+from utils import create_access_token, decode_access_token, hash_password
+
+# Auth overhead per request: HS256 verification on every call (the old
+# get_current_user) against the verified-token cache, first in isolation and
+# then end to end through /api/student/stats.
+#
+#   DATABASE_URL=sqlite:///./bench.db python bench_auth.py [iterations]
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+REQUESTS = 500
+EMAIL = "bench.auth@example.com"
+
+
+def bench_student():
+    init_db()  # the ASGI client does not run the app's startup hook
+    db = SessionLocal()
+    try:
+        student = db.query(Student).filter(Student.email == EMAIL).first()
+        if not student:
+            student = Student(name="Bench Auth", email=EMAIL, password=hash_password("bench-pass"))
+            db.add(student)
+            db.commit()
+        return student.id
+    finally:
+        db.close()
+
+
+def per_call_us(fn, token):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(token)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def per_request_ms(client, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        (await client.get("/api/student/stats")).raise_for_status()
+    return (time.perf_counter() - start) / count * 1000
+
+
+async def main():
+    student_id = bench_student()
+    token = create_access_token({"sub": str(student_id), "role": "student", "id": student_id, "email": EMAIL, "name": "Bench Auth", "ver": 0})
+
+    print(f"jwt.decode (HS256) every call   {per_call_us(decode_access_token, token):7.1f} us")
+    verify_access_token(token)
+    print(f"verified-token cache hit        {per_call_us(verify_access_token, token):7.1f} us")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"access_token": token}) as client:
+        await per_request_ms(client, 20)  # warm-up
+        cached = await per_request_ms(client, REQUESTS)
+        size, verified_tokens.max_entries = verified_tokens.max_entries, 0  # every request verifies again
+        uncached = await per_request_ms(client, REQUESTS)
+        verified_tokens.max_entries = size
+    print(f"/api/student/stats uncached     {uncached:7.3f} ms/request")
+    print(f"/api/student/stats cached       {cached:7.3f} ms/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import func
+from database import DATABASE_URL, SessionLocal, init_db
+from main import app
+from model import Student, Professor, Project, Application
+from auth import issue_tokens
+from seed_bench_data import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD
+
+# In-process load driver: runs every route in controller.py through the ASGI
+# app (no network, no server process) with logged-in student and professor
+# cookies and writes throughput and latency percentiles per endpoint as JSON,
+# named after the current commit so runs can be compared.
+#
+#   DATABASE_URL=sqlite:///./bench.db python seed_bench_data.py 0.05
+#   DATABASE_URL=sqlite:///./bench.db python bench_load.py --requests 200 --concurrency 10
+#   python bench_load.py --compare bench-results/<old>.json bench-results/<new>.json
+#
+# Every request of a route counts, including error responses; "errors" is
+# the number of 5xx answers and exceptions.
+
+RESULTS_DIR = "bench-results"
+SLOW_ROUTE_REQUESTS = 10  # bcrypt-bound routes (login, register) are run fewer times
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_users():
+    # A seeded student with applications and the professor of a project with
+    # applicants, plus ids for the routes that take one
+    init_db()  # the ASGI client does not run the app's startup hook
+    db = SessionLocal()
+    try:
+        domain = f"%@{BENCH_EMAIL_DOMAIN}"
+        busiest = (
+            db.query(Project.id, Project.professor_id)
+            .join(Professor, Project.professor_id == Professor.id)
+            .join(Application, Application.project_id == Project.id)
+            .filter(Professor.email.like(domain))
+            .group_by(Project.id, Project.professor_id)
+            .order_by(func.count(Application.id).desc())
+            .first()
+        )
+        if busiest is None:
+            sys.exit("No benchmark data: run seed_bench_data.py first")
+        project_id, professor_id = busiest
+        professor = db.get(Professor, professor_id)
+        applicant = db.query(Application).filter(Application.project_id == project_id).first()
+        student = db.get(Student, applicant.student_id)
+        open_project_ids = [
+            row.id for row in db.query(Project.id)
+            .filter(Project.status == "active", Project.applications_open == True)
+            .order_by(Project.id.desc())
+            .limit(1000)
+        ]
+        return {
+            "student": student,
+            "professor": professor,
+            "project_id": project_id,
+            "open_project_ids": open_project_ids or [project_id],
+            "application_id": applicant.id,
+            "data": {
+                "students": db.query(func.count(Student.id)).scalar(),
+                "professors": db.query(func.count(Professor.id)).scalar(),
+                "projects": db.query(func.count(Project.id)).scalar(),
+                "applications": db.query(func.count(Application.id)).scalar(),
+            },
+        }
+    finally:
+        db.close()
+
+
+def scenarios(users):
+    # (name, client, method, url, request kwargs factory or None); the client
+    # is the logged-in student or professor, None for a fresh anonymous one or
+    # "logout" for a fresh student session per request
+    project_id = users["project_id"]
+    open_project_id = users["open_project_ids"][0]
+    apply_to = itertools.cycle(users["open_project_ids"])  # a different project per apply
+    student_id = users["student"].id
+    application_id = users["application_id"]
+    counter = iter(range(10**9))
+    return [
+        ("GET /dashboard/student", "student", "GET", "/dashboard/student", None),
+        ("GET /profile/student", "student", "GET", "/profile/student", None),
+        ("GET /student/browse-projects", "student", "GET", "/student/browse-projects", None),
+        ("GET /student/browse-projects?skill", "student", "GET", "/student/browse-projects?skill=python", None),
+        ("GET /student/browse-projects?q", "student", "GET", "/student/browse-projects?q=sensors", None),
+        ("GET /student/my-applications", "student", "GET", "/student/my-applications", None),
+        ("GET /api/student/applications", "student", "GET", "/api/student/applications", None),
+        ("GET /api/student/project/{id}", "student", "GET", f"/api/student/project/{open_project_id}", None),
+        ("GET /api/student/search", "student", "GET", "/api/student/search?q=deep+learning", None),
+        ("GET /api/student/stats", "student", "GET", "/api/student/stats", None),
+        ("GET /api/student/recent-applications", "student", "GET", "/api/student/recent-applications", None),
+        ("POST /student/apply-project", "student", "POST", "/student/apply-project",
+         lambda: {"data": {"project_id": next(apply_to)}}),
+        ("POST /profile/student/update", "student", "POST", "/profile/student/update",
+         lambda: {"data": {"name": users["student"].name, "email": users["student"].email,
+                           "bio": "Interested in research."}}),
+        ("GET /dashboard/professor", "professor", "GET", "/dashboard/professor", None),
+        ("GET /profile/professor", "professor", "GET", "/profile/professor", None),
+        ("GET /professor/my-projects", "professor", "GET", "/professor/my-projects", None),
+        ("GET /professor/post-project", "professor", "GET", "/professor/post-project", None),
+        ("GET /professor/applications", "professor", "GET", "/professor/applications", None),
+        ("GET /api/professor/applications", "professor", "GET", "/api/professor/applications", None),
+        ("GET /api/professor/project/{id}", "professor", "GET", f"/api/professor/project/{project_id}", None),
+        ("GET /professor/student-profile", "professor", "GET", f"/professor/student-profile?student_id={student_id}", None),
+        ("GET /professor/applications/export", "professor", "GET", f"/professor/applications/export?project_id={project_id}", None),
+        ("POST /professor/post-project", "professor", "POST", "/professor/post-project",
+         lambda: {"data": {"title": f"Bench project {next(counter)}", "introduction": "Load test.",
+                           "required_skills": "Python, SQL", "status": "active", "applications_open": "true"}}),
+        ("POST /professor/application/update-status", "professor", "POST", "/professor/application/update-status",
+         lambda: {"data": {"application_id": application_id, "status": "shortlisted"}}),
+        ("POST /api/professor/applications/status", "professor", "POST", "/api/professor/applications/status",
+         lambda: {"json": {"application_ids": [application_id], "status": "pending"}}),
+        ("POST /profile/professor/update", "professor", "POST", "/profile/professor/update",
+         lambda: {"data": {"name": users["professor"].name, "email": users["professor"].email,
+                           "department": users["professor"].department or ""}}),
+        ("POST /login", None, "POST", "/login",
+         lambda: {"data": {"email": users["student"].email, "password": BENCH_PASSWORD, "role": "student"}}),
+        ("POST /register/student", None, "POST", "/register/student",
+         lambda: {"data": {"name": "Bench Register", "email": f"register{time.time_ns()}@{BENCH_EMAIL_DOMAIN}",
+                           "password": BENCH_PASSWORD, "confirm_password": BENCH_PASSWORD}}),
+        ("GET /logout", "logout", "GET", "/logout", None),
+    ]
+
+
+def summarize(latencies, errors, elapsed):
+    samples = sorted(latencies)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+async def run_route(clients, scenario, users, requests, concurrency):
+    name, role, method, url, body = scenario
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            if role == "logout":
+                # Logout revokes the tokens it is sent, so each call gets fresh ones
+                access_token, refresh_token = issue_tokens(users["student"], "student")
+                client = clients["new"]({"access_token": access_token, "refresh_token": refresh_token})
+            else:
+                client = clients[role] if role else clients["new"]({})
+            kwargs = body() if body else {}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code >= 500:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            if client not in clients.values():
+                await client.aclose()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def main(args):
+    users = bench_users()
+    transport = httpx.ASGITransport(app=app)
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "database": DATABASE_URL.split("://", 1)[0],
+        "data": users["data"],
+        "settings": {"requests": args.requests, "concurrency": args.concurrency},
+        "endpoints": {},
+    }
+    new_client = lambda cookies: httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=cookies)
+    clients = {"new": new_client}
+    for role in ("student", "professor"):
+        # One cookie jar per role, like one browser each
+        clients[role] = new_client({})
+        response = await clients[role].post("/login", data={
+            "email": users[role].email, "password": BENCH_PASSWORD, "role": role,
+        })
+        if response.status_code != 302:
+            sys.exit(f"{role} login failed ({response.status_code})")
+    try:
+        for scenario in scenarios(users):
+            name = scenario[0]
+            if args.route and not any(part in name for part in args.route):
+                continue
+            slow = name in ("POST /login", "POST /register/student")
+            requests = min(args.requests, SLOW_ROUTE_REQUESTS) if slow else args.requests
+            stats = await run_route(clients, scenario, users, requests, args.concurrency)
+            report["endpoints"][name] = stats
+            print(f"{name:<48} {stats['throughput_rps']:>8} req/s  p50 {stats['p50_ms']:>8.1f}ms  "
+                  f"p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms  errors {stats['errors']}")
+    finally:
+        await clients["student"].aclose()
+        await clients["professor"].aclose()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nreport written to {output}")
+
+
+def compare(baseline_path, current_path):
+    # p50/p95/p99 change per endpoint, current vs baseline
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+    print(f"{baseline['commit']} -> {current['commit']}")
+    for name, stats in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<48} new")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            deltas.append(f"{key[:3]} {before[key]:>8.1f} -> {stats[key]:>8.1f}ms ({change:+6.1f}%)")
+        print(f"{name:<48} " + "  ".join(deltas))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process load test of every controller route")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients per endpoint")
+    parser.add_argument("--route", action="append", help="only endpoints whose name contains this (repeatable)")
+    parser.add_argument("--output", help="report path (default bench-results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two reports and exit")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import time
+
+import httpx
+from database import SessionLocal, init_db
+from main import app
+from model import Student
+from utils import create_access_token, hash_password
+
+# Latency of an unrelated endpoint (/api/student/stats) while a storm of
+# logins is in flight. With bcrypt on the event loop the p99 tracks the bcrypt
+# cost; with password_pool it should stay close to the idle numbers.
+#
+#   DATABASE_URL=sqlite:///./bench.db python bench_login_storm.py [logins] [probes]
+
+LOGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+PROBES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+EMAIL = "bench.login@example.com"
+PASSWORD = "bench-pass"
+
+
+def bench_student():
+    init_db()  # the ASGI client does not run the app's startup hook
+    db = SessionLocal()
+    try:
+        student = db.query(Student).filter(Student.email == EMAIL).first()
+        if not student:
+            student = Student(name="Bench Login", email=EMAIL, password=hash_password(PASSWORD))
+            db.add(student)
+            db.commit()
+        return student.id
+    finally:
+        db.close()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))] * 1000
+    return pick(0.50), pick(0.95), pick(0.99)
+
+
+async def probe(client, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await client.get("/api/student/stats")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login(client):
+    response = await client.post(
+        "/login", data={"email": EMAIL, "password": PASSWORD, "role": "student"}, follow_redirects=False
+    )
+    return response.status_code
+
+
+async def main():
+    student_id = bench_student()
+    token = create_access_token({"sub": str(student_id), "role": "student", "id": student_id, "email": EMAIL, "name": "Bench Login"})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        client.cookies.set("access_token", token)
+        idle = await probe(client, PROBES)
+        print("idle        p50 %.1fms  p95 %.1fms  p99 %.1fms" % percentiles(idle))
+
+        start = time.perf_counter()
+        storm = asyncio.gather(*(login(client) for _ in range(LOGINS)))
+        loaded, statuses = await asyncio.gather(probe(client, PROBES), storm)
+        elapsed = time.perf_counter() - start
+        print("login storm p50 %.1fms  p95 %.1fms  p99 %.1fms" % percentiles(loaded))
+        busy = sum(1 for code in statuses if code == 503)
+        print(f"{LOGINS} logins in {elapsed:.2f}s, {busy} rejected with 503 (queue limit)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import random
+import sys
+import time
+
+from recommend import RecommendationIndex, STUDENT_FIELDS, hashed_counts
+
+# Recommendation latency vs. catalog size, measured on the in-memory index
+# alone (no database). Usage: python bench_recommend.py [max_projects]
+
+WORDS = (
+    "machine learning deep neural network vision language robotics control "
+    "embedded systems database distributed cloud security cryptography graph "
+    "optimization statistics bioinformatics genomics chemistry materials energy "
+    "climate simulation physics quantum signal processing wireless networks "
+    "python java rust sql matlab pytorch tensorflow react kubernetes linux"
+).split()
+
+
+def fake_text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def fake_project(rng):
+    return {
+        "title": fake_text(rng, 6),
+        "introduction": fake_text(rng, 60),
+        "objective": fake_text(rng, 30),
+        "methodology": fake_text(rng, 40),
+        "required_skills": ", ".join(rng.sample(WORDS, 4)),
+    }
+
+
+def bench(size, queries=200):
+    rng = random.Random(size)
+    index = RecommendationIndex()
+    start = time.perf_counter()
+    for project_id in range(1, size + 1):
+        index.upsert(project_id, fake_project(rng))
+    build = time.perf_counter() - start
+
+    students = [
+        hashed_counts({"skills_summary": ", ".join(rng.sample(WORDS, 5)), "bio": fake_text(rng, 25)}, STUDENT_FIELDS)
+        for _ in range(queries)
+    ]
+    timings = []
+    for query in students:
+        start = time.perf_counter()
+        index.top_k(query, 5)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"{size:>7} projects  build {build:6.2f}s  p50 {p50:7.3f}ms  p99 {p99:7.3f}ms")
+
+
+if __name__ == "__main__":
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    for size in (1000, 5000, 10000, 25000, 50000):
+        if size <= max_size:
+            bench(size)
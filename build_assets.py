@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+
+import brotli
+from assets import STATIC_DIR, DIST_DIR, MANIFEST_PATH
+
+# Minifies static/css and static/js sources into content-hashed bundles in
+# static/dist, writes .gz/.br variants next to them and the manifest read by
+# assets.asset_url. Run on deploy (and after editing the sources):
+#
+#   python build_assets.py
+
+SOURCE_DIRS = ("css", "js")
+
+
+def minify_css(text: str) -> str:
+    # Comments and insignificant whitespace only; no rule rewriting
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text: str) -> str:
+    # Conservative: drop indentation and blank lines, keep line breaks so ASI
+    # and // comments behave exactly as in the source
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def write_variants(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    with open(path + ".br", "wb") as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    os.makedirs(DIST_DIR, exist_ok=True)
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(STATIC_DIR, source_dir)
+        if not os.path.isdir(root):
+            continue
+        for filename in sorted(os.listdir(root)):
+            name, ext = os.path.splitext(filename)
+            with open(os.path.join(root, filename), encoding="utf-8") as f:
+                source = f.read()
+            data = MINIFIERS.get(ext, str)(source).encode("utf-8")
+            bundle = f"{name}.{hashlib.sha256(data).hexdigest()[:16]}{ext}"
+            write_variants(os.path.join(DIST_DIR, bundle), data)
+            manifest[f"{source_dir}/{filename}"] = f"dist/{bundle}"
+            print(f"{source_dir}/{filename} -> dist/{bundle} ({len(source.encode('utf-8'))} -> {len(data)} bytes)")
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,314 @@
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from cache import invalidate
+from database import SessionLocal, init_db
+from model import Professor, Project, Student, StudentSkill, ProjectSkill
+from schemas import ProfessorImportRow, ProjectImportRow, StudentImportRow
+from skills import get_or_create_skills, parse_skills
+from utils import hash_password
+
+# Bulk onboarding of students, professors or projects from CSV (header row)
+# or JSONL, read as a stream and written in batches of IMPORT_BATCH_SIZE:
+#
+#   1. every row is validated against its schemas.*ImportRow
+#   2. one SELECT per batch finds emails that are already registered
+#   3. passwords are hashed in parallel (IMPORT_WORKERS threads; bcrypt
+#      releases the GIL, see password_pool.py)
+#   4. one executemany INSERT per batch, then a commit
+#
+# Bad rows do not stop the import; each one is reported with its line number.
+# Imported passwords use IMPORT_BCRYPT_ROUNDS, which is cheaper than
+# BCRYPT_ROUNDS; the hash is upgraded the first time the user logs in.
+#
+#   python bulk_import.py student students.csv
+#   python bulk_import.py professor professors.jsonl
+#   python bulk_import.py project projects.csv
+#   cat students.jsonl | python bulk_import.py student - jsonl
+#
+# The same import is served at POST /api/import/{kind} (controller.py) when
+# IMPORT_TOKEN is set; the request body is the file itself.
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", str(os.cpu_count() or 1)))
+IMPORT_BCRYPT_ROUNDS = int(os.getenv("IMPORT_BCRYPT_ROUNDS", "10"))
+IMPORT_MAX_ERRORS = 1000  # per-row errors kept in the report; the rest are only counted
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+IMPORT_TOKEN = os.getenv("IMPORT_TOKEN", "")  # shared secret for the HTTP endpoint; unset disables it
+
+IMPORT_KINDS = {
+    "student": (Student, StudentImportRow),
+    "professor": (Professor, ProfessorImportRow),
+    "project": (Project, ProjectImportRow),
+}
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class ImportRejected(Exception):
+    # The whole upload is refused (too large); returned to the client as is
+    pass
+
+
+class ImportReport:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.rows = 0
+        self.inserted = 0
+        self.error_count = 0
+        self.errors = []
+        self.started = perf_counter()
+
+    def error(self, line: int, message: str, key: str = None):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "key": key, "error": message})
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.error_count,
+            "seconds": round(perf_counter() - self.started, 3),
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+
+def format_for(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(stream, import_format: str):
+    # (line number, dict or error message) for each record of a text stream
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, "more values than header columns"
+            else:
+                # Empty cells count as missing, so optional columns can be left blank
+                yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"invalid JSON: {e}"
+            continue
+        yield line_number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+
+def _batches(records):
+    batch = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _existing(db: Session, column, values):
+    return set(db.scalars(select(column).where(column.in_(values)))) if values else set()
+
+
+def _account_rows(db: Session, model, rows, report: ImportReport, seen_emails: set, executor):
+    # Drops rows whose email is taken (in the database or earlier in the file)
+    # and hashes the passwords of the rest in parallel
+    taken = _existing(db, model.email, [row.email for _, row in rows])
+    fresh = []
+    for line, row in rows:
+        if row.email in taken or row.email in seen_emails:
+            report.error(line, "Email already registered.", row.email)
+            continue
+        seen_emails.add(row.email)
+        fresh.append((line, row))
+    hashes = executor.map(partial(hash_password, rounds=IMPORT_BCRYPT_ROUNDS), [row.password for _, row in fresh])
+    values = []
+    for (line, row), hashed in zip(fresh, hashes):
+        value = row.model_dump(exclude={"password", "skills"}, exclude_none=True)
+        value["password"] = hashed
+        if model is Student and row.skills:
+            value["skills_summary"] = row.skills
+        values.append((line, value))
+    return values
+
+
+def _insert_accounts(db: Session, model, values):
+    db.execute(insert(model), [value for _, value in values])
+    if model is Student:
+        # Skill links for the students that listed skills
+        skills = {value["email"]: parse_skills(value["skills_summary"]) for _, value in values if value.get("skills_summary")}
+        if skills:
+            ids = dict(db.execute(select(Student.email, Student.id).where(Student.email.in_(skills))).all())
+            found = get_or_create_skills(db, {name for names in skills.values() for name in names})
+            db.execute(insert(StudentSkill), [
+                {"student_id": ids[email], "skill_id": found[name.lower()[:100]].id}
+                for email, names in skills.items() for name in names
+            ])
+    else:
+        invalidate(db, "professors")
+
+
+def _project_values(db: Session, rows, report: ImportReport):
+    professors = dict(db.execute(
+        select(Professor.email, Professor.id).where(Professor.email.in_({row.professor_email for _, row in rows}))
+    ).all())
+    values = []
+    for line, row in rows:
+        professor_id = professors.get(row.professor_email)
+        if professor_id is None:
+            report.error(line, "No professor with this email.", row.professor_email)
+            continue
+        value = row.model_dump(exclude={"professor_email"}, exclude_none=True)
+        value["professor_id"] = professor_id
+        values.append((line, value))
+    return values
+
+
+def _insert_projects(db: Session, values):
+    # ORM objects rather than a Core INSERT so the search and recommendation
+    # indexes pick the new projects up (see search.py / recommend.py)
+    projects = [Project(**value) for _, value in values]
+    db.add_all(projects)
+    db.flush()
+    skills = {project.id: parse_skills(project.required_skills) for project in projects if project.required_skills}
+    if skills:
+        found = get_or_create_skills(db, {name for names in skills.values() for name in names})
+        db.execute(insert(ProjectSkill), [
+            {"project_id": project_id, "skill_id": found[name.lower()[:100]].id}
+            for project_id, names in skills.items() for name in names
+        ])
+    invalidate(db, "project", *(project.id for project in projects))
+    invalidate(db, "catalog")
+    invalidate(db, "professor_counts", *{project.professor_id for project in projects})
+
+
+def _write(db: Session, kind: str, model, values):
+    if kind == "project":
+        _insert_projects(db, values)
+    else:
+        _insert_accounts(db, model, values)
+
+
+def import_records(db: Session, kind: str, records, executor=None) -> dict:
+    # records: (line number, dict or error message) pairs from read_records
+    model, schema = IMPORT_KINDS[kind]
+    report = ImportReport(kind)
+    seen_emails = set()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import-bcrypt")
+    try:
+        for batch in _batches(records):
+            rows = []
+            for line, record in batch:
+                report.rows += 1
+                if isinstance(record, str):
+                    report.error(line, record)
+                    continue
+                try:
+                    rows.append((line, schema.model_validate(record)))
+                except ValidationError as e:
+                    report.error(line, _validation_message(e), record.get("email") or record.get("title"))
+            if not rows:
+                continue
+
+            if kind == "project":
+                values = _project_values(db, rows, report)
+            else:
+                values = _account_rows(db, model, rows, report, seen_emails, executor)
+            if not values:
+                continue
+            try:
+                _write(db, kind, model, values)
+                db.commit()
+                report.inserted += len(values)
+            except IntegrityError:
+                # Someone registered one of these emails meanwhile: redo the
+                # batch row by row so only the conflicting rows fail
+                db.rollback()
+                for line, value in values:
+                    try:
+                        _write(db, kind, model, [(line, value)])
+                        db.commit()
+                        report.inserted += 1
+                    except IntegrityError as e:
+                        db.rollback()
+                        message = str(e.orig) if kind == "project" else "Email already registered."
+                        report.error(line, message, value.get("email") or value.get("title"))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return report.as_dict()
+
+
+def import_file(db: Session, kind: str, path: str, import_format: str = None) -> dict:
+    import_format = import_format or format_for(path)
+    if path == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        return import_records(db, kind, read_records(stream, import_format))
+    with open(path, encoding="utf-8-sig", newline="") as stream:
+        return import_records(db, kind, read_records(stream, import_format))
+
+
+def _import_spooled(kind: str, path: str, import_format: str) -> dict:
+    db = SessionLocal()
+    try:
+        return import_file(db, kind, path, import_format)
+    finally:
+        db.close()
+
+
+async def import_stream(chunks, kind: str, import_format: str) -> dict:
+    # For the HTTP endpoint: spools the request body to a temporary file in
+    # chunks, then runs the import in the threadpool on its own session, so
+    # neither the upload nor the bcrypt work sits on the event loop
+    tmp = await run_in_threadpool(NamedTemporaryFile, suffix=".import", delete=False)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise ImportRejected(f"Import file is larger than {IMPORT_MAX_BYTES // (1024 * 1024)} MB.")
+            await run_in_threadpool(tmp.write, chunk)
+        await run_in_threadpool(tmp.close)
+        return await run_in_threadpool(_import_spooled, kind, tmp.name, import_format)
+    finally:
+        tmp.close()
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in IMPORT_KINDS:
+        sys.exit("usage: python bulk_import.py student|professor|project FILE|- [csv|jsonl]")
+    init_db()
+    session = SessionLocal()
+    try:
+        result = import_file(session, sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    finally:
+        session.close()
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['key'] or ''} {error['error']}", file=sys.stderr)
+    print(f"{result['inserted']} of {result['rows']} {sys.argv[1]} rows imported, "
+          f"{result['failed']} failed, in {result['seconds']}s")
+    sys.exit(1 if result["failed"] else 0)
@@ -0,0 +1,244 @@
+import os
+import sys
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from model import CacheVersion
+from cache_backend import get_cache_backend
+
+# In-process read-through cache for hot, rarely written rows (see the
+# read-through functions in service.py).
+#
+# Each namespace has its own TTL and entry bound; all namespaces share one
+# memory cap. Writers call invalidate() inside their transaction: it bumps the
+# namespace's row in cache_version, and the local entries are dropped once the
+# commit succeeds. Other workers read cache_version at most every
+# CACHE_VERSION_CHECK_SECONDS and clear a namespace whose version moved, so
+# they serve stale data for at most that long (plus replica lag).
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") not in ("0", "false", "no")
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_VERSION_CHECK_SECONDS = float(os.getenv("CACHE_VERSION_CHECK_SECONDS", "1.0"))
+
+# namespace: (ttl seconds, max entries)
+CACHE_POLICIES = {
+    "project": (300, 5000),             # project detail by id
+    "professors": (300, 1),             # professor list for the filter dropdowns
+}
+
+# Namespaces kept in the shared backend (cache_backend.py) instead, with their
+# TTL in seconds. Invalidation goes straight to the backend after the commit.
+SHARED_CACHE_TTLS = {
+    "catalog": 60,                      # browse pages by filters + cursor
+    "application_counts": 30,           # student dashboard counters by student id
+    "professor_counts": 30,             # professor dashboard counters by professor id
+    "project_application_counts": 30,   # applications per project
+    "match_scores": 300,                # applicant skill-match scores per project (ranking.py)
+}
+
+_MISSING = object()
+
+
+def approx_size(value) -> int:
+    # Rough deep size of cached values (dicts, lists, tuples, Rows, scalars)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)) or hasattr(value, "_mapping"):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+
+class NamespaceStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+
+class ReadThroughCache:
+    def __init__(self, policies: dict, max_bytes: int):
+        self.policies = policies
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        # namespace -> OrderedDict(key -> (value, expires_at, size)), least recently used first
+        self._entries = {namespace: OrderedDict() for namespace in policies}
+        self._namespace_bytes = {namespace: 0 for namespace in policies}
+        self._bytes = 0
+        self._stats = {namespace: NamespaceStats() for namespace in policies}
+        self._versions = {}
+        self._versions_checked_at = float("-inf")
+
+    # --- lookups ---
+
+    def get_or_load(self, db: Session, namespace: str, key, loader):
+        # loader() runs on a miss; None (not found) is returned but not
+        # cached, so a row created later is seen at once
+        if not CACHE_ENABLED:
+            return loader()
+        self._check_versions(db)
+        value = self._get(namespace, key)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self._set(namespace, key, value)
+        return value
+
+    def peek(self, db: Session, namespace: str, key):
+        # The cached value or None, without loading or counting a hit/miss
+        if not CACHE_ENABLED:
+            return None
+        self._check_versions(db)
+        with self._lock:
+            entry = self._entries[namespace].get(key)
+            return entry[0] if entry is not None and entry[1] >= monotonic() else None
+
+    def _get(self, namespace, key):
+        entries, stats = self._entries[namespace], self._stats[namespace]
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                stats.misses += 1
+                return _MISSING
+            if entry[1] < monotonic():
+                self._drop(namespace, key)
+                stats.expirations += 1
+                stats.misses += 1
+                return _MISSING
+            entries.move_to_end(key)
+            stats.hits += 1
+            return entry[0]
+
+    def _set(self, namespace, key, value):
+        ttl, max_entries = self.policies[namespace]
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        entries = self._entries[namespace]
+        with self._lock:
+            self._drop(namespace, key)
+            entries[key] = (value, monotonic() + ttl, size)
+            self._namespace_bytes[namespace] += size
+            self._bytes += size
+            if len(entries) > max_entries:
+                self._evict(namespace)
+            # Over the shared cap: evict from whichever namespace holds the most
+            while self._bytes > self.max_bytes:
+                self._evict(max(self._namespace_bytes, key=self._namespace_bytes.get))
+
+    def _drop(self, namespace, key):
+        entry = self._entries[namespace].pop(key, None)
+        if entry is not None:
+            self._namespace_bytes[namespace] -= entry[2]
+            self._bytes -= entry[2]
+        return entry
+
+    def _evict(self, namespace):
+        entries = self._entries[namespace]
+        if entries:
+            self._drop(namespace, next(iter(entries)))
+            self._stats[namespace].evictions += 1
+
+    # --- invalidation ---
+
+    def clear(self, namespace: str, keys=None):
+        with self._lock:
+            targets = list(keys) if keys else list(self._entries[namespace])
+            for key in targets:
+                if self._drop(namespace, key) is not None:
+                    self._stats[namespace].invalidations += 1
+
+    def _check_versions(self, db: Session):
+        now = monotonic()
+        if now - self._versions_checked_at < CACHE_VERSION_CHECK_SECONDS:
+            return
+        self._versions_checked_at = now
+        versions = dict(db.execute(select(CacheVersion.name, CacheVersion.version)).all())
+        for namespace in self.policies:
+            version = versions.get(namespace, 0)
+            if self._versions.get(namespace, version) != version:
+                self.clear(namespace)
+            self._versions[namespace] = version
+
+    def stats(self):
+        with self._lock:
+            namespaces = {
+                namespace: {
+                    "entries": len(self._entries[namespace]),
+                    "bytes": self._namespace_bytes[namespace],
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "evictions": stats.evictions,
+                    "expirations": stats.expirations,
+                    "invalidations": stats.invalidations,
+                }
+                for namespace, stats in self._stats.items()
+            }
+            return {"bytes": self._bytes, "max_bytes": self.max_bytes, "namespaces": namespaces}
+
+
+read_cache = ReadThroughCache(CACHE_POLICIES, CACHE_MAX_BYTES)
+
+
+def invalidate(db: Session, namespace: str, *keys):
+    # Call before db.commit(); from async code: await db.run_sync(invalidate, ...)
+    # No keys: the whole namespace. For the in-process namespaces, other
+    # workers drop the whole namespace when they see the new version.
+    if namespace not in SHARED_CACHE_TTLS:
+        bump = update(CacheVersion).where(CacheVersion.name == namespace).values(version=CacheVersion.version + 1)
+        result = db.execute(bump)
+        if result.rowcount == 0:
+            # Rows are seeded by migration 0003; a namespace added since gets
+            # its row here. Another worker may insert it at the same moment,
+            # in which case its row is bumped instead.
+            try:
+                with db.begin_nested():
+                    db.add(CacheVersion(name=namespace, version=1))
+            except IntegrityError:
+                db.execute(bump)
+    pending = db.info.setdefault("cache_invalidate", {})
+    if keys and pending.get(namespace, set()) is not None:
+        pending.setdefault(namespace, set()).update(keys)
+    else:
+        pending[namespace] = None
+
+
+def shared_get_or_compute(namespace: str, key, loader):
+    return get_cache_backend().get_or_compute(namespace, str(key), SHARED_CACHE_TTLS[namespace], loader)
+
+
+def shared_get_or_compute_many(namespace: str, keys, loader):
+    # loader(missing_keys) -> {key: value}; keys are ids (ints)
+    found = get_cache_backend().get_or_compute_many(
+        namespace, [str(key) for key in keys], SHARED_CACHE_TTLS[namespace],
+        lambda missing: {str(key): value for key, value in loader([int(key) for key in missing]).items()},
+    )
+    return {int(key): value for key, value in found.items()}
+
+
+def cache_stats():
+    return read_cache.stats()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_invalidation(session):
+    pending = session.info.pop("cache_invalidate", None)
+    for namespace, keys in (pending or {}).items():
+        if namespace in SHARED_CACHE_TTLS:
+            get_cache_backend().invalidate(namespace, *(str(key) for key in keys or ()))
+        else:
+            read_cache.clear(namespace, keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_cache_invalidation(session, previous_transaction):
+    # A savepoint rollback (e.g. the conflicting insert in invalidate() above)
+    # keeps the invalidations queued so far; only a rollback of the whole
+    # transaction discards them
+    if previous_transaction.nested is False and previous_transaction.parent is None:
+        session.info.pop("cache_invalidate", None)
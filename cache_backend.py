@@ -0,0 +1,290 @@
+import hashlib
+import math
+import os
+import pickle
+import random
+from threading import Lock
+from time import monotonic, perf_counter, time
+from sqlalchemy.util.concurrency import await_only, greenlet_spawn, in_greenlet
+from starlette.concurrency import run_in_threadpool
+
+# Cache shared by all workers: the browse catalog pages, the student dashboard
+# counters and rendered template fragments. CACHE_BACKEND_URL picks the store:
+#
+#   memory://                 per-process stand-in (default; single node, scripts)
+#   redis://localhost:6379/0  any server speaking the Redis protocol
+#
+# Entries are stored with a soft expiry (the TTL) and kept for REFRESH_GRACE
+# times longer. After the soft expiry one caller, the one that wins the
+# refresh lock, recomputes the value while everyone else keeps serving the
+# old one. Callers may also refresh a little early, with a probability that
+# grows as expiry approaches and with how slow the value is to compute
+# (XFetch). Either way a hot key never expires for everyone at once.
+#
+# Invalidating a whole namespace bumps its generation key (gen:{namespace});
+# entries written under an older generation are ignored. Losing a generation
+# key would make old entries valid again, so generation keys never expire and
+# are never evicted: MemoryBackend keeps them apart from the entries, and on
+# Redis they are the only keys without a TTL, so a volatile-* maxmemory policy
+# (volatile-lru, the recommended setting) never drops them. Should one still go
+# missing (allkeys-* policy, FLUSHDB), it restarts at the current time in
+# microseconds, above any generation it could have reached, rather than at 0.
+
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "memory://")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "arc:")
+REFRESH_GRACE = 2        # hard TTL = ttl * REFRESH_GRACE
+REFRESH_BETA = 1.0       # > 1 refreshes earlier, < 1 later
+REFRESH_LOCK_SECONDS = 10
+GENERATION_PREFIX = "gen:"
+
+
+def _new_generation() -> int:
+    return int(time() * 1_000_000)
+
+
+class CacheBackend:
+    # Raw key/value operations; values are arbitrary picklable objects and
+    # missing keys read as None. Subclasses implement the first five.
+
+    def get_many(self, keys):
+        raise NotImplementedError
+
+    def set_many(self, mapping: dict, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def add(self, key: str, value, ttl) -> bool:
+        # Set only if absent (SET NX); True when this call created the key.
+        # ttl None: never expires
+        raise NotImplementedError
+
+    def get(self, key: str):
+        return self.get_many([key])[0]
+
+    def set(self, key: str, value, ttl: float):
+        self.set_many({key: value}, ttl)
+
+    # --- read-through with stampede protection ---
+
+    def get_or_compute(self, namespace: str, key: str, ttl: float, loader):
+        # One round trip for the namespace generation and the entry; bumping
+        # the generation (invalidate without keys) turns every entry into a miss
+        entry_key = f"{namespace}:{key}"
+        generation, entry = self.get_many([f"{GENERATION_PREFIX}{namespace}", entry_key])
+        generation = self._generation(namespace, generation)
+        if entry is not None and entry[0] == generation:
+            _, value, soft_expires_at, compute_seconds = entry
+            remaining = soft_expires_at - time()
+            early = compute_seconds * REFRESH_BETA * -math.log(1.0 - random.random())
+            if remaining > early or not self.add(f"lock:{entry_key}", 1, REFRESH_LOCK_SECONDS):
+                return value
+            # This caller refreshes; the rest keep getting the old value
+        start = perf_counter()
+        value = loader()
+        compute_seconds = perf_counter() - start
+        self.set(entry_key, (generation, value, time() + ttl, compute_seconds), ttl * REFRESH_GRACE)
+        self.delete(f"lock:{entry_key}")
+        return value
+
+    def peek_many(self, namespace: str, keys):
+        # {key: value} for the keys with a current, unexpired entry; one round trip
+        keys = list(keys)
+        if not keys:
+            return {}
+        entries = self.get_many([f"{GENERATION_PREFIX}{namespace}"] + [f"{namespace}:{key}" for key in keys])
+        generation = entries[0]
+        if generation is None:
+            return {}  # no entry is current until the generation is set again
+        now = time()
+        return {
+            key: entry[1]
+            for key, entry in zip(keys, entries[1:])
+            if entry is not None and entry[0] == generation and entry[2] > now
+        }
+
+    def get_or_compute_many(self, namespace: str, keys, ttl: float, loader):
+        # Pipelined multi-get: {key: value} for every key; loader(missing_keys)
+        # returns {key: value} for the misses, which are written back in one go
+        keys = list(keys)
+        found = self.peek_many(namespace, keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            generation = self._generation(namespace, self.get(f"{GENERATION_PREFIX}{namespace}"))
+            start = perf_counter()
+            loaded = loader(missing)
+            compute_seconds = (perf_counter() - start) / len(missing)
+            self.set_many({
+                f"{namespace}:{key}": (generation, value, time() + ttl, compute_seconds)
+                for key, value in loaded.items()
+            }, ttl * REFRESH_GRACE)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, namespace: str, *keys):
+        # Specific keys, or the whole namespace when none are given
+        if keys:
+            self.delete(*(f"{namespace}:{key}" for key in keys))
+        elif not self.add(f"{GENERATION_PREFIX}{namespace}", _new_generation(), None):
+            self.incr(f"{GENERATION_PREFIX}{namespace}")
+
+    def _generation(self, namespace: str, generation):
+        # The namespace generation just read; a missing one is started anew
+        if generation is not None:
+            return generation
+        start = _new_generation()
+        if self.add(f"{GENERATION_PREFIX}{namespace}", start, None):
+            return start
+        return self.get(f"{GENERATION_PREFIX}{namespace}") or start
+
+
+class MemoryBackend(CacheBackend):
+    # In-process stand-in with the same semantics (per worker, so only
+    # coherent with a single worker). Generation keys live in their own dict,
+    # outside max_entries and eviction.
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._data = {}
+        self._generations = {}
+
+    def _store(self, key):
+        return self._generations if key.startswith(GENERATION_PREFIX) else self._data
+
+    def _live(self, key):
+        store = self._store(key)
+        item = store.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] < monotonic():
+            del store[key]
+            return None
+        return item
+
+    def get_many(self, keys):
+        with self._lock:
+            return [item[0] if (item := self._live(key)) else None for key in keys]
+
+    def set_many(self, mapping, ttl):
+        expires_at = monotonic() + ttl
+        with self._lock:
+            for key, value in mapping.items():
+                store = self._store(key)
+                store.pop(key, None)
+                store[key] = (value, expires_at)
+            while len(self._data) > self.max_entries:
+                # dicts keep insertion order: drop the oldest writes first
+                del self._data[next(iter(self._data))]
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._store(key).pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            item = self._live(key)
+            value = (item[0] if item else 0) + 1
+            self._store(key)[key] = (value, None)
+            return value
+
+    def add(self, key, value, ttl):
+        with self._lock:
+            if self._live(key):
+                return False
+            self._store(key)[key] = (value, None if ttl is None else monotonic() + ttl)
+            return True
+
+
+class RedisBackend(CacheBackend):
+    # Pickled values under CACHE_KEY_PREFIX, through the synchronous client.
+    # Its round trips must not run on the event loop's thread, where each one
+    # (or each 0.25s timeout) would stall every request of the worker. Inside
+    # a greenlet (AsyncSession.run_sync, async commits, run_with_backend) a
+    # call is made in the threadpool while the greenlet waits, so the loop
+    # keeps serving other requests; elsewhere (scripts) it is made directly.
+    # Redis errors read as misses and skip the write, so an unavailable cache
+    # slows pages down instead of failing them.
+    def __init__(self, url: str, prefix: str = CACHE_KEY_PREFIX):
+        import redis
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.prefix = prefix
+
+    def _call(self, method, *args, **kwargs):
+        if in_greenlet():
+            return await_only(run_in_threadpool(method, *args, **kwargs))
+        return method(*args, **kwargs)
+
+    def get_many(self, keys):
+        try:
+            values = self._call(self._client.mget, [self.prefix + key for key in keys])
+        except self._errors:
+            return [None] * len(keys)
+        # Counters (INCR) come back as plain integers, everything else is pickled
+        return [
+            None if raw is None else int(raw) if raw.isdigit() else pickle.loads(raw)
+            for raw in values
+        ]
+
+    def set_many(self, mapping, ttl):
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+        try:
+            self._call(pipe.execute)
+        except self._errors:
+            pass
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        try:
+            self._call(self._client.delete, *(self.prefix + key for key in keys))
+        except self._errors:
+            pass
+
+    def incr(self, key):
+        try:
+            return self._call(self._client.incr, self.prefix + key)
+        except self._errors:
+            return 0
+
+    def add(self, key, value, ttl):
+        # Integers are stored as plain numbers so INCR works on them
+        raw = value if type(value) is int else pickle.dumps(value)
+        try:
+            return bool(self._call(
+                self._client.set, self.prefix + key, raw, nx=True, px=None if ttl is None else int(ttl * 1000)
+            ))
+        except self._errors:
+            return False
+
+
+def cache_key(*parts) -> str:
+    # Short stable key for arbitrary (filter, cursor, ...) tuples
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+async def run_with_backend(call, *args):
+    # For async code calling sync code that may use the backend (token
+    # checks, template rendering): runs call(*args) in a greenlet, so Redis
+    # round trips wait in the threadpool instead of blocking the event loop
+    return await greenlet_spawn(call, *args)
+
+
+_backend = None
+
+
+def get_cache_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        if CACHE_BACKEND_URL.startswith(("redis://", "rediss://", "unix://")):
+            _backend = RedisBackend(CACHE_BACKEND_URL)
+        else:
+            _backend = MemoryBackend()
+    return _backend
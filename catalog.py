@@ -0,0 +1,105 @@
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from model import Professor, Project, ProjectSkill, Skill
+from search import get_search_backend
+
+# Page size for the student browse page
+CATALOG_PAGE_SIZE = 24
+# Best search-index matches considered for a text search on the browse page
+CATALOG_SEARCH_CANDIDATES = 1000
+
+
+def _filtered(query, professor_id=None, department=None, skill=None):
+    # The browse filters, for both the page query and the search candidates
+    query = (
+        query.join(Professor, Project.professor_id == Professor.id)
+        .filter(Project.status == "active", Project.applications_open == True)
+    )
+    if professor_id:
+        query = query.filter(Project.professor_id == professor_id)
+    if department:
+        query = query.filter(Professor.department == department)
+    if skill:
+        # Indexed join through project_skill instead of a LIKE scan
+        query = (
+            query.join(ProjectSkill, ProjectSkill.project_id == Project.id)
+            .join(Skill, ProjectSkill.skill_id == Skill.id)
+            .filter(Skill.slug == skill.strip().lower())
+        )
+    return query
+
+
+def browse_catalog(
+    db: Session,
+    search: str = None,
+    professor_id: int = None,
+    department: str = None,
+    skill: str = None,
+    cursor: int = None,
+    limit: int = CATALOG_PAGE_SIZE,
+    search_professor_ids=(),
+):
+    # (rows, next_cursor, truncated); truncated is set when a text search
+    # matched more projects than CATALOG_SEARCH_CANDIDATES, of which only the
+    # best are paged through.
+    # Only the columns the project card renders; the Text-heavy project
+    # fields are fetched lazily through /api/student/project/{id}
+    query = _filtered(
+        db.query(
+            Project.id,
+            Project.title,
+            Project.objective,
+            Project.introduction,
+            Project.status,
+            Project.required_skills,
+            Project.updated_at,
+            Professor.name.label("professor_name"),
+            Professor.department.label("department"),
+        ),
+        professor_id, department, skill,
+    )
+
+    truncated = False
+    if search:
+        # Candidates from the search index (search.py) rather than a LIKE
+        # '%...%' over the Text columns, which reads every open project; plus
+        # the projects of professors whose name matches (search_professor_ids,
+        # found in the cached professor list). The filters go into the search
+        # so that its best matches are ones this page can show.
+        within = _filtered(select(Project.id), professor_id, department, skill)
+        ranked = get_search_backend(db).search(db, search, CATALOG_SEARCH_CANDIDATES, within=within)
+        truncated = len(ranked) >= CATALOG_SEARCH_CANDIDATES
+        matches = []
+        if ranked:
+            matches.append(Project.id.in_([project_id for project_id, _ in ranked]))
+        if search_professor_ids:
+            matches.append(Project.professor_id.in_(list(search_professor_ids)))
+        if not matches:
+            return [], None, False
+        query = query.filter(or_(*matches))
+
+    # Keyset pagination: newest first, cursor is the last id already shown
+    if cursor:
+        query = query.filter(Project.id < cursor)
+    rows = query.order_by(Project.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return rows, next_cursor, truncated
+
+
+def professor_options(db: Session):
+    # (id, name, department) tuples for the browse filter dropdowns; read
+    # through the "professors" cache (service.professor_list)
+    return [
+        (row.id, row.name, row.department)
+        for row in db.query(Professor.id, Professor.name, Professor.department)
+        .order_by(Professor.name)
+        .all()
+    ]
+
+
+def department_options(professors):
+    return sorted({dept for _, _, dept in professors if dept})
@@ -0,0 +1,170 @@
+import gzip
+import io
+import os
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+# Response compression for everything the app renders (mostly the HTML pages,
+# which carry their inline CSS/JS). Tunable per deployment:
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller bodies go out as-is
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))  # 4-6 is the speed/size sweet spot for dynamic pages
+
+# Formats that are already compressed; recompressing them only costs CPU
+SKIP_MEDIA_TYPES = (
+    "image/", "video/", "audio/", "font/woff", "font/woff2",
+    "application/zip", "application/gzip", "application/x-gzip", "application/pdf",
+    "application/octet-stream",
+)
+
+
+def accepted_encodings(header: str):
+    # Content codings from an Accept-Encoding header, minus the ones refused with q=0
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    # "br" over "gzip" when both are accepted
+    accepted = accepted_encodings(accept_encoding)
+    if "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._buffer = io.BytesIO()
+        self._file = gzip.GzipFile(mode="wb", fileobj=self._buffer, compresslevel=level, mtime=0)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def compress(self, data: bytes) -> bytes:
+        self._file.write(data)
+        return self._drain()
+
+    def flush(self) -> bytes:
+        self._file.flush()
+        return self._drain()
+
+    def finish(self) -> bytes:
+        self._file.close()
+        return self._drain()
+
+
+class CompressionMiddleware:
+    # Pure ASGI so streamed responses (StreamingResponse) are compressed chunk
+    # by chunk instead of being buffered. The first body chunk decides: below
+    # min_size with nothing more to come it is sent unchanged.
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self, encoding, send)(self.app, scope, receive)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, app, scope, receive):
+        await app(scope, receive, self.send_wrapper)
+
+    def _should_skip(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:  # e.g. precompressed static variants
+            return True
+        media_type = headers.get("content-type", "").lower()
+        return media_type.startswith(SKIP_MEDIA_TYPES)
+
+    def _open_stream(self):
+        if self.encoding == "br":
+            return _BrotliStream(self.middleware.brotli_quality)
+        return _GzipStream(self.middleware.gzip_level)
+
+    def _compressed_headers(self, length: int = None):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        # The ETag now names a different representation
+        if "etag" in headers and not headers["etag"].startswith("W/"):
+            headers["ETag"] = "W/" + headers["etag"]
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None:
+            if not more_body and len(body) < self.middleware.min_size:
+                # Small and complete: not worth the Content-Encoding
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.stream = self._open_stream()
+            if not more_body:
+                data = self.stream.compress(body) + self.stream.finish()
+                self._compressed_headers(len(data))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": data})
+                return
+            self._compressed_headers()
+            await self.send(self.start_message)
+
+        # Streaming: flush each chunk so the client sees rows as they are produced
+        data = self.stream.compress(body)
+        data += self.stream.flush() if more_body else self.stream.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,75 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+# Conditional GET for the JSON read endpoints. Project reads derive their
+# validators from Project.updated_at, so a 304 is decided from (id, updated_at)
+# before any Text column is loaded; other reads hash the serialized body.
+
+PRIVATE = "private, no-cache"       # per-user data: browser only, always revalidate
+PUBLIC = "public, max-age=60"       # identical for every user: shared caches may keep it
+
+
+def etag_for(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    # Naive updated_at values are labelled UTC; clients only echo the value
+    # back in If-Modified-Since, so a consistent label is all that matters
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.replace(microsecond=0), usegmt=True)
+
+
+def _strip_weak(tag: str) -> str:
+    # CompressionMiddleware weakens ETags; compare weakly (RFC 9110 13.1.2)
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if if_none_match.strip() == "*":
+            return True
+        return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime = None, cache_control: str = PRIVATE):
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if cache_control == PRIVATE:
+        headers["Vary"] = "Cookie"
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified_response(headers) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_json(request: Request, data, cache_control: str = PRIVATE) -> Response:
+    # For reads without a cheap version column: the ETag is a hash of the
+    # body, which saves the transfer (not the queries) on a match
+    content = jsonable_encoder(data)
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = validator_headers(f'"{hashlib.sha1(body).hexdigest()[:20]}"', cache_control=cache_control)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,40 +1,64 @@
-from fastapi import APIRouter, Request, Depends, Form, UploadFile, File
+from fastapi import APIRouter, Request, Depends, Form, UploadFile, File, BackgroundTasks
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from database import SessionLocal, engine, Base
-from service import register_student, create_project
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal, read_session_factory
+import hmac
+from time import time
+from service import register_student_async, create_project_async
 from schemas import StudentRegisterRequest, ProfessorUpdateRequest, ProjectCreateRequest
-from service import register_professor, update_professor_profile, update_student_profile
+from service import register_professor_async, update_professor_profile_async, update_student_profile_async
 from schemas import ProfessorRegisterRequest, StudentUpdateRequest
 from model import Professor, Project, Application
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi import Response, Cookie
 from fastapi import status
-from utils import decode_access_token
-from schemas import LoginRequest
+from auth import current_user, issue_tokens, reissue_access_token, set_auth_cookies, revoke_token, ACCESS_COOKIE, REFRESH_COOKIE
+from auth import revoke_user_tokens
+from schemas import LoginRequest, ApplicationStatusUpdateRequest
 import service  # or from service import authenticate_user, create_user_jwt ...
 from fastapi import HTTPException, status, Depends
 from fastapi.responses import RedirectResponse
-import os
-from uuid import uuid4
-from sqlalchemy import func
+from templating import templates
+from cache_backend import run_with_backend
+from conditional import etag_for, validator_headers, is_not_modified, not_modified_response, conditional_json, PUBLIC
+from uploads import save_profile_photo, make_thumbnail, thumbnail_url, UploadRejected
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from catalog import department_options
+from applications import professor_application_page, student_application_page, professor_project_options
+from applications import update_application_statuses, APPLICATION_STATUSES, APPLICATION_SORTS
+from service import project_detail, project_validators, catalog_page, professor_list, student_application_counts
+from service import professor_dashboard_counts, project_application_counts
+from cache import invalidate
+from search import search_projects
+from export import export_applications, EXPORT_FORMATS
+from bulk_import import import_stream, ImportRejected, IMPORT_FORMATS, IMPORT_KINDS, IMPORT_TOKEN
+from skills import project_skill_names, student_skill_names
+from ranking import invalidate_project
+from recommend import recommend_projects
 
 
 from model import Student
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter()
 
-# Create tables on startup (safe to run repeatedly)
-Base.metadata.create_all(bind=engine)
+# Writes (and anything that must see them) use get_db on the primary; the
+# read-only pages use get_read_db, which goes to a replica unless the user
+# wrote something in the last READ_YOUR_WRITES_SECONDS (see main.py).
+PRIMARY_PIN_COOKIE = "db_primary_until"
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db(request: Request):
+    request.state.db_write = True
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    pinned_until = request.cookies.get(PRIMARY_PIN_COOKIE, "")
+    use_primary = pinned_until.isdigit() and int(pinned_until) > time()
+    async with read_session_factory(use_primary)() as db:
         yield db
-    finally:
-        db.close()
+
 
 @router.post("/register/student", response_class=HTMLResponse)
 async def register_student_endpoint(
@@ -43,7 +67,7 @@ async def register_student_endpoint(
     email: str = Form(...),
     password: str = Form(...),
     confirm_password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Construct Pydantic schema
     data = StudentRegisterRequest(
@@ -52,7 +76,7 @@ async def register_student_endpoint(
         password=password,
         confirm_password=confirm_password
     )
-    error = register_student(db, data)
+    error = await register_student_async(db, data)
     if error:
         # Show form again with error
         return templates.TemplateResponse("landing.html",
@@ -69,7 +93,7 @@ async def register_professor_endpoint(
     email: str = Form(...),
     password: str = Form(...),
     confirm_password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     data = ProfessorRegisterRequest(
         name=name,
@@ -77,7 +101,7 @@ async def register_professor_endpoint(
         password=password,
         confirm_password=confirm_password
     )
-    error = register_professor(db, data)
+    error = await register_professor_async(db, data)
     if error:
         return templates.TemplateResponse(
             "landing.html", {"request": request, "register_professor_error": error}
@@ -92,9 +116,9 @@ async def login(
     email: str = Form(...),
     password: str = Form(...),
     role: str = Form(...),  # "student" or "professor"
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = service.authenticate_user(db, email, password, role)
+    user = await service.authenticate_user_async(db, email, password, role)
     
     if user == "role_mismatch":
         # User exists but trying to login with wrong role
@@ -111,40 +135,40 @@ async def login(
         # Return landing page with error
         return templates.TemplateResponse("landing.html", {"request": request, "login_error": "Invalid credentials."})
     
-    token = service.create_user_jwt(user, role)
+    access_token, refresh_token = issue_tokens(user, role)
     response = RedirectResponse(url=f"/dashboard/{role}", status_code=status.HTTP_302_FOUND)
-    # Set HTTPOnly cookie for the token (demo style; can use secure/session for prod)
-    response.set_cookie(key="access_token", value=token, httponly=True)
+    # HTTPOnly cookies for both tokens (demo style; can use secure/session for prod)
+    set_auth_cookies(response, access_token, refresh_token)
     return response
 
-def get_current_user(request: Request):
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return payload
-
-@router.get("/dashboard/student", response_class=HTMLResponse)
-async def student_dashboard(request: Request, user = Depends(get_current_user)):
-    if user["role"] != "student":
-        return RedirectResponse(url="/", status_code=303)
-    # Render dashboard template and pass user info
-    return templates.TemplateResponse("student_dashboard.html", {"request": request, "user": user})
+async def get_current_user(request: Request):
+    # Cached verification + transparent refresh, see auth.py
+    return await current_user(request)
 
 @router.get("/logout")
-async def logout():
+async def logout(request: Request):
     response = RedirectResponse(url="/", status_code=302)  # Go to landing page
-    # Remove the access_token cookie
-    response.delete_cookie("access_token")
+    # Revoke and remove both tokens
+    for cookie, token_type in ((ACCESS_COOKIE, "access"), (REFRESH_COOKIE, "refresh")):
+        token = request.cookies.get(cookie)
+        if token:
+            await run_with_backend(revoke_token, token, token_type)
+        response.delete_cookie(cookie)
     return response
 
+# Logs the user out on every device: no refresh token issued before works
+# any more, and other sessions end when their access token expires
+@router.get("/logout/all")
+async def logout_all(request: Request, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    await db.run_sync(revoke_user_tokens, user["role"], int(user["id"]))
+    await db.commit()
+    return await logout(request)
+
 @router.get("/profile/professor", response_class=HTMLResponse)
-async def get_professor_profile(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_professor_profile(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user["role"] != "professor":
         return RedirectResponse(url="/", status_code=303)
-    prof = db.query(Professor).filter(Professor.id == user["id"]).first()
+    prof = await db.get(Professor, int(user["id"]))
     if not prof:
         return RedirectResponse(url="/logout")
     return templates.TemplateResponse("professor_profile.html", {"request": request, "prof": prof})
@@ -153,6 +177,7 @@ async def get_professor_profile(request: Request, db: Session = Depends(get_db),
 @router.post("/profile/professor/update", response_class=HTMLResponse)
 async def update_professor_profile_endpoint(
     request: Request,
+    background_tasks: BackgroundTasks,
     name: str = Form(None),
     email: str = Form(None),
     department: str = Form(None),
@@ -169,7 +194,7 @@ async def update_professor_profile_endpoint(
     memberships: str = Form(None),
     social_links: str = Form(None),
     profile_pic: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user)
 ):
     # Role check
@@ -179,14 +204,12 @@ async def update_professor_profile_endpoint(
     # --- Handle file upload ---
     photo_url = None
     if profile_pic and profile_pic.filename:
-        ext = os.path.splitext(profile_pic.filename)[1]
-        filename = f"{uuid4().hex}{ext}"
-        save_dir = "static/profile_photos"
-        os.makedirs(save_dir, exist_ok=True)
-        save_path = os.path.join(save_dir, filename)
-        with open(save_path, "wb") as f:
-            f.write(await profile_pic.read())
-        photo_url = f"/static/profile_photos/{filename}"
+        try:
+            photo_url, photo_path = await save_profile_photo(profile_pic)
+        except UploadRejected as e:
+            prof = await db.get(Professor, int(user.get("id") or user.get("sub")))
+            return templates.TemplateResponse("professor_profile.html", {"request": request, "prof": prof, "error": str(e)})
+        background_tasks.add_task(make_thumbnail, photo_path)
 
     # --- Build schema for update ---
     from schemas import ProfessorUpdateRequest
@@ -210,12 +233,13 @@ async def update_professor_profile_endpoint(
     )
 
     # --- Perform update ---
-    error = update_professor_profile(db, int(user.get("id") or user.get("sub")), update_data)
-    prof = db.query(Professor).filter(Professor.id == int(user.get("id") or user.get("sub"))).first()
+    error = await update_professor_profile_async(db, int(user.get("id") or user.get("sub")), update_data)
+    prof = await db.get(Professor, int(user.get("id") or user.get("sub")))
 
     if error:
         return templates.TemplateResponse("professor_profile.html", {"request": request, "prof": prof, "error": error})
 
+    reissue_access_token(request, prof, "professor")
     return templates.TemplateResponse("professor_profile.html", {
         "request": request,
         "prof": prof,
@@ -223,42 +247,39 @@ async def update_professor_profile_endpoint(
     })
 
 @router.get("/dashboard/professor", response_class=HTMLResponse)
-async def professor_dashboard(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def professor_dashboard(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "professor":
         return RedirectResponse(url="/", status_code=303)
     professor_id = int(user.get("id") or user.get("sub"))
     
-    # Total projects
-    total_projects = db.query(func.count(Project.id)).filter(Project.professor_id == professor_id).scalar() or 0
-    # Active projects
-    active_projects = db.query(func.count(Project.id)).filter(Project.professor_id == professor_id, Project.status == "active").scalar() or 0
-    # Students applied (count of applications to professor's projects)
-    student_applied = db.query(Application).join(Project, Application.project_id == Project.id)\
-        .filter(Project.professor_id == professor_id).count() or 0
+    counts = await db.run_sync(professor_dashboard_counts, professor_id)
 
      # Recent projects (5 latest updated)
-    recent_projects = db.query(Project).filter(Project.professor_id == professor_id).order_by(Project.updated_at.desc()).limit(5).all()
+    recent_projects = (await db.scalars(
+        select(Project).where(Project.professor_id == professor_id).order_by(Project.updated_at.desc()).limit(5)
+    )).all()
+    application_counts = await db.run_sync(project_application_counts, [project.id for project in recent_projects])
 
     # Recent applications (5 latest, with join)
-    recent_applications = (
-        db.query(Application, Student, Project)
+    recent_applications = (await db.execute(
+        select(Application, Student, Project)
         .join(Project, Application.project_id == Project.id)
         .join(Student, Application.student_id == Student.id)
-        .filter(Project.professor_id == professor_id)
+        .where(Project.professor_id == professor_id)
         .order_by(Application.applied_at.desc())
         .limit(5)
-        .all()
-    )
+    )).all()
 
     return templates.TemplateResponse(
         "professor_dashboard.html",
         {
             "request": request,
             "user": user,
-            "total_projects": total_projects,
-            "active_projects": active_projects,
-            "student_applied": student_applied,
+            "total_projects": counts["total_projects"],
+            "active_projects": counts["active_projects"],
+            "student_applied": counts["student_applied"],
             "recent_projects": recent_projects,
+            "application_counts": application_counts,
             "recent_applications": recent_applications,
         }
     )
@@ -286,7 +307,7 @@ async def submit_new_project(
     applications_open: bool = Form(True),
     status: str = Form("active"),
     required_skills: str = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user)
 ):
     if user.get("role") != "professor":
@@ -305,7 +326,7 @@ async def submit_new_project(
         required_skills=required_skills
     )
 
-    new_project = create_project(db, int(user.get("id") or user.get("sub")), project_data)
+    new_project = await create_project_async(db, int(user.get("id") or user.get("sub")), project_data)
 
     return templates.TemplateResponse(
         "professor_postproject.html",
@@ -314,96 +335,99 @@ async def submit_new_project(
 
 #to view the project details which open a pop up
 @router.get("/api/professor/project/{project_id}")
-async def get_project_detail(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_project_detail(request: Request, project_id: int, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "professor":
         return {"error": "Unauthorized"}, 401
     professor_id = int(user.get("id") or user.get("sub"))
-    project = db.query(Project).filter(Project.id == project_id, Project.professor_id == professor_id).first()
+    validators = await db.run_sync(project_validators, project_id)
+    if not validators or validators["professor_id"] != professor_id:
+        return {"error": "Not found"}, 404
+    updated_at = validators["updated_at"]
+    # The 304 path reads only updated_at and the count; the Text columns are
+    # loaded (and cached) only for a full response
+    applications_count = (await db.run_sync(project_application_counts, [project_id]))[project_id]
+    headers = validator_headers(etag_for("professor-project", project_id, updated_at, applications_count), updated_at)
+    if is_not_modified(request, headers["ETag"], updated_at):
+        return not_modified_response(headers)
+    project = await db.run_sync(project_detail, project_id)
     if not project:
         return {"error": "Not found"}, 404
+
     # Return only relevant fields
-    return {
-        "id": project.id,
-        "title": project.title,
-        "status": project.status,
-        "introduction": project.introduction,
-        "problem_definition": project.problem_definition,
-        "objective": project.objective,
-        "methodology": project.methodology,
-        "scope": project.scope,
-        "timeline": project.timeline,
-        "updated_at": project.updated_at.strftime("%b %d, %Y") if project.updated_at else "",
-        "applications_count": len(project.applications) if hasattr(project, "applications") else None,
-        "required_skills": project.required_skills,
-    }
+    return JSONResponse({
+        "id": project["id"],
+        "title": project["title"],
+        "status": project["status"],
+        "introduction": project["introduction"],
+        "problem_definition": project["problem_definition"],
+        "objective": project["objective"],
+        "methodology": project["methodology"],
+        "scope": project["scope"],
+        "timeline": project["timeline"],
+        "updated_at": updated_at.strftime("%b %d, %Y") if updated_at else "",
+        "applications_count": applications_count,
+        "required_skills": project["required_skills"],
+    }, headers=headers)
 
 #to show projects when my projects is clicked from professor
 
 @router.get("/professor/my-projects", response_class=HTMLResponse)
-async def my_projects(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def my_projects(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "professor":
         return RedirectResponse(url="/", status_code=303)
     professor_id = int(user.get("id") or user.get("sub"))
 
-    projects = (
-        db.query(Project)
-        .filter(Project.professor_id == professor_id)
+    projects = (await db.scalars(
+        select(Project)
+        .where(Project.professor_id == professor_id)
         .order_by(Project.created_at.desc())
-        .all()
-    )
+    )).all()
+    application_counts = await db.run_sync(project_application_counts, [project.id for project in projects])
 
     return templates.TemplateResponse(
         "professor_myprojects.html",
-        {"request": request, "user": user, "projects": projects}
+        {"request": request, "user": user, "projects": projects, "application_counts": application_counts}
     )
 
 @router.get("/dashboard/student", response_class=HTMLResponse)
-async def student_dashboard(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def student_dashboard(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "student":
         return RedirectResponse(url="/", status_code=303)
 
     student_id = int(user.get("id") or user.get("sub"))
-    total_applications = db.query(Application).filter(Application.student_id == student_id).count() or 0
-    accepted = db.query(Application).filter(Application.student_id == student_id, Application.status == "accepted").count() or 0
-    shortlisted = db.query(Application).filter(Application.student_id == student_id, Application.status == "shortlisted").count() or 0
-    pending = db.query(Application).filter(Application.student_id == student_id, Application.status == "pending").count() or 0
-    rejected = db.query(Application).filter(Application.student_id == student_id, Application.status == "rejected").count() or 0
+    counts = await db.run_sync(student_application_counts, student_id)
 
     # Recent applications: join Application, Project, and Professor; order by apply time
-    recent_applications = (
-        db.query(Application, Project, Professor)
+    recent_applications = (await db.execute(
+        select(Application, Project, Professor)
         .join(Project, Application.project_id == Project.id)
         .join(Professor, Project.professor_id == Professor.id)
-        .filter(Application.student_id == student_id)
+        .where(Application.student_id == student_id)
         .order_by(Application.applied_at.desc())
         .limit(5)
-        .all()
-    )
+    )).all()
 
-    student = db.query(Student).filter(Student.id == student_id).first()
-    skills = (student.skills_summary.split(',') if student and student.skills_summary else [])
+    skills = (await db.run_sync(student_skill_names, [student_id]))[student_id]
+    recommended = await db.run_sync(recommend_projects, student_id)
 
     return templates.TemplateResponse("student_dashboard.html", {
         "request": request,
         "user": user,
-        "total_applications": total_applications,
-        "accepted": accepted,
-        "shortlisted": shortlisted,
-        "pending": pending,
-        "rejected": rejected,
+        **counts,
         "skills": skills,
+        "recommended": recommended,
         "recent_applications": recent_applications
     })
 
 #to get the student profile page 
 
 @router.get("/profile/student", response_class=HTMLResponse)
-async def get_student_profile(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_student_profile(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "student":
         return RedirectResponse(url="/", status_code=303)
 
     student_id = int(user.get("id") or user.get("sub"))
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         return RedirectResponse(url="/logout")
 
@@ -418,6 +442,7 @@ async def get_student_profile(request: Request, db: Session = Depends(get_db), u
 @router.post("/profile/student/update", response_class=HTMLResponse)
 async def update_student_profile_endpoint(
     request: Request,
+    background_tasks: BackgroundTasks,
     name: str = Form(None),
     gender: str = Form(None),
     dob: str = Form(None),
@@ -441,7 +466,7 @@ async def update_student_profile_endpoint(
     emergency_relationship: str = Form(None),
     resume_link: str = Form(None),
     profile_pic: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user)
 ):
     if user.get("role") != "student":
@@ -449,16 +474,12 @@ async def update_student_profile_endpoint(
 
     photo_url = None
     if profile_pic and profile_pic.filename:
-        import os
-        from uuid import uuid4
-        _, ext = os.path.splitext(profile_pic.filename)
-        filename = f"{uuid4().hex}{ext}"
-        save_dir = "static/profile_photos"
-        os.makedirs(save_dir, exist_ok=True)
-        save_path = os.path.join(save_dir, filename)
-        with open(save_path, "wb") as f:
-            f.write(await profile_pic.read())
-        photo_url = f"/static/profile_photos/{filename}"
+        try:
+            photo_url, photo_path = await save_profile_photo(profile_pic)
+        except UploadRejected as e:
+            student = await db.get(Student, int(user.get("id") or user.get("sub")))
+            return templates.TemplateResponse("student_profile.html", {"request": request, "student": student, "user": user, "error": str(e)})
+        background_tasks.add_task(make_thumbnail, photo_path)
 
     update_data = StudentUpdateRequest(
         name=name,
@@ -486,35 +507,43 @@ async def update_student_profile_endpoint(
         profile_pic=photo_url
     )
     student_id = int(user.get("id") or user.get("sub"))
-    error = update_student_profile(db, student_id, update_data)
-    student = db.query(Student).filter(Student.id == student_id).first()
+    error = await update_student_profile_async(db, student_id, update_data)
+    student = await db.get(Student, student_id)
     if error:
         return templates.TemplateResponse("student_profile.html", {"request": request, "student": student, "user": user, "error": error})
 
+    reissue_access_token(request, student, "student")
     return templates.TemplateResponse("student_profile.html", {"request": request, "student": student, "user": user, "message": "Profile updated successfully!"})
 
 #to get the browse project page for the student 
 
 @router.get("/student/browse-projects", response_class=HTMLResponse)
-async def browse_projects_student(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    from model import Project, Professor, Application  # import your models
-
-    # For filters, you can process query params here (not covered in this step)
-    projects = (
-        db.query(Project, Professor)
-        .join(Professor, Project.professor_id == Professor.id)
-        .filter(Project.status == "active", Project.applications_open == True)
-        .all()
+async def browse_projects_student(
+    request: Request,
+    q: str = None,
+    professor: str = None,
+    department: str = None,
+    skill: str = None,
+    cursor: int = None,
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_user)
+):
+    # Empty dropdown values arrive as "" from the GET form
+    professor = int(professor) if professor and professor.isdigit() else None
+    projects, next_cursor, truncated = await db.run_sync(
+        catalog_page, search=q, professor_id=professor, department=department, skill=skill, cursor=cursor
     )
-
-    # Professors list for filter dropdowns (optional)
-    professors = db.query(Professor).all()
+    professors = await db.run_sync(professor_list)
 
     return templates.TemplateResponse("student_browseproject.html", {
         "request": request,
         "user": user,
         "projects": projects,
+        "next_cursor": next_cursor,
+        "truncated": truncated,
+        "filters": {"q": q or "", "professor": professor, "department": department or "", "skill": skill or ""},
         "professors": professors,
+        "departments": department_options(professors),
     })
 
 #handles the logic wen apply is clicked on the browse project page in any project
@@ -524,7 +553,7 @@ async def apply_project_student(
     request: Request,
     project_id: int = Form(...),
     message: str = Form(""),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user)
 ):
     from model import Application, Project
@@ -533,35 +562,46 @@ async def apply_project_student(
         return RedirectResponse(url="/login", status_code=303)
     student_id = int(user.get("id") or user.get("sub"))
 
-    # Check not already applied
-    exists = db.query(Application).filter(
-        Application.student_id == student_id,
-        Application.project_id == project_id
-    ).first()
-    if exists:
-        # Get projects and professors data for the template
-        projects = (
-            db.query(Project, Professor)
-            .join(Professor, Project.professor_id == Professor.id)
-            .filter(Project.status == "active", Project.applications_open == True)
-            .all()
-        )
-        professors = db.query(Professor).all()
+    async def already_applied():
+        # Re-render the first catalog page with the error
+        projects, next_cursor, _ = await db.run_sync(catalog_page)
+        professors = await db.run_sync(professor_list)
         return templates.TemplateResponse("student_browseproject.html", {
             "request": request,
             "user": user,
             "projects": projects,
+            "next_cursor": next_cursor,
+            "filters": {"q": "", "professor": None, "department": "", "skill": ""},
             "professors": professors,
+            "departments": department_options(professors),
             "error": "You have already applied to this project."
         })
 
+    # Check not already applied
+    exists = await db.scalar(select(Application.id).where(
+        Application.student_id == student_id,
+        Application.project_id == project_id
+    ))
+    if exists:
+        return await already_applied()
+
     application = Application(
         student_id=student_id,
         project_id=project_id,
         status="pending",
     )
     db.add(application)
-    db.commit()
+    try:
+        await db.run_sync(invalidate, "application_counts", student_id)
+        await db.run_sync(invalidate, "project_application_counts", project_id)
+        professor_id = await db.scalar(select(Project.professor_id).where(Project.id == project_id))
+        await db.run_sync(invalidate, "professor_counts", professor_id)
+        await db.run_sync(invalidate_project, project_id)
+        await db.commit()
+    except IntegrityError:
+        # A concurrent apply (double click) won the UNIQUE(student_id, project_id) race
+        await db.rollback()
+        return await already_applied()
 
     # Success - return to browse page with a message
     return RedirectResponse("/student/browse-projects", status_code=303)
@@ -570,100 +610,200 @@ async def apply_project_student(
 #to get the applications tab in professor
 
 @router.get("/professor/applications", response_class=HTMLResponse)
-async def professor_applications(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    from model import Professor, Project, Application, Student
+async def professor_applications(
+    request: Request,
+    status: str = None,
+    project_id: int = None,
+    sort: str = "newest",
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_user),
+):
     professor_id = int(user.get("id") or user.get("sub"))
-    # Get all projects owned by this professor
-    projects = db.query(Project).filter(Project.professor_id == professor_id).all()
-    project_ids = [proj.id for proj in projects]
-    # Get all applications for those projects with student and project info
-    applications = (
-        db.query(Application, Student, Project)
-        .join(Student, Application.student_id == Student.id)
-        .join(Project, Application.project_id == Project.id)
-        .filter(Application.project_id.in_(project_ids))
-        .order_by(Application.applied_at.desc())
-        .all()
+    sort = sort if sort in APPLICATION_SORTS else "newest"
+    # First page only; the rest is appended from /api/professor/applications
+    # as the table is scrolled
+    applications, next_cursor = await db.run_sync(
+        professor_application_page, professor_id, status=status, project_id=project_id, sort=sort
     )
+    projects = await db.run_sync(professor_project_options, professor_id)
     return templates.TemplateResponse("professor_applications.html", {
         "request": request,
         "user": user,
-        "applications": applications
+        "applications": applications,
+        "next_cursor": next_cursor,
+        "projects": projects,
+        "statuses": APPLICATION_STATUSES,
+        "filters": {"status": status or "", "project_id": project_id, "sort": sort},
     })
 
+# Keyset-paginated inbox, newest first or with sort=match best skill match
+# first; pass next_cursor back as ?cursor= with the same sort
+@router.get("/api/professor/applications")
+async def get_professor_applications(
+    request: Request,
+    status: str = None,
+    project_id: int = None,
+    cursor: str = None,
+    sort: str = "newest",
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_user),
+):
+    if user.get("role") != "professor":
+        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    if sort not in APPLICATION_SORTS:
+        return JSONResponse({"error": f"Unknown sort: {sort}"}, status_code=400)
+
+    professor_id = int(user.get("id") or user.get("sub"))
+    applications, next_cursor = await db.run_sync(
+        professor_application_page, professor_id, status=status, project_id=project_id, cursor=cursor, sort=sort
+    )
+    return conditional_json(request, {"applications": applications, "next_cursor": next_cursor})
+
 #to handle the status change of recieved applications
 
 @router.post("/professor/application/update-status", response_class=HTMLResponse)
-async def update_application_status(request: Request, application_id: int = Form(...), status: str = Form(...), db: Session = Depends(get_db), user=Depends(get_current_user)):
-    from model import Application
-    app = db.query(Application).filter(Application.id == application_id).first()
-    if not app:
-        return RedirectResponse("/professor/applications", status_code=303)
-    app.status = status
-    db.commit()
+async def update_application_status(request: Request, application_id: int = Form(...), status: str = Form(...), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    professor_id = int(user.get("id") or user.get("sub"))
+    if user.get("role") == "professor" and status.lower() in APPLICATION_STATUSES:
+        await db.run_sync(update_application_statuses, professor_id, [application_id], status)
+        await db.commit()
     return RedirectResponse("/professor/applications", status_code=303)
 
+# Multi-select status change from the applications page: one UPDATE for all
+# ids, results per id
+@router.post("/api/professor/applications/status")
+async def bulk_update_application_status(data: ApplicationStatusUpdateRequest, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    if user.get("role") != "professor":
+        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    if data.status.lower() not in APPLICATION_STATUSES:
+        return JSONResponse({"error": f"Unknown status: {data.status}"}, status_code=400)
+
+    professor_id = int(user.get("id") or user.get("sub"))
+    results = await db.run_sync(update_application_statuses, professor_id, data.application_ids, data.status)
+    await db.commit()
+    return {
+        "status": data.status.lower(),
+        "updated": sum(1 for result in results.values() if result == "updated"),
+        "results": results,
+    }
+
+# Spreadsheet of every application received, streamed from a server-side
+# cursor (export.py). format=csv|ndjson; gzip=true sends a .gz file, otherwise
+# CompressionMiddleware still compresses the stream on the wire.
+@router.get("/professor/applications/export")
+async def export_professor_applications(
+    request: Request,
+    format: str = "csv",
+    status: str = None,
+    project_id: int = None,
+    gzip: bool = False,
+    user=Depends(get_current_user),
+):
+    if user.get("role") != "professor":
+        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    if format not in EXPORT_FORMATS:
+        return JSONResponse({"error": f"Unknown format: {format}"}, status_code=400)
+
+    professor_id = int(user.get("id") or user.get("sub"))
+    pinned_until = request.cookies.get(PRIMARY_PIN_COOKIE, "")
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"applications.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        export_applications(
+            professor_id, format, status=status, project_id=project_id, gzip=gzip,
+            use_primary=pinned_until.isdigit() and int(pinned_until) > time(),
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "private, no-store"},
+    )
+
+# Bulk onboarding (bulk_import.py), off unless IMPORT_TOKEN is set. The body
+# is the CSV or JSONL file itself, e.g.
+#   curl -H "X-Import-Token: $IMPORT_TOKEN" -H "Content-Type: text/csv" \
+#        --data-binary @students.csv http://localhost:8000/api/import/student
+@router.post("/api/import/{kind}")
+async def bulk_import_endpoint(request: Request, kind: str, format: str = None):
+    token = request.headers.get("x-import-token", "")
+    if not IMPORT_TOKEN or not hmac.compare_digest(token.encode(), IMPORT_TOKEN.encode()):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    if kind not in IMPORT_KINDS:
+        return JSONResponse({"error": f"Unknown import kind: {kind}"}, status_code=404)
+    import_format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "jsonl")
+    if import_format not in IMPORT_FORMATS:
+        return JSONResponse({"error": f"Unknown format: {import_format}"}, status_code=400)
+
+    try:
+        return await import_stream(request.stream(), kind, import_format)
+    except ImportRejected as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+
 #API endpoint for students to view project details
 @router.get("/api/student/project/{project_id}")
-async def get_student_project_detail(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_student_project_detail(request: Request, project_id: int, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "student":
         return {"error": "Unauthorized"}, 401
     
-    project = db.query(Project).filter(Project.id == project_id, Project.status == "active", Project.applications_open == True).first()
+    validators = await db.run_sync(project_validators, project_id)
+    if not validators or validators["status"] != "active" or not validators["applications_open"]:
+        return {"error": "Project not found or not available"}, 404
+    updated_at = validators["updated_at"]
+    # Same for every student, so shared caches may serve it too; the 304
+    # path reads no Text columns
+    headers = validator_headers(etag_for("student-project", project_id, updated_at), updated_at, PUBLIC)
+    if is_not_modified(request, headers["ETag"], updated_at):
+        return not_modified_response(headers)
+    project = await db.run_sync(project_detail, project_id)
     if not project:
         return {"error": "Project not found or not available"}, 404
-    
-    return {
-        "id": project.id,
-        "title": project.title,
-        "status": project.status,
-        "introduction": project.introduction,
-        "problem_definition": project.problem_definition,
-        "objective": project.objective,
-        "methodology": project.methodology,
-        "scope": project.scope,
-        "timeline": project.timeline,
-        "updated_at": project.updated_at.strftime("%b %d, %Y") if project.updated_at else "",
-        "required_skills": project.required_skills,
-    }
+
+    return JSONResponse({
+        "id": project["id"],
+        "title": project["title"],
+        "status": project["status"],
+        "introduction": project["introduction"],
+        "problem_definition": project["problem_definition"],
+        "objective": project["objective"],
+        "methodology": project["methodology"],
+        "scope": project["scope"],
+        "timeline": project["timeline"],
+        "updated_at": updated_at.strftime("%b %d, %Y") if updated_at else "",
+        "required_skills": project["required_skills"],
+    }, headers=headers)
+
+# Ranked full-text search over open projects
+@router.get("/api/student/search")
+async def search_projects_student(request: Request, q: str = "", limit: int = 20, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
+    if user.get("role") != "student":
+        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    limit = max(1, min(limit, 50))
+    return conditional_json(request, {"query": q, "results": await db.run_sync(search_projects, q, limit)})
 
 # API endpoint for student dashboard stats
 @router.get("/api/student/stats")
-async def get_student_stats(db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_student_stats(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "student":
         return {"error": "Unauthorized"}, 401
     
     student_id = int(user.get("id") or user.get("sub"))
-    total_applications = db.query(Application).filter(Application.student_id == student_id).count() or 0
-    accepted = db.query(Application).filter(Application.student_id == student_id, Application.status == "accepted").count() or 0
-    shortlisted = db.query(Application).filter(Application.student_id == student_id, Application.status == "shortlisted").count() or 0
-    pending = db.query(Application).filter(Application.student_id == student_id, Application.status == "pending").count() or 0
-    rejected = db.query(Application).filter(Application.student_id == student_id, Application.status == "rejected").count() or 0
-    
-    return {
-        "total_applications": total_applications,
-        "accepted": accepted,
-        "shortlisted": shortlisted,
-        "pending": pending,
-        "rejected": rejected
-    }
+    return conditional_json(request, await db.run_sync(student_application_counts, student_id))
 
 # API endpoint for student recent applications
 @router.get("/api/student/recent-applications")
-async def get_student_recent_applications(db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def get_student_recent_applications(request: Request, db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
     if user.get("role") != "student":
         return {"error": "Unauthorized"}, 401
     
     student_id = int(user.get("id") or user.get("sub"))
-    recent_applications = (
-        db.query(Application, Project, Professor)
+    recent_applications = (await db.execute(
+        select(Application, Project, Professor)
         .join(Project, Application.project_id == Project.id)
         .join(Professor, Project.professor_id == Professor.id)
-        .filter(Application.student_id == student_id)
+        .where(Application.student_id == student_id)
         .order_by(Application.applied_at.desc())
         .limit(5)
-        .all()
-    )
+    )).all()
     
     applications_data = []
     for app, project, prof in recent_applications:
@@ -676,14 +816,14 @@ async def get_student_recent_applications(db: Session = Depends(get_db), user=De
             "applied_at": app.applied_at.strftime('%b %d, %Y') if app.applied_at else 'N/A'
         })
     
-    return {"applications": applications_data}
+    return conditional_json(request, {"applications": applications_data})
 
 #when professor clicks view profile for an applicant this works
 
 @router.get("/professor/student-profile")
-async def professor_student_profile(student_id: int, db: Session = Depends(get_db)):
+async def professor_student_profile(request: Request, student_id: int, db: AsyncSession = Depends(get_read_db)):
     from model import Student
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         return JSONResponse({"error": "Student not found"}, status_code=404)
     # Return all useful profile fields
@@ -699,6 +839,7 @@ async def professor_student_profile(student_id: int, db: Session = Depends(get_d
         "bio": student.bio or "",
         "skills_summary": student.skills_summary or "",
         "profile_pic": student.profile_pic or "",
+        "profile_thumb": thumbnail_url(student.profile_pic) or "",
         "mailing_address": student.mailing_address or "",
         "previous_school": student.previous_school or "",
         "gpa": student.gpa or "",
@@ -713,27 +854,46 @@ async def professor_student_profile(student_id: int, db: Session = Depends(get_d
         "emergency_phone": getattr(student, "emergency_phone", ""),
         "emergency_email": getattr(student, "emergency_email", ""),
     }
-    return JSONResponse(student_data)
+    return conditional_json(request, student_data)
 
 #to get the my applications of student 
 
 @router.get("/student/my-applications", response_class=HTMLResponse)
-async def student_my_applications(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    from model import Application, Project, Professor
+async def student_my_applications(
+    request: Request,
+    status: str = None,
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_user),
+):
     student_id = int(user.get("id") or user.get("sub"))
-    # Get all applications submitted by this student
-    applications = (
-        db.query(Application, Project, Professor)
-        .join(Project, Application.project_id == Project.id)
-        .join(Professor, Project.professor_id == Professor.id)
-        .filter(Application.student_id == student_id)
-        .order_by(Application.applied_at.desc())
-        .all()
-    )
+    # First page only; the rest is appended from /api/student/applications
+    applications, next_cursor = await db.run_sync(student_application_page, student_id, status=status)
     return templates.TemplateResponse("student_myapps.html", {
         "request": request,
         "user": user,
-        "applications": applications
+        "applications": applications,
+        "next_cursor": next_cursor,
+        "statuses": APPLICATION_STATUSES,
+        "filters": {"status": status or ""},
     })
 
+# Keyset-paginated list of the student's applications, newest first
+@router.get("/api/student/applications")
+async def get_student_applications(
+    request: Request,
+    status: str = None,
+    project_id: int = None,
+    cursor: str = None,
+    db: AsyncSession = Depends(get_read_db),
+    user=Depends(get_current_user),
+):
+    if user.get("role") != "student":
+        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+
+    student_id = int(user.get("id") or user.get("sub"))
+    applications, next_cursor = await db.run_sync(
+        student_application_page, student_id, status=status, project_id=project_id, cursor=cursor
+    )
+    return conditional_json(request, {"applications": applications, "next_cursor": next_cursor})
+
 
@@ -1,19 +1,249 @@
-from sqlalchemy import create_engine
+import itertools
+import os
+from threading import Lock
+from time import perf_counter
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy_utils import create_database, database_exists
 
-DB_USER = "research_user"
-DB_PASS = "Sudhanshu2003"
-DB_HOST = "localhost"
-DB_PORT = "3306"
-DB_NAME = "research_collab"
+DB_USER = os.getenv("DB_USER", "research_user")
+DB_PASS = os.getenv("DB_PASS", "Sudhanshu2003")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "3306")
+DB_NAME = os.getenv("DB_NAME", "research_collab")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL overrides the MySQL default, e.g. sqlite:///./arc_portal.db for local runs
+DATABASE_URL = os.getenv("DATABASE_URL", f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
-# Create database if it doesn't exist
-if not database_exists(DATABASE_URL):
-    create_database(DATABASE_URL)
+# Read replicas for read-only request handlers, comma separated. Local testing
+# can use two SQLite files: DATABASE_URL=sqlite:///./primary.db
+# DATABASE_REPLICA_URLS=sqlite:///./replica.db
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
 
-engine = create_engine(DATABASE_URL, echo=False)
+# After a user writes, their reads stay on the primary for this long so they
+# see their own change despite replication lag
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Pool settings (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))      # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # below MySQL's wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "no")
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# Async drivers used by the request path for each sync URL scheme
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+# --- Pool instrumentation ---
+
+class PoolMetrics:
+    # Checkout wait times and timeouts for one pool; in-use/overflow counts
+    # are read from the pool itself in snapshot()
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.pool = None
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def snapshot(self):
+        pool = self.pool
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "timeouts": self.timeouts,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return stats
+
+
+def _instrumented(pool_class, metrics: PoolMetrics):
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                metrics.record_wait(perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(perf_counter() - start)
+            return connection
+
+        def recreate(self):
+            new_pool = super().recreate()
+            metrics.pool = new_pool
+            return new_pool
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+
+def _engine_options(url: str, pool_class, metrics: PoolMetrics):
+    if url.startswith("sqlite"):
+        # SQLite: no server-side pool to tune, just allow use across threads
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "poolclass": _instrumented(pool_class, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"connect_timeout": DB_CONNECT_TIMEOUT},
+    }
+
+
+# Sync engine: Alembic and the maintenance scripts
+engine = create_engine(DATABASE_URL, echo=False, **_engine_options(DATABASE_URL, QueuePool, sync_pool_metrics))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+sync_pool_metrics.pool = engine.pool
+
+# Async engine: every request handler (see controller.get_db). expire_on_commit
+# is off so rows stay readable in templates after a commit without lazy IO.
+ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, echo=False, **_engine_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, async_pool_metrics)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+async_pool_metrics.pool = async_engine.sync_engine.pool
+
+# Replica engines (async only; writes and scripts always use the primary)
+replica_pool_metrics = []
+replica_engines = []
+ReplicaSessionLocals = []
+for _index, _url in enumerate(DATABASE_REPLICA_URLS):
+    _metrics = PoolMetrics(f"replica{_index}")
+    _replica_url = async_url(_url)
+    _replica_engine = create_async_engine(
+        _replica_url, echo=False, **_engine_options(_replica_url, AsyncAdaptedQueuePool, _metrics)
+    )
+    _metrics.pool = _replica_engine.sync_engine.pool
+    replica_pool_metrics.append(_metrics)
+    replica_engines.append(_replica_engine)
+    ReplicaSessionLocals.append(async_sessionmaker(_replica_engine, autoflush=False, expire_on_commit=False))
+_replica_cycle = itertools.cycle(ReplicaSessionLocals) if ReplicaSessionLocals else None
+
+
+def read_session_factory(use_primary: bool = False):
+    # Round-robin over the replicas; the primary when none are configured or
+    # the caller is inside its read-your-writes window
+    if use_primary or _replica_cycle is None:
+        return AsyncSessionLocal
+    return next(_replica_cycle)
+
 Base = declarative_base()
+
+
+def pool_metrics():
+    # Pool usage per engine, e.g. {"sync": {...}, "async": {...}, "replica0": {...}}
+    stats = {"sync": sync_pool_metrics.snapshot(), "async": async_pool_metrics.snapshot()}
+    for metrics in replica_pool_metrics:
+        stats[metrics.name] = metrics.snapshot()
+    return stats
+
+
+# --- Statement hooks ---
+# Functions called as listener(statement, parameters, seconds) after every SQL
+# statement on every engine (primary, async and replicas): metrics.py and
+# query_audit.py register here. Start times are kept on a stack in conn.info
+# because statements can nest (e.g. an event handler issuing SQL); a failed
+# statement pops its own in handle_error, since after_cursor_execute does not
+# run for it.
+
+statement_listeners = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_start", []).append(perf_counter())
+    if context is not None:
+        context.statement_timed = True
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.statement_timed = False
+    seconds = perf_counter() - conn.info["statement_start"].pop()
+    for listener in statement_listeners:
+        listener(statement, parameters, seconds)
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    connection = exception_context.connection
+    if connection is not None and getattr(context, "statement_timed", False):
+        context.statement_timed = False
+        connection.info["statement_start"].pop()
+
+
+for _engine in (engine, async_engine.sync_engine, *(replica.sync_engine for replica in replica_engines)):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _handle_error)
+
+
+def init_db():
+    # Called once on startup (main.py) and by the scripts: brings the schema
+    # to the latest Alembic revision. The migrations are the only source of
+    # the schema; create_all is not used, so `alembic upgrade head` and app
+    # startup always agree. Databases created by create_all before this (no
+    # alembic_version table) are stamped 0001_baseline first; the later
+    # revisions skip objects that already exist.
+    if DATABASE_URL.startswith("mysql") and not database_exists(DATABASE_URL):
+        create_database(DATABASE_URL)
+    root = os.path.dirname(os.path.abspath(__file__))
+    config = Config(os.path.join(root, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(root, "migrations"))
+    with engine.begin() as connection:
+        mysql = connection.dialect.name == "mysql"
+        if mysql:
+            # Several workers start at once; one migrates, the rest wait
+            connection.execute(text("SELECT GET_LOCK('arc_portal_migrate', 300)"))
+        try:
+            config.attributes["connection"] = connection
+            tables = inspect(connection).get_table_names()
+            if "alembic_version" not in tables and "student" in tables:
+                command.stamp(config, "0001_baseline")
+            command.upgrade(config, "head")
+        finally:
+            if mysql:
+                connection.execute(text("SELECT RELEASE_LOCK('arc_portal_migrate')"))
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import zlib
+from sqlalchemy import select
+from database import read_session_factory
+from model import Application, Project, Student
+
+# Streaming export of the applications received by a professor. Rows come
+# from a server-side cursor (stream_results + yield_per) in batches of
+# EXPORT_BATCH_SIZE and each batch is written out as one chunk, so memory
+# stays flat however many applications there are.
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+EXPORT_COLUMNS = (
+    "application_id", "applied_at", "status", "project_id", "project_title",
+    "student_id", "student_name", "student_email",
+)
+
+
+def export_query(professor_id: int, status: str = None, project_id: int = None):
+    query = (
+        select(
+            Application.id,
+            Application.applied_at,
+            Application.status,
+            Application.project_id,
+            Project.title,
+            Application.student_id,
+            Student.name,
+            Student.email,
+        )
+        .join(Project, Application.project_id == Project.id)
+        .join(Student, Application.student_id == Student.id)
+        .where(Project.professor_id == professor_id)
+        .order_by(Application.applied_at.desc(), Application.id.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if status:
+        query = query.where(Application.status == status.lower())
+    if project_id:
+        query = query.where(Application.project_id == project_id)
+    return query
+
+
+def _record(row):
+    application_id, applied_at, status, project_id, title, student_id, name, email = row
+    return (
+        application_id, applied_at.isoformat(sep=" ") if applied_at else "", (status or "pending").lower(),
+        project_id, title, student_id, name, email,
+    )
+
+
+def _spreadsheet_safe(value):
+    # Text starting like a formula is prefixed so spreadsheets show it as text
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(records, header: bool = False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([_spreadsheet_safe(value) for value in record] for record in records)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(records):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, record)), ensure_ascii=False) + "\n" for record in records
+    )
+
+
+async def export_applications(
+    professor_id: int,
+    export_format: str = "csv",
+    status: str = None,
+    project_id: int = None,
+    gzip: bool = False,
+    use_primary: bool = False,
+):
+    # Async generator of bytes for a StreamingResponse. It opens its own
+    # session: the request's dependencies are closed before the body is sent.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits 31: gzip container
+    if export_format == "csv":
+        first = _csv_chunk([], header=True).encode("utf-8")
+        yield compressor.compress(first) if compressor else first
+
+    async with read_session_factory(use_primary)() as db:
+        result = await db.stream(export_query(professor_id, status, project_id))
+        async for rows in result.partitions():
+            records = [_record(row) for row in rows]
+            text = _csv_chunk(records) if export_format == "csv" else _ndjson_chunk(records)
+            data = text.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+
+    if compressor:
+        yield compressor.flush()
@@ -1,18 +1,77 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+from static_files import CachedStaticFiles
+from compression import CompressionMiddleware
 import controller
+from templating import templates
+from database import init_db, READ_YOUR_WRITES_SECONDS
+from time import time
+from password_pool import PasswordPoolBusy
+from auth import set_auth_cookies
+from metrics import CONTENT_TYPE, METRICS_TOKEN, MetricsMiddleware, render_metrics
+from query_audit import QueryAuditMiddleware
+from uploads import UploadLimitMiddleware
+import hmac
 
 app = FastAPI()
 app.include_router(controller.router)
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
+app.add_middleware(CompressionMiddleware)
+# Caps profile photo uploads before the multipart form is parsed
+app.add_middleware(UploadLimitMiddleware)
+
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    response = await call_next(request)
+    # A request that used the primary session (controller.get_db) keeps this
+    # browser's reads on the primary for a few seconds: read-your-writes
+    if getattr(request.state, "db_write", False):
+        response.set_cookie(
+            controller.PRIMARY_PIN_COOKIE,
+            str(int(time()) + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+        )
+    return response
+
+@app.middleware("http")
+async def set_refreshed_access_token(request: Request, call_next):
+    response = await call_next(request)
+    # get_current_user renewed an expired access token from the refresh cookie
+    access_token = getattr(request.state, "refreshed_access_token", None)
+    if access_token:
+        set_auth_cookies(response, access_token)
+    return response
+
+# Per-request SQL tracing; a pass-through unless QUERY_AUDIT=1 (query_audit.py)
+app.add_middleware(QueryAuditMiddleware)
+
+# Outermost, so request timings include every middleware above
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+@app.on_event("startup")
+def migrate_database():
+    # alembic upgrade head (safe to run repeatedly; see database.init_db)
+    init_db()
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy(request: Request, exc: PasswordPoolBusy):
+    # Too many logins/registrations in flight; ask the client to back off
+    return PlainTextResponse("Server busy, please retry shortly.", status_code=503, headers={"Retry-After": "2"})
 
 @app.get("/", response_class=HTMLResponse)
 async def serve_landing(request: Request):
     return templates.TemplateResponse("landing.html", {"request": request})
 
+@app.get("/metrics", include_in_schema=False)
+async def serve_metrics(request: Request):
+    # Prometheus scrape endpoint; see metrics.py
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return PlainTextResponse("Unauthorized", status_code=401)
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
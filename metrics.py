@@ -0,0 +1,281 @@
+import os
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter, time
+from starlette.routing import Mount
+from auth import verified_tokens
+from cache import cache_stats
+from database import pool_metrics, statement_listeners
+from templating import fragment_cache
+
+# Request metrics in Prometheus text format, served at /metrics (main.py).
+# MetricsMiddleware times every HTTP request and labels it with the route
+# template ("/api/student/project/{project_id}"), so ids in URLs do not blow
+# up the number of series. SQL statements are counted per request through
+# database.statement_listeners. Recording is a few counter updates under one
+# lock per request, cheap enough to leave on in production.
+#
+# The registry lives in each worker process. Every series carries a "pid"
+# label, so with several uvicorn/gunicorn workers each scrape returns the
+# numbers of whichever worker answered and the series of different workers
+# never mix; aggregate across them in the queries, e.g.
+#
+#   sum without (pid) (rate(arc_http_requests_total[5m]))
+#
+# arc_process_start_time_seconds tells restarted workers (counter resets)
+# apart.
+#
+# METRICS_TOKEN, when set, must be sent as "Authorization: Bearer <token>".
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds (+Inf is implied)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+UNMATCHED_ROUTE = "<unmatched>"
+PROCESS_LABELS = {"pid": str(os.getpid())}
+PROCESS_START_TIME = time()
+
+
+def _reset_process_labels():
+    # Workers forked from a preloading master (gunicorn --preload) get their
+    # own pid label and start time
+    global PROCESS_START_TIME
+    PROCESS_LABELS["pid"] = str(os.getpid())
+    PROCESS_START_TIME = time()
+
+
+os.register_at_fork(after_in_child=_reset_process_labels)
+
+
+class Histogram:
+    # Cumulative counts are only computed when rendering
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestStats:
+    # SQL issued while serving one request, filled in by _record_statement
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+current_request = ContextVar("current_request", default=None)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = Lock()
+        self.in_flight = 0
+        self.requests = {}      # (method, route, status) -> count
+        self.durations = {}     # (method, route) -> Histogram, and the same for the others
+        self.sizes = {}
+        self.statements = {}
+        self.db_seconds = {}
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            counter = (method, route, str(status))
+            self.requests[counter] = self.requests.get(counter, 0) + 1
+            for histograms, buckets, value in (
+                (self.durations, DURATION_BUCKETS, seconds),
+                (self.sizes, SIZE_BUCKETS, size),
+                (self.statements, STATEMENT_BUCKETS, stats.statements),
+                (self.db_seconds, DB_TIME_BUCKETS, stats.db_seconds),
+            ):
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = Histogram(buckets)
+                histogram.observe(value)
+
+    def snapshot(self):
+        copy = lambda histograms: {
+            key: (histogram.buckets, list(histogram.counts), histogram.sum) for key, histogram in histograms.items()
+        }
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "requests": dict(self.requests),
+                "durations": copy(self.durations),
+                "sizes": copy(self.sizes),
+                "statements": copy(self.statements),
+                "db_seconds": copy(self.db_seconds),
+            }
+
+
+registry = Registry()
+
+
+# --- SQL hook ---
+
+def _record_statement(statement, parameters, seconds):
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += seconds
+
+
+statement_listeners.append(_record_statement)
+
+
+# --- Middleware ---
+
+def route_label(scope, routes) -> str:
+    # The matched route's path template; FastAPI leaves the route in the scope
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    for mount in routes:
+        if isinstance(mount, Mount) and scope["path"].startswith(mount.path + "/"):
+            return mount.path + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    # Pure ASGI and added last (outermost), so the time and size cover the
+    # other middleware, compression included
+    def __init__(self, app, routes=()):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.started()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.finished(
+                scope["method"], route_label(scope, self.routes), status, perf_counter() - start, size, stats
+            )
+            current_request.reset(token)
+
+
+# --- Exposition ---
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    labels = {**PROCESS_LABELS, **labels}
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples):
+        # samples: (labels dict, value) pairs
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(**labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, histograms, label_names):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for key, (buckets, counts, total) in sorted(histograms.items()):
+            labels = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), counts):
+                cumulative += count
+                self.lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+            self.lines.append(f"{name}_sum{_labels(**labels)} {_number(total)}")
+            self.lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    snapshot = registry.snapshot()
+    out = _Writer()
+    route_labels = ("method", "route")
+
+    out.metric("arc_process_start_time_seconds", "gauge", "Start time of this worker process (Unix time).",
+               [({}, PROCESS_START_TIME)])
+    out.metric("arc_http_requests_in_flight", "gauge", "HTTP requests being served.",
+               [({}, snapshot["in_flight"])])
+    out.metric("arc_http_requests_total", "counter", "HTTP requests by route and status code.", [
+        ({"method": method, "route": route, "status": status}, count)
+        for (method, route, status), count in sorted(snapshot["requests"].items())
+    ])
+    out.histogram("arc_http_request_duration_seconds", "Time to serve a request, body included.",
+                  snapshot["durations"], route_labels)
+    out.histogram("arc_http_response_size_bytes", "Response body bytes sent, after compression.",
+                  snapshot["sizes"], route_labels)
+    out.histogram("arc_http_request_db_statements", "SQL statements executed per request.",
+                  snapshot["statements"], route_labels)
+    out.histogram("arc_http_request_db_seconds", "Time spent in SQL statements per request.",
+                  snapshot["db_seconds"], route_labels)
+
+    pools = pool_metrics()
+    out.metric("arc_db_pool_checkouts_total", "counter", "Connections checked out of the pool.",
+               [({"pool": name}, stats["checkouts"]) for name, stats in pools.items()])
+    out.metric("arc_db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection.",
+               [({"pool": name}, stats["wait_seconds_total"]) for name, stats in pools.items()])
+    out.metric("arc_db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.",
+               [({"pool": name}, stats["timeouts"]) for name, stats in pools.items()])
+    for field, help_text in (("in_use", "Connections checked out."), ("idle", "Idle pooled connections."),
+                             ("overflow", "Connections open beyond pool_size.")):
+        out.metric(f"arc_db_pool_{field}", "gauge", help_text,
+                   [({"pool": name}, stats[field]) for name, stats in pools.items() if field in stats])
+
+    cache = cache_stats()
+    namespaces = sorted(cache["namespaces"].items())
+    out.metric("arc_cache_bytes", "gauge", "Bytes held by the in-process read cache.", [({}, cache["bytes"])])
+    out.metric("arc_cache_entries", "gauge", "Entries in the in-process read cache.",
+               [({"namespace": name}, stats["entries"]) for name, stats in namespaces])
+    for field in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        out.metric(f"arc_cache_{field}_total", "counter", f"Read cache {field}.",
+                   [({"namespace": name}, stats[field]) for name, stats in namespaces])
+
+    for prefix, stats in (("arc_verified_token_cache", verified_tokens.stats()),
+                          ("arc_fragment_cache", fragment_cache.stats())):
+        out.metric(f"{prefix}_entries", "gauge", "Entries in the cache.", [({}, stats["entries"])])
+        out.metric(f"{prefix}_hits_total", "counter", "Cache hits.", [({}, stats["hits"])])
+        out.metric(f"{prefix}_misses_total", "counter", "Cache misses.", [({}, stats["misses"])])
+    return out.render()
@@ -0,0 +1,46 @@
+import hashlib
+import os
+
+from database import SessionLocal
+from model import Student, Professor
+from uploads import PHOTO_DIR, PHOTO_URL_PREFIX, make_thumbnail
+
+def migrate():
+    # Renames uuid-named photos to their content hash (merging byte-identical
+    # copies), repoints the profile_pic columns and builds missing thumbnails
+    db = SessionLocal()
+    try:
+        renamed = merged = 0
+        for filename in sorted(os.listdir(PHOTO_DIR)):
+            path = os.path.join(PHOTO_DIR, filename)
+            if not os.path.isfile(path) or filename.endswith(".part"):
+                continue
+            name, ext = os.path.splitext(filename)
+            ext = ".jpg" if ext.lower() == ".jpeg" else ext.lower()
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:32]
+            new_filename = f"{digest}{ext}"
+            new_path = os.path.join(PHOTO_DIR, new_filename)
+            if new_filename != filename:
+                if os.path.exists(new_path):
+                    os.remove(path)
+                    merged += 1
+                else:
+                    os.replace(path, new_path)
+                    renamed += 1
+                old_url, new_url = PHOTO_URL_PREFIX + filename, PHOTO_URL_PREFIX + new_filename
+                for UserModel in (Student, Professor):
+                    db.query(UserModel).filter(UserModel.profile_pic == old_url).update(
+                        {UserModel.profile_pic: new_url}, synchronize_session=False
+                    )
+            make_thumbnail(new_path)
+        db.commit()
+        print(f"Renamed {renamed} photos, merged {merged} duplicates")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate()
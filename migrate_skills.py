@@ -0,0 +1,17 @@
+from database import SessionLocal, init_db
+from model import Skill, ProjectSkill, StudentSkill
+
+def migrate():
+    # The skill tables and their backfill from Project.required_skills /
+    # Student.skills_summary are migration 0007_skill_tables, which app
+    # startup also runs; this applies it (and any other pending revision)
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"Distinct skills: {db.query(Skill).count()}")
+        print(f"Project links: {db.query(ProjectSkill).count()}, student links: {db.query(StudentSkill).count()}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate()
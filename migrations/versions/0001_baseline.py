@@ -0,0 +1,102 @@
+"""baseline: schema as created by Base.metadata.create_all before migrations
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+The app runs `alembic upgrade head` on startup (database.init_db); create_all
+is no longer used. Databases created by create_all in older versions (tables
+but no alembic_version) are stamped with this revision automatically, or by
+hand before upgrading:
+
+    alembic stamp 0001_baseline
+    alembic upgrade head
+
+The later revisions skip indexes, columns and tables that such a database
+already has.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NOW = sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade():
+    op.create_table(
+        "student",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(150), nullable=False, unique=True),
+        sa.Column("password", sa.String(128), nullable=False),
+        sa.Column("profile_pic", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("branch", sa.String(100)),
+        sa.Column("semester", sa.String(20)),
+        sa.Column("bio", sa.Text),
+        sa.Column("skills_summary", sa.Text),
+        sa.Column("resume_link", sa.String(255)),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=NOW),
+    )
+    op.create_table(
+        "professor",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(150), nullable=False, unique=True),
+        sa.Column("password", sa.String(128), nullable=False),
+        sa.Column("department", sa.String(100)),
+        sa.Column("office_location", sa.String(100)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("affiliation", sa.String(150)),
+        sa.Column("bio", sa.Text),
+        sa.Column("expertise", sa.Text),
+        sa.Column("research_interests", sa.Text),
+        sa.Column("education", sa.Text),
+        sa.Column("cv_link", sa.String(255)),
+        sa.Column("awards", sa.Text),
+        sa.Column("publications", sa.Text),
+        sa.Column("memberships", sa.Text),
+        sa.Column("social_links", sa.Text),
+        sa.Column("profile_pic", sa.String(255)),
+        sa.Column("pronouns", sa.String(50)),
+        sa.Column("pronunciation", sa.String(255)),
+        sa.Column("titles", sa.String(200)),
+        sa.Column("grants", sa.Text),
+        sa.Column("news", sa.Text),
+        sa.Column("other_info", sa.Text),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=NOW),
+    )
+    op.create_table(
+        "project",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("professor_id", sa.Integer, sa.ForeignKey("professor.id"), nullable=False),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("introduction", sa.Text),
+        sa.Column("problem_definition", sa.Text),
+        sa.Column("objective", sa.Text),
+        sa.Column("methodology", sa.Text),
+        sa.Column("scope", sa.Text),
+        sa.Column("timeline", sa.Text),
+        sa.Column("applications_open", sa.Boolean),
+        sa.Column("status", sa.String(20)),
+        sa.Column("required_skills", sa.Text),
+        sa.Column("created_at", sa.DateTime, server_default=NOW),
+        sa.Column("updated_at", sa.DateTime, server_default=NOW),
+    )
+    op.create_table(
+        "application",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("project_id", sa.Integer, sa.ForeignKey("project.id"), nullable=False),
+        sa.Column("student_id", sa.Integer, sa.ForeignKey("student.id"), nullable=False),
+        sa.Column("status", sa.String(20)),
+        sa.Column("applied_at", sa.DateTime, server_default=NOW),
+    )
+
+
+def downgrade():
+    for table in ("application", "project", "professor", "student"):
+        op.drop_table(table)
@@ -0,0 +1,69 @@
+"""composite indexes for dashboard/browse queries, one application per student and project
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_hot_query_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def _create_index(inspector, name, table, columns):
+    # Databases created by create_all before startup ran the migrations may
+    # already have the index (see 0001_baseline)
+    if name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Older rows may contain double applications (the check in
+    # apply_project_student is not atomic); keep the earliest one
+    op.execute(
+        "DELETE FROM application WHERE id NOT IN ("
+        " SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM application GROUP BY student_id, project_id) AS keep"
+        ")"
+    )
+
+    if "uq_application_student_project" not in {
+        constraint["name"] for constraint in inspector.get_unique_constraints("application")
+    }:
+        with op.batch_alter_table("application") as batch:
+            batch.create_unique_constraint("uq_application_student_project", ["student_id", "project_id"])
+    _create_index(inspector, "ix_application_student_status", "application", ["student_id", "status"])
+    _create_index(inspector, "ix_application_project_applied", "application", ["project_id", "applied_at"])
+
+    _create_index(inspector, "ix_project_professor_updated", "project", ["professor_id", "updated_at"])
+    _create_index(inspector, "ix_project_professor_created", "project", ["professor_id", "created_at"])
+    _create_index(inspector, "ix_project_status_open", "project", ["status", "applications_open", "id"])
+
+    # create_all already adds the FULLTEXT index on MySQL databases set up
+    # after search.py was introduced
+    existing = {index["name"] for index in inspector.get_indexes("project")}
+    if bind.dialect.name == "mysql" and "ft_project_text" not in existing:
+        op.create_index(
+            "ft_project_text",
+            "project",
+            ["title", "introduction", "objective", "methodology", "required_skills"],
+            mysql_prefix="FULLTEXT",
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        op.drop_index("ft_project_text", table_name="project")
+    op.drop_index("ix_project_status_open", table_name="project")
+    op.drop_index("ix_project_professor_created", table_name="project")
+    op.drop_index("ix_project_professor_updated", table_name="project")
+    op.drop_index("ix_application_project_applied", table_name="application")
+    op.drop_index("ix_application_student_status", table_name="application")
+    with op.batch_alter_table("application") as batch:
+        batch.drop_constraint("uq_application_student_project", type_="unique")
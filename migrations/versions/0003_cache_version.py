@@ -0,0 +1,39 @@
+"""cache_version table for cross-worker cache invalidation
+
+Revision ID: 0003_cache_version
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_cache_version"
+down_revision = "0002_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+# Keep in step with cache.CACHE_POLICIES (the in-process namespaces; those in
+# cache.SHARED_CACHE_TTLS are invalidated in the shared backend instead)
+NAMESPACES = ("project", "professors")
+
+
+def upgrade():
+    bind = op.get_bind()
+    table = sa.table("cache_version", sa.column("name", sa.String), sa.column("version", sa.Integer))
+    if sa.inspect(bind).has_table("cache_version"):
+        # Created by create_all before startup ran the migrations
+        existing = set(bind.execute(sa.select(table.c.name)).scalars())
+    else:
+        op.create_table(
+            "cache_version",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("version", sa.Integer, nullable=False),
+        )
+        existing = set()
+    missing = [{"name": name, "version": 0} for name in NAMESPACES if name not in existing]
+    if missing:
+        op.bulk_insert(table, missing)
+
+
+def downgrade():
+    op.drop_table("cache_version")
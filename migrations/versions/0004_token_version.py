@@ -0,0 +1,27 @@
+"""token_version on student and professor for refresh token revocation
+
+Revision ID: 0004_token_version
+Revises: 0003_cache_version
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_token_version"
+down_revision = "0003_cache_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in ("student", "professor"):
+        if "token_version" in {column["name"] for column in inspector.get_columns(table)}:
+            continue  # created by create_all before startup ran the migrations
+        op.add_column(table, sa.Column("token_version", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade():
+    for table in ("student", "professor"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("token_version")
@@ -0,0 +1,24 @@
+"""index for the keyset-paginated my-applications pages
+
+Revision ID: 0005_application_keyset_index
+Revises: 0004_token_version
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_application_keyset_index"
+down_revision = "0004_token_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("application")}
+    if "ix_application_student_applied" in existing:
+        return  # created by create_all before startup ran the migrations
+    op.create_index("ix_application_student_applied", "application", ["student_id", "applied_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_application_student_applied", table_name="application")
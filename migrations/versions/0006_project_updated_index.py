@@ -0,0 +1,24 @@
+"""index for the project index catch-up reads
+
+Revision ID: 0006_project_updated_index
+Revises: 0005_application_keyset_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_project_updated_index"
+down_revision = "0005_application_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("project")}
+    if "ix_project_updated" in existing:
+        return  # created by create_all before startup ran the migrations
+    op.create_index("ix_project_updated", "project", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_project_updated", table_name="project")
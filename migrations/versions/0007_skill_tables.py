@@ -0,0 +1,89 @@
+"""skill, project_skill and student_skill, backfilled from the comma-separated columns
+
+Revision ID: 0007_skill_tables
+Revises: 0006_project_updated_index
+Create Date: 2026-10-18
+
+Projects and students without any skill links get them from
+Project.required_skills / Student.skills_summary. On a database where
+create_all already made the tables, only those gaps are filled.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_skill_tables"
+down_revision = "0006_project_updated_index"
+branch_labels = None
+depends_on = None
+
+# A Table (not sa.table) so inserts report the new primary key
+skill = sa.Table(
+    "skill", sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True), sa.Column("name", sa.String), sa.Column("slug", sa.String),
+)
+
+
+def _parse(value):
+    # skills.parse_skills as of this revision: "Python, SQL ,python" -> ["Python", "SQL"]
+    seen = {}
+    for part in (value or "").split(","):
+        name = part.strip()
+        if name and name.lower() not in seen:
+            seen[name.lower()] = name[:100]
+    return list(seen.values())
+
+
+def _backfill(bind, owner_table, owner_column, value_column, link_table):
+    owner = sa.table(owner_table, sa.column("id", sa.Integer), sa.column(value_column, sa.Text))
+    link = sa.table(link_table, sa.column(owner_column, sa.Integer), sa.column("skill_id", sa.Integer))
+    slugs = {slug: skill_id for skill_id, slug in bind.execute(sa.select(skill.c.id, skill.c.slug))}
+    linked = set(bind.execute(sa.select(getattr(link.c, owner_column)).distinct()).scalars())
+    rows = bind.execute(sa.select(owner.c.id, getattr(owner.c, value_column))).all()
+    links = []
+    for owner_id, value in rows:
+        if owner_id in linked:
+            continue
+        skill_ids = []
+        for name in _parse(value):
+            slug = name.lower()[:100]
+            if slug not in slugs:
+                slugs[slug] = bind.execute(skill.insert().values(name=name, slug=slug)).inserted_primary_key[0]
+            skill_ids.append(slugs[slug])
+        links.extend({owner_column: owner_id, "skill_id": skill_id} for skill_id in dict.fromkeys(skill_ids))
+    if links:
+        op.bulk_insert(link, links)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Databases set up by create_all may already have the tables
+    if not inspector.has_table("skill"):
+        op.create_table(
+            "skill",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("slug", sa.String(100), nullable=False, unique=True),
+        )
+    if not inspector.has_table("project_skill"):
+        op.create_table(
+            "project_skill",
+            sa.Column("project_id", sa.Integer, sa.ForeignKey("project.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("skill_id", sa.Integer, sa.ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+        )
+        op.create_index("ix_project_skill_skill_id", "project_skill", ["skill_id", "project_id"])
+    if not inspector.has_table("student_skill"):
+        op.create_table(
+            "student_skill",
+            sa.Column("student_id", sa.Integer, sa.ForeignKey("student.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("skill_id", sa.Integer, sa.ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True),
+        )
+        op.create_index("ix_student_skill_skill_id", "student_skill", ["skill_id", "student_id"])
+
+    _backfill(bind, "project", "project_id", "required_skills", "project_skill")
+    _backfill(bind, "student", "student_id", "skills_summary", "student_skill")
+
+
+def downgrade():
+    for table in ("student_skill", "project_skill", "skill"):
+        op.drop_table(table)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, text, event, DDL, Index, UniqueConstraint
 from database import Base
 from sqlalchemy.orm import relationship
 
@@ -16,6 +16,7 @@ class Student(Base):
     bio = Column(Text)                                # NEW
     skills_summary = Column(Text)                     # NEW
     resume_link = Column(String(255))                 # NEW
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke refresh tokens
     created_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
 
 # --- Professor ---
@@ -45,6 +46,7 @@ class Professor(Base):
     grants = Column(Text)
     news = Column(Text)
     other_info = Column(Text)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke refresh tokens
     created_at = Column(DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
 
 class Project(Base):
@@ -64,8 +66,25 @@ class Project(Base):
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
     applications = relationship("Application", back_populates="project")
+    __table_args__ = (
+        Index("ix_project_professor_updated", "professor_id", "updated_at"),
+        Index("ix_project_professor_created", "professor_id", "created_at"),
+        Index("ix_project_status_open", "status", "applications_open", "id"),  # browse catalog
+        Index("ix_project_updated", "updated_at"),  # project index catch-up reads (project_index.py)
+    )
     # Add other fields as needed...
 
+# FULLTEXT index used by search.MySQLFulltextBackend (MySQL only; SQLite runs
+# use the in-process inverted index instead)
+event.listen(
+    Project.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE project ADD FULLTEXT INDEX ft_project_text "
+        "(title, introduction, objective, methodology, required_skills)"
+    ).execute_if(dialect="mysql"),
+)
+
 class Application(Base):
     __tablename__ = "application"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -75,4 +94,40 @@ class Application(Base):
     applied_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     project = relationship("Project", back_populates="applications")
     student = relationship("Student")
-    # Add other fields as needed...
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("student_id", "project_id", name="uq_application_student_project"),
+        Index("ix_application_student_status", "student_id", "status"),
+        Index("ix_application_project_applied", "project_id", "applied_at"),
+        Index("ix_application_student_applied", "student_id", "applied_at", "id"),  # my-applications pages
+    )
+    # Add other fields as needed...
+
+# --- Skills ---
+# Normalized form of Project.required_skills / Student.skills_summary. The
+# comma-separated columns are kept as the display copy and written through
+# skills.py together with these tables.
+class Skill(Base):
+    __tablename__ = "skill"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    slug = Column(String(100), unique=True, nullable=False)  # lower-cased lookup key
+
+class ProjectSkill(Base):
+    __tablename__ = "project_skill"
+    project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True)
+    __table_args__ = (Index("ix_project_skill_skill_id", "skill_id", "project_id"),)
+
+class StudentSkill(Base):
+    __tablename__ = "student_skill"
+    student_id = Column(Integer, ForeignKey("student.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skill.id", ondelete="CASCADE"), primary_key=True)
+    __table_args__ = (Index("ix_student_skill_skill_id", "skill_id", "student_id"),)
+
+# --- Cache versions ---
+# One row per cache namespace (see cache.py). A write bumps the version in its
+# own transaction; every worker compares against it to drop stale entries.
+class CacheVersion(Base):
+    __tablename__ = "cache_version"
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from utils import hash_password, check_password
+
+# bcrypt releases the GIL, so a small thread pool keeps the hashing off the
+# event loop without the pickling cost of a process pool.
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# At most this many hash/verify jobs may be running or waiting at once ...
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
+# ... and a request waits this long for a slot before it is turned away
+PASSWORD_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_QUEUE_TIMEOUT", "2.0"))
+# Requests waiting for a slot beyond this many are turned away at once, so a
+# login storm does not pile up coroutines (and their request bodies) that
+# would only time out
+PASSWORD_MAX_WAITERS = int(os.getenv("PASSWORD_MAX_WAITERS", "64"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+_slots = None
+_waiters = 0
+
+
+class PasswordPoolBusy(Exception):
+    # Raised when too many requests wait or the wait runs out; main.py turns
+    # it into a 503
+    pass
+
+
+async def _run(func, *args):
+    global _slots, _waiters
+    if _slots is None:
+        _slots = asyncio.Semaphore(PASSWORD_QUEUE_LIMIT)
+    if _slots.locked() and _waiters >= PASSWORD_MAX_WAITERS:
+        raise PasswordPoolBusy()
+    _waiters += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=PASSWORD_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PasswordPoolBusy()
+    finally:
+        _waiters -= 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def check_password_async(password: str, hashed: str) -> bool:
+    return await _run(check_password, password, hashed)
@@ -0,0 +1,147 @@
+import os
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+from cache_backend import get_cache_backend
+from model import Project
+
+# Keeps the in-process project indexes (search.InvertedIndexBackend and
+# recommend.RecommendationIndex) in step with the database in every worker.
+#
+#   - first use: every project is read and applied
+#   - commits in this worker: applied from the after_commit hook below, with
+#     the field values snapshotted at flush time
+#   - commits in other workers: each commit that touches a project bumps the
+#     shared generation gen:project_index; a worker that sees it move (checked
+#     at most every PROJECT_INDEX_CHECK_SECONDS) re-reads the projects updated
+#     since its last read, less INDEX_OVERLAP for commits that were in flight
+#
+# Commits that land while a read is running are buffered and applied after
+# its rows, so a project saved during the first load is not lost. The read
+# itself runs without the lock: under run_sync the query yields to the event
+# loop, and a request blocking on the lock in the loop's thread would never
+# let it resume.
+#
+# The generation lives in the shared cache backend (cache_backend.py), so
+# workers only see each other's commits with a shared backend such as Redis;
+# with memory:// each worker sees its own commits only. Deleted projects may
+# linger in other workers' indexes; both indexes re-check their candidates
+# against the project table, so they are never shown.
+
+PROJECT_INDEX_CHECK_SECONDS = float(os.getenv("PROJECT_INDEX_CHECK_SECONDS", "2"))
+INDEX_OVERLAP = timedelta(seconds=60)
+GENERATION_KEY = "gen:project_index"
+
+# Project columns any index needs (search.SEARCH_FIELDS plus the feed filter)
+INDEX_COLUMNS = (
+    "title", "required_skills", "introduction", "objective", "methodology", "status", "applications_open",
+)
+
+_syncs = []
+
+
+class ProjectIndexSync:
+    # apply(project_id, fields) updates one index entry, fields None meaning
+    # the project is gone; it must be idempotent
+    def __init__(self, apply):
+        self._apply = apply
+        self._lock = Lock()
+        self.loaded = False
+        self._loading = 0
+        self._buffer = {}
+        self._since = None
+        self._generation = None
+        self._checked_at = float("-inf")
+        _syncs.append(self)
+
+    def ensure_current(self, db: Session):
+        now = monotonic()
+        if self.loaded and now - self._checked_at < PROJECT_INDEX_CHECK_SECONDS:
+            return
+        self._checked_at = now
+        generation = get_cache_backend().get(GENERATION_KEY)
+        if self.loaded and generation == self._generation:
+            return
+
+        with self._lock:
+            self._loading += 1
+            since = self._since if self.loaded else None
+        try:
+            started = db.execute(select(func.current_timestamp())).scalar()
+            query = db.query(Project.id, *(getattr(Project, column) for column in INDEX_COLUMNS))
+            if since is not None:
+                query = query.filter(Project.updated_at >= since - INDEX_OVERLAP)
+            rows = [(row.id, dict(row._mapping)) for row in query.yield_per(1000)]
+        except Exception:
+            with self._lock:
+                self._finish_read()
+            raise
+
+        with self._lock:
+            for project_id, fields in rows:
+                self._apply(project_id, fields)
+            # Commits seen during the read are newer than its rows
+            for project_id, fields in self._buffer.items():
+                self._apply(project_id, fields)
+            self._finish_read()
+            self.loaded = True
+            self._since = started
+            self._generation = generation
+
+    def _finish_read(self):
+        self._loading -= 1
+        if not self._loading:
+            self._buffer.clear()
+
+    def committed(self, changes: dict, generation):
+        with self._lock:
+            if self._loading:
+                self._buffer.update(changes)
+            if self.loaded:
+                for project_id, fields in changes.items():
+                    self._apply(project_id, fields)
+                # Our own commit needs no re-read, unless another worker's
+                # commit moved the generation in between
+                if generation == (self._generation or 0) + 1:
+                    self._generation = generation
+
+
+# --- Commit hooks ---
+# Changed projects are snapshotted on the session at flush time and applied
+# only once the transaction commits, so rolled back writes never reach an
+# index (and no SQL is needed after the commit).
+
+@event.listens_for(Project, "after_insert")
+@event.listens_for(Project, "after_update")
+def _queue_project(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        fields = {column: getattr(target, column) for column in INDEX_COLUMNS}
+        session.info.setdefault("project_index_pending", {})[target.id] = fields
+
+
+@event.listens_for(Project, "after_delete")
+def _queue_project_removal(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("project_index_pending", {})[target.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_projects(session):
+    changes = session.info.pop("project_index_pending", None)
+    if not changes:
+        return
+    generation = get_cache_backend().incr(GENERATION_KEY)
+    for sync in _syncs:
+        sync.committed(changes, generation)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_committed_projects(session, previous_transaction):
+    # Savepoint rollbacks (begin_nested) keep what the outer transaction
+    # queued; only a rollback of the whole transaction discards it
+    if previous_transaction.nested is False and previous_transaction.parent is None:
+        session.info.pop("project_index_pending", None)
@@ -0,0 +1,199 @@
+import logging
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import statement_listeners
+
+# Development aid for finding query patterns that do not scale. With
+# QUERY_AUDIT=1 every request records the SQL it issues, and when it finishes
+# the "arc.queries" logger reports
+#
+#   - N+1 patterns: the same relationship lazy-loaded N_PLUS_ONE_THRESHOLD or
+#     more times in one request, e.g. application.project inside a loop
+#   - full-table reads: SELECTs with neither WHERE nor LIMIT
+#   - requests over QUERY_AUDIT_MAX_STATEMENTS statements
+#
+# The hooks are only registered when auditing is on or a query budget is
+# active, so production pays nothing for this module.
+#
+# Query budgets for tests (see query_budget below and tests/test_query_budgets.py):
+#
+#   from query_audit import query_budget
+#
+#   def test_student_dashboard(client):
+#       with query_budget(3):
+#           client.get("/dashboard/student")
+#
+# Both in-process clients work: starlette's TestClient and httpx over
+# ASGITransport.
+
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "0") not in ("0", "false", "no", "")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_AUDIT_N_PLUS_ONE", "3"))
+QUERY_AUDIT_MAX_STATEMENTS = int(os.getenv("QUERY_AUDIT_MAX_STATEMENTS", "20"))
+
+logger = logging.getLogger("arc.queries")
+
+_SELECT = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+_FILTERED = re.compile(r"\b(WHERE|LIMIT|FETCH\s+FIRST)\b", re.IGNORECASE)
+_FROM_TABLE = re.compile(r"\bFROM\s+([\w.`\"]+)", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    # An AssertionError so pytest reports it as a plain test failure
+    pass
+
+
+class QueryTrace:
+    # The SQL issued by one request (or one query_budget block)
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements = []        # (sql, seconds)
+        self.lazy_loads = Counter()  # "Model.relationship" -> loads
+        self.full_scans = []
+
+    def add(self, statement: str, seconds: float):
+        self.statements.append((statement, seconds))
+        if _SELECT.match(statement) and not _FILTERED.search(statement):
+            table = _FROM_TABLE.search(statement)
+            if table:
+                self.full_scans.append(statement)
+
+    def n_plus_one(self):
+        return {key: count for key, count in self.lazy_loads.items() if count >= N_PLUS_ONE_THRESHOLD}
+
+    def db_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def problems(self):
+        # One line per finding, empty when the trace looks healthy
+        found = [
+            f"N+1: {key} lazy-loaded {count} times" for key, count in sorted(self.n_plus_one().items())
+        ]
+        found += [f"full-table read: {_one_line(statement)}" for statement in self.full_scans]
+        if len(self.statements) > QUERY_AUDIT_MAX_STATEMENTS:
+            found.append(f"{len(self.statements)} statements (more than {QUERY_AUDIT_MAX_STATEMENTS})")
+        return found
+
+    def report(self) -> str:
+        lines = [f"{self.label}: {len(self.statements)} statements, {self.db_seconds() * 1000:.1f}ms in SQL"]
+        lines += [f"  {problem}" for problem in self.problems()]
+        return "\n".join(lines)
+
+    def listing(self) -> str:
+        return "\n".join(f"  {index}. {_one_line(sql)}" for index, (sql, _) in enumerate(self.statements, 1))
+
+
+def _one_line(statement: str, width: int = 200) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+current_trace = ContextVar("current_trace", default=None)
+
+_observers = []  # query_budget blocks waiting for traces of finished requests
+_observers_lock = Lock()
+
+
+# --- Hooks ---
+# SQL timing comes from the shared statement hook in database.py
+
+def _record_statement(statement, parameters, seconds):
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(statement, seconds)
+
+
+def _do_orm_execute(orm_execute_state):
+    trace = current_trace.get()
+    if trace is not None and orm_execute_state.lazy_loaded_from is not None:
+        path = orm_execute_state.loader_strategy_path
+        trace.lazy_loads[str(path[-1]) if len(path) else "unknown"] += 1
+
+
+_installed = False
+_install_lock = Lock()
+
+
+def install():
+    # Registers the hooks once; called at import when QUERY_AUDIT is on and
+    # by query_budget otherwise
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        statement_listeners.append(_record_statement)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        _installed = True
+
+
+if QUERY_AUDIT:
+    install()
+
+
+# --- Middleware ---
+
+class QueryAuditMiddleware:
+    # Gives each request its own trace while auditing is on or a query budget
+    # is waiting; otherwise it only passes the request through
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (QUERY_AUDIT or _observers):
+            await self.app(scope, receive, send)
+            return
+        trace = QueryTrace(f"{scope['method']} {scope['path']}")
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_trace.reset(token)
+            if QUERY_AUDIT:
+                if trace.problems():
+                    logger.warning(trace.report())
+                else:
+                    logger.debug(trace.report())
+            with _observers_lock:
+                for observer in _observers:
+                    observer.append(trace)
+
+
+# --- Test helper ---
+
+@contextmanager
+def query_budget(max_statements: int, allow_n_plus_one: bool = False):
+    # Fails (QueryBudgetExceeded) when the block issues more than
+    # max_statements SQL statements, counting its own queries and those of
+    # every request served meanwhile, or when one of them shows an N+1
+    # pattern. Usable as a decorator too.
+    install()
+    own = QueryTrace("query_budget block")
+    requests = []
+    token = current_trace.set(own)
+    with _observers_lock:
+        _observers.append(requests)
+    try:
+        yield own
+    finally:
+        current_trace.reset(token)
+        with _observers_lock:
+            _observers.remove(requests)
+
+    traces = [trace for trace in [own, *requests] if trace.statements]
+    total = sum(len(trace.statements) for trace in traces)
+    failures = []
+    if total > max_statements:
+        failures.append(f"{total} SQL statements, budget is {max_statements}")
+    if not allow_n_plus_one:
+        failures += [
+            f"N+1 in {trace.label}: {key} lazy-loaded {count} times"
+            for trace in traces for key, count in sorted(trace.n_plus_one().items())
+        ]
+    if failures:
+        details = "\n".join(f"{trace.label}:\n{trace.listing()}" for trace in traces)
+        raise QueryBudgetExceeded("\n".join(failures) + "\n" + details)
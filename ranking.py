@@ -0,0 +1,85 @@
+import numpy as np
+from sqlalchemy.orm import Session
+from cache import invalidate, shared_get_or_compute_many
+from model import Application, ProjectSkill, StudentSkill
+
+# Skill-match scores per project, {student_id: score 0..1}, kept in the shared
+# "match_scores" cache namespace (cache.py), so every worker sees the same
+# scores and the backend bounds their number and lifetime. A project's entry
+# is dropped when an application is added to it, when its skills change or
+# when one of its applicants edits their skills.
+
+
+def _score_projects(db: Session, project_ids):
+    # One batched pass over every applicant of the given projects
+    pairs = (
+        db.query(Application.project_id, Application.student_id)
+        .filter(Application.project_id.in_(project_ids))
+        .all()
+    )
+    scores = {project_id: {} for project_id in project_ids}
+    if not pairs:
+        return scores
+
+    project_rows = (
+        db.query(ProjectSkill.project_id, ProjectSkill.skill_id)
+        .filter(ProjectSkill.project_id.in_(project_ids))
+        .all()
+    )
+    # Only skills some project asks for can contribute to a match
+    vocab = {skill_id: col for col, skill_id in enumerate(sorted({skill_id for _, skill_id in project_rows}))}
+    student_ids = sorted({student_id for _, student_id in pairs})
+    student_rows = []
+    if vocab:
+        student_rows = (
+            db.query(StudentSkill.student_id, StudentSkill.skill_id)
+            .filter(StudentSkill.student_id.in_(student_ids), StudentSkill.skill_id.in_(vocab))
+            .all()
+        )
+
+    project_index = {project_id: row for row, project_id in enumerate(project_ids)}
+    student_index = {student_id: row for row, student_id in enumerate(student_ids)}
+    width = max(len(vocab), 1)
+    project_bits = np.zeros((len(project_ids), width), dtype=bool)
+    student_bits = np.zeros((len(student_ids), width), dtype=bool)
+    for project_id, skill_id in project_rows:
+        project_bits[project_index[project_id], vocab[skill_id]] = True
+    for student_id, skill_id in student_rows:
+        student_bits[student_index[student_id], vocab[skill_id]] = True
+
+    p_idx = np.fromiter((project_index[p] for p, _ in pairs), dtype=np.intp, count=len(pairs))
+    s_idx = np.fromiter((student_index[s] for _, s in pairs), dtype=np.intp, count=len(pairs))
+    required = project_bits.sum(axis=1)[p_idx]
+    overlap = (project_bits[p_idx] & student_bits[s_idx]).sum(axis=1)
+    match = np.divide(overlap, required, out=np.zeros(len(pairs)), where=required > 0)
+
+    for (project_id, student_id), value in zip(pairs, match.tolist()):
+        scores[project_id][student_id] = value
+    return scores
+
+
+def match_scores(db: Session, project_ids):
+    # {(project_id, student_id): score} for all applicants of the projects
+    project_ids = list(project_ids)
+    if not project_ids:
+        return {}
+    by_project = shared_get_or_compute_many("match_scores", project_ids, lambda missing: _score_projects(db, missing))
+    return {
+        (project_id, student_id): value
+        for project_id, by_student in by_project.items()
+        for student_id, value in by_student.items()
+    }
+
+
+# Call before db.commit(), like cache.invalidate
+
+def invalidate_project(db: Session, project_id: int):
+    invalidate(db, "match_scores", project_id)
+
+
+def invalidate_student(db: Session, student_id: int):
+    project_ids = [
+        project_id for (project_id,) in db.query(Application.project_id).filter(Application.student_id == student_id)
+    ]
+    if project_ids:
+        invalidate(db, "match_scores", *project_ids)
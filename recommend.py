@@ -0,0 +1,158 @@
+import zlib
+from threading import Lock
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from model import Application, Professor, Project, Student
+from project_index import ProjectIndexSync
+from search import SEARCH_FIELDS, tokenize
+
+# Hashed bag-of-words width. 512 float32 columns keep a 50k-project catalog
+# at ~100MB while still separating topics well enough for a feed.
+VECTOR_DIM = 512
+
+# Student profile fields and their weight in the query vector
+STUDENT_FIELDS = {"skills_summary": 2.0, "bio": 1.0}
+
+
+def _bucket(token: str) -> int:
+    # crc32 instead of hash() so buckets are stable across processes
+    return zlib.crc32(token.encode("utf-8")) % VECTOR_DIM
+
+
+def hashed_counts(fields: dict, weights: dict) -> np.ndarray:
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for field, weight in weights.items():
+        for token in tokenize(fields.get(field)):
+            vector[_bucket(token)] += weight
+    # Sub-linear tf so long descriptions don't swamp short ones
+    np.log1p(vector, out=vector)
+    return vector
+
+
+def _is_open(fields: dict) -> bool:
+    return fields.get("status") == "active" and fields.get("applications_open") is not False
+
+
+class RecommendationIndex:
+    # Dense matrix of L2-normalised project vectors plus per-bucket document
+    # frequencies. Scoring a student is one matrix-vector product; idf is
+    # applied to the query side so adding a project never re-weights the rows.
+    def __init__(self, capacity: int = 1024):
+        self._lock = Lock()
+        self._matrix = np.zeros((capacity, VECTOR_DIM), dtype=np.float32)
+        self._doc_freq = np.zeros(VECTOR_DIM, dtype=np.int32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._slots = {}  # project_id -> row
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] * 2
+        matrix = np.zeros((capacity, VECTOR_DIM), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._matrix, self._ids = matrix, ids
+
+    def upsert(self, project_id: int, fields: dict):
+        vector = hashed_counts(fields, SEARCH_FIELDS)
+        norm = float(np.linalg.norm(vector))
+        with self._lock:
+            self._remove(project_id)
+            if norm == 0.0:
+                return
+            if self._size == self._matrix.shape[0]:
+                self._grow()
+            row = self._size
+            self._matrix[row] = vector / norm
+            self._ids[row] = project_id
+            self._slots[project_id] = row
+            self._doc_freq += vector > 0
+            self._size += 1
+
+    def remove(self, project_id: int):
+        with self._lock:
+            self._remove(project_id)
+
+    def _remove(self, project_id: int):
+        row = self._slots.pop(project_id, None)
+        if row is None:
+            return
+        self._doc_freq -= self._matrix[row] > 0
+        last = self._size - 1
+        if row != last:
+            # Move the last row into the hole to keep the matrix dense
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = self._ids[last]
+            self._slots[int(self._ids[row])] = row
+        self._matrix[last] = 0
+        self._size = last
+
+    def top_k(self, query: np.ndarray, k: int, exclude=()):
+        with self._lock:
+            size = self._size
+            if size == 0 or not query.any():
+                return []
+            idf = np.log((1.0 + size) / (1.0 + self._doc_freq)).astype(np.float32) + 1.0
+            scores = self._matrix[:size] @ (query * idf)
+            ids = self._ids[:size].copy()
+        if exclude:
+            scores[np.isin(ids, list(exclude))] = -np.inf
+        k = min(k, size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+_index = RecommendationIndex()
+
+
+def _apply_project(project_id: int, fields):
+    if fields is not None and _is_open(fields):
+        _index.upsert(project_id, fields)
+    else:
+        # Closed, completed or deleted projects leave the feed
+        _index.remove(project_id)
+
+
+# Loads the index and keeps it current across workers (see project_index.py)
+_sync = ProjectIndexSync(_apply_project)
+
+
+def recommend_projects(db: Session, student_id: int, limit: int = 5):
+    _sync.ensure_current(db)
+    student = db.query(Student.skills_summary, Student.bio).filter(Student.id == student_id).first()
+    if not student:
+        return []
+    query = hashed_counts(student._mapping, STUDENT_FIELDS)
+    applied = {
+        project_id
+        for (project_id,) in db.query(Application.project_id).filter(Application.student_id == student_id)
+    }
+    ranked = _index.top_k(query, limit, exclude=applied)
+    if not ranked:
+        return []
+    scores = dict(ranked)
+    rows = (
+        db.query(
+            Project.id,
+            Project.title,
+            Project.required_skills,
+            Professor.name.label("professor_name"),
+        )
+        .join(Professor, Project.professor_id == Professor.id)
+        # The index may trail other workers' commits; re-check what _is_open
+        # checked against the current rows
+        .filter(
+            Project.id.in_(scores),
+            Project.status == "active",
+            or_(Project.applications_open == True, Project.applications_open.is_(None)),
+        )
+        .all()
+    )
+    rows.sort(key=lambda row: scores[row.id], reverse=True)
+    return rows
+
@@ -0,0 +1,90 @@
+import asyncio
+import re
+
+import httpx
+from database import SessionLocal, init_db
+from main import app
+from model import Professor, Student
+from utils import create_access_token, hash_password
+
+# Bytes on the wire for every HTML page: uncompressed (before) against what
+# CompressionMiddleware sends for gzip and br (after), plus the shared
+# stylesheets, which a browser downloads once and then keeps (immutable).
+#
+#   DATABASE_URL=sqlite:///./bench.db python report_page_weight.py
+#   python build_assets.py && python report_page_weight.py   # with hashed bundles
+
+PAGES = [
+    (None, "/"),
+    ("student", "/dashboard/student"),
+    ("student", "/profile/student"),
+    ("student", "/student/browse-projects"),
+    ("student", "/student/my-applications"),
+    ("professor", "/dashboard/professor"),
+    ("professor", "/profile/professor"),
+    ("professor", "/professor/post-project"),
+    ("professor", "/professor/my-projects"),
+    ("professor", "/professor/applications"),
+]
+STYLESHEET = re.compile(r'<link rel="stylesheet" href="(/static/[^"]+)"')
+
+
+def report_users():
+    init_db()  # the ASGI client does not run the app's startup hook
+    db = SessionLocal()
+    try:
+        tokens = {}
+        for role, model, email in (("student", Student, "report.student@example.com"),
+                                   ("professor", Professor, "report.professor@example.com")):
+            user = db.query(model).filter(model.email == email).first()
+            if not user:
+                user = model(name=f"Report {role.title()}", email=email, password=hash_password("report-pass"))
+                db.add(user)
+                db.commit()
+            tokens[role] = create_access_token(
+                {"sub": str(user.id), "role": role, "id": user.id, "email": user.email, "name": user.name}
+            )
+        return tokens
+    finally:
+        db.close()
+
+
+async def wire_bytes(client, url, token=None, encoding="identity"):
+    # Encoded body as sent by the app (aiter_raw skips httpx's decoding)
+    cookies = {"access_token": token} if token else None
+    async with client.stream("GET", url, headers={"Accept-Encoding": encoding}, cookies=cookies) as response:
+        response.raise_for_status()
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        return body, response.headers
+
+
+async def main():
+    tokens = report_users()
+    transport = httpx.ASGITransport(app=app)
+    stylesheets = set()
+    totals = {"identity": 0, "gzip": 0, "br": 0}
+    print(f"{'page':<28} {'before':>9} {'gzip':>9} {'br':>9} {'saved':>7}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://report") as client:
+        for role, url in PAGES:
+            sizes = {}
+            for encoding in totals:
+                body, _ = await wire_bytes(client, url, tokens.get(role), encoding)
+                sizes[encoding] = len(body)
+                totals[encoding] += len(body)
+                if encoding == "identity":
+                    stylesheets.update(STYLESHEET.findall(body.decode("utf-8")))
+            saved = 100 - sizes["br"] * 100 // sizes["identity"]
+            print(f"{url:<28} {sizes['identity']:>9} {sizes['gzip']:>9} {sizes['br']:>9} {saved:>6}%")
+        saved = 100 - totals["br"] * 100 // totals["identity"]
+        print(f"{'total':<28} {totals['identity']:>9} {totals['gzip']:>9} {totals['br']:>9} {saved:>6}%")
+
+        print("\nShared stylesheets (downloaded on the first page view, then cached):")
+        for url in sorted(stylesheets):
+            before, _ = await wire_bytes(client, url)
+            after, headers = await wire_bytes(client, url, encoding="br, gzip")
+            print(f"{url:<56} {len(before):>7} -> {len(after):>6} bytes  "
+                  f"{headers.get('content-encoding', 'identity'):<5} {headers.get('cache-control')}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
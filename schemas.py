@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 
 # ---- Registration/Login ----
 class StudentRegisterRequest(BaseModel):
@@ -83,3 +83,44 @@ class ProjectCreateRequest(BaseModel):
     applications_open: Optional[bool] = True
     status: Optional[str] = "active"
     required_skills: Optional[str] = None
+
+# ---- Applications ----
+class ApplicationStatusUpdateRequest(BaseModel):
+    application_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: str
+
+# ---- Bulk import (bulk_import.py), one per CSV/JSONL row ----
+class StudentImportRow(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    email: EmailStr
+    password: str = Field(..., min_length=6)
+    phone: Optional[str] = Field(None, max_length=20)
+    branch: Optional[str] = Field(None, max_length=100)
+    semester: Optional[str] = Field(None, max_length=20)
+    bio: Optional[str] = None
+    skills: Optional[str] = None  # comma separated, becomes skills_summary
+
+class ProfessorImportRow(BaseModel):
+    name: str = Field(..., min_length=2, max_length=100)
+    email: EmailStr
+    password: str = Field(..., min_length=6)
+    department: Optional[str] = Field(None, max_length=100)
+    office_location: Optional[str] = Field(None, max_length=100)
+    phone: Optional[str] = Field(None, max_length=20)
+    affiliation: Optional[str] = Field(None, max_length=150)
+    bio: Optional[str] = None
+    expertise: Optional[str] = None
+    research_interests: Optional[str] = None
+
+class ProjectImportRow(BaseModel):
+    professor_email: EmailStr
+    title: str = Field(..., min_length=1, max_length=200)
+    introduction: Optional[str] = None
+    problem_definition: Optional[str] = None
+    objective: Optional[str] = None
+    methodology: Optional[str] = None
+    scope: Optional[str] = None
+    timeline: Optional[str] = None
+    applications_open: Optional[bool] = True
+    status: Optional[str] = "active"
+    required_skills: Optional[str] = None
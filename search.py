@@ -0,0 +1,174 @@
+import math
+import os
+import re
+from threading import Lock
+from sqlalchemy import desc, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from model import Professor, Project
+from project_index import ProjectIndexSync
+
+# Project columns covered by the search index, with their ranking weight
+SEARCH_FIELDS = {
+    "title": 3.0,
+    "required_skills": 2.0,
+    "introduction": 1.0,
+    "objective": 1.0,
+    "methodology": 1.0,
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into",
+    "is", "it", "of", "on", "or", "the", "to", "with", "we", "will", "this", "that",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(value: str):
+    if not value:
+        return []
+    tokens = []
+    for token in _TOKEN_RE.findall(value.lower()):
+        token = token.rstrip(".")
+        if len(token) > 1 and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class SearchBackend:
+    def index_project(self, project_id: int, fields: dict):
+        pass
+
+    def remove_project(self, project_id: int):
+        pass
+
+    def search(self, db: Session, query: str, limit: int, within=None):
+        # Returns [(project_id, score), ...] best match first. within: a
+        # SELECT of project ids to restrict the matches to (the caller's
+        # filters), applied before the limit
+        raise NotImplementedError
+
+
+class MySQLFulltextBackend(SearchBackend):
+    # MySQL keeps the FULLTEXT index (ft_project_text, see model.py) up to
+    # date itself, so index_project/remove_project are no-ops here
+    def search(self, db: Session, query: str, limit: int, within=None):
+        score = match(
+            Project.title, Project.introduction, Project.objective, Project.methodology, Project.required_skills,
+            against=query,
+        ).in_natural_language_mode()
+        statement = select(Project.id, score.label("score")).where(score)
+        if within is not None:
+            statement = statement.where(Project.id.in_(within))
+        rows = db.execute(statement.order_by(desc("score")).limit(limit))
+        return [(row.id, float(row.score)) for row in rows]
+
+
+class InvertedIndexBackend(SearchBackend):
+    # In-process index for SQLite/dev runs. It is loaded from the database on
+    # first use and kept current from the project commits of every worker
+    # (see project_index.py).
+    def __init__(self):
+        self._lock = Lock()
+        self._postings = {}   # term -> {project_id: weight}
+        self._doc_terms = {}  # project_id -> {term: weight}
+        self._sync = ProjectIndexSync(self._apply_project)
+
+    def _apply_project(self, project_id: int, fields):
+        if fields is None:
+            self.remove_project(project_id)
+        else:
+            self.index_project(project_id, fields)
+
+    def _add(self, project_id: int, fields):
+        weights = {}
+        for field, field_weight in SEARCH_FIELDS.items():
+            for token in tokenize(fields.get(field)):
+                weights[token] = weights.get(token, 0.0) + field_weight
+        self._drop(project_id)
+        self._doc_terms[project_id] = weights
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[project_id] = weight
+
+    def _drop(self, project_id: int):
+        for token in self._doc_terms.pop(project_id, {}):
+            docs = self._postings.get(token)
+            if docs is not None:
+                docs.pop(project_id, None)
+                if not docs:
+                    del self._postings[token]
+
+    def index_project(self, project_id: int, fields: dict):
+        with self._lock:
+            self._add(project_id, fields)
+
+    def remove_project(self, project_id: int):
+        with self._lock:
+            self._drop(project_id)
+
+    def search(self, db: Session, query: str, limit: int, within=None):
+        terms = set(tokenize(query))
+        self._sync.ensure_current(db)
+        allowed = None if within is None else set(db.execute(within).scalars())
+        with self._lock:
+            total = len(self._doc_terms) or 1
+            scores = {}
+            for term in terms:
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + total / len(docs))
+                for project_id, weight in docs.items():
+                    if allowed is not None and project_id not in allowed:
+                        continue
+                    # Saturating term frequency so one repeated word can't dominate
+                    scores[project_id] = scores.get(project_id, 0.0) + idf * weight / (weight + 1.0)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+_backend = None
+
+
+def get_search_backend(db: Session) -> SearchBackend:
+    # SEARCH_BACKEND=mysql|memory overrides the choice made from the dialect
+    global _backend
+    if _backend is None:
+        choice = os.getenv("SEARCH_BACKEND") or db.get_bind().dialect.name
+        _backend = MySQLFulltextBackend() if choice == "mysql" else InvertedIndexBackend()
+    return _backend
+
+
+def search_projects(db: Session, query: str, limit: int = 20):
+    if not query or not query.strip():
+        return []
+    ranked = get_search_backend(db).search(db, query, limit * 2)
+    if not ranked:
+        return []
+    scores = dict(ranked)
+    rows = (
+        db.query(
+            Project.id,
+            Project.title,
+            Project.required_skills,
+            Professor.name.label("professor_name"),
+            Professor.department.label("department"),
+        )
+        .join(Professor, Project.professor_id == Professor.id)
+        .filter(Project.id.in_(scores), Project.status == "active", Project.applications_open == True)
+        .all()
+    )
+    rows.sort(key=lambda row: scores[row.id], reverse=True)
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "professor_name": row.professor_name,
+            "department": row.department,
+            "required_skills": row.required_skills,
+            "score": round(scores[row.id], 4),
+        }
+        for row in rows[:limit]
+    ]
+
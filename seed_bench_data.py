@@ -0,0 +1,208 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+from database import SessionLocal, init_db
+from model import Student, Professor, Project, Application, Skill, ProjectSkill, StudentSkill
+from utils import hash_password
+
+# Fills the database with synthetic data for the benchmarks (bench_load.py).
+# Scale 1 is roughly production-sized: 200k students, 20k professors, 50k
+# projects and 2M applications. Rows go in with batched executemany inserts
+# and explicit ids, so it can be run on top of existing data.
+#
+#   DATABASE_URL=sqlite:///./bench.db python seed_bench_data.py [scale] [seed]
+#   python seed_bench_data.py 0.01      # 2k students, 20k applications
+#
+# Every generated account has the password BENCH_PASSWORD and an email at
+# BENCH_EMAIL_DOMAIN.
+
+# Row counts at scale 1
+STUDENTS = 200_000
+PROFESSORS = 20_000
+PROJECTS = 50_000
+APPLICATIONS = 2_000_000
+BATCH_SIZE = 10_000
+
+BENCH_PASSWORD = "bench-pass"
+BENCH_EMAIL_DOMAIN = "bench.example"
+
+FIRST_NAMES = ["Aarav", "Ananya", "Rohan", "Priya", "Kabir", "Meera", "Arjun", "Isha", "Vikram", "Sara",
+               "Liam", "Emma", "Noah", "Olivia", "Mateo", "Sofia", "Yuki", "Chen", "Amara", "Omar"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Singh", "Gupta", "Rao", "Khan", "Das", "Nair", "Mehta",
+              "Smith", "Garcia", "Kim", "Nguyen", "Okafor", "Rossi", "Muller", "Tanaka", "Silva", "Cohen"]
+DEPARTMENTS = ["Computer Science", "Information Technology", "Electronics", "Mechanical", "Civil",
+               "Electrical", "Chemical", "Biotechnology", "Mathematics", "Physics"]
+SKILLS = ["Python", "Java", "C++", "SQL", "Machine Learning", "Deep Learning", "PyTorch", "TensorFlow",
+          "Data Analysis", "Statistics", "React", "Node.js", "Docker", "Kubernetes", "Linux", "MATLAB",
+          "Signal Processing", "Embedded C", "IoT", "Computer Vision", "NLP", "Blockchain", "Cloud",
+          "Networking", "Cyber Security", "CAD", "Robotics", "Simulink", "R", "Excel"]
+TOPICS = ["Smart Campus", "Healthcare Analytics", "Crop Yield Prediction", "Traffic Forecasting",
+          "Energy Monitoring", "Academic Records", "Speech Recognition", "Drone Navigation",
+          "Water Quality Sensing", "Fraud Detection", "Recommendation Engines", "Protein Folding"]
+APPROACHES = ["Deep Learning for", "IoT Platform for", "A Scalable System for", "Privacy-Preserving",
+              "Low-Cost Sensors for", "Explainable Models for", "Real-Time Analytics of"]
+STATUSES = ["pending"] * 6 + ["shortlisted"] * 2 + ["accepted", "rejected"]
+PARAGRAPH = ("This project studies {topic} with a focus on {skill_a} and {skill_b}. Students will review "
+             "prior work, build a prototype and evaluate it on real data collected on campus.")
+
+
+def batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_rows(db, model, rows, label):
+    start = time.perf_counter()
+    count = 0
+    for batch in batches(rows):
+        db.execute(insert(model), batch)
+        db.commit()
+        count += len(batch)
+    print(f"{label:<16} {count:>9} rows in {time.perf_counter() - start:6.1f}s")
+
+
+def next_id(db, model):
+    return (db.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def random_time(rng, now, days=365):
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def seed(scale: float = 1.0, seed_value: int = 42):
+    students_count = int(STUDENTS * scale)
+    professors_count = max(int(PROFESSORS * scale), 1)
+    projects_count = max(int(PROJECTS * scale), 1)
+    applications_count = int(APPLICATIONS * scale)
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    password = hash_password(BENCH_PASSWORD)  # one bcrypt hash shared by every account
+    init_db()
+    db = SessionLocal()
+    try:
+        skill_ids = {}
+        for name in SKILLS:
+            skill = db.query(Skill).filter(Skill.slug == name.lower()).first()
+            if skill is None:
+                skill = Skill(name=name, slug=name.lower())
+                db.add(skill)
+                db.flush()
+            skill_ids[name] = skill.id
+        db.commit()
+
+        first_professor = next_id(db, Professor)
+        professor_ids = range(first_professor, first_professor + professors_count)
+        insert_rows(db, Professor, (
+            {
+                "id": professor_id,
+                "name": f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"professor{professor_id}@{BENCH_EMAIL_DOMAIN}",
+                "password": password,
+                "department": rng.choice(DEPARTMENTS),
+                "bio": f"Works on {rng.choice(TOPICS).lower()}.",
+                "expertise": ", ".join(rng.sample(SKILLS, 3)),
+            }
+            for professor_id in professor_ids
+        ), "professors")
+
+        first_project = next_id(db, Project)
+        project_ids = range(first_project, first_project + projects_count)
+        project_skills = {}
+
+        def projects():
+            for project_id in project_ids:
+                skills = rng.sample(SKILLS, rng.randint(2, 5))
+                project_skills[project_id] = skills
+                topic = rng.choice(TOPICS)
+                created_at = random_time(rng, now)
+                yield {
+                    "id": project_id,
+                    "professor_id": rng.choice(professor_ids),
+                    "title": f"{rng.choice(APPROACHES)} {topic}",
+                    "introduction": PARAGRAPH.format(topic=topic.lower(), skill_a=skills[0], skill_b=skills[1]),
+                    "problem_definition": f"Current approaches to {topic.lower()} do not scale.",
+                    "objective": f"Build and evaluate a {skills[0]} based solution.",
+                    "methodology": "Literature review, prototype, field evaluation.",
+                    "scope": "One semester, two to four students.",
+                    "timeline": "16 weeks",
+                    "applications_open": rng.random() < 0.9,
+                    "status": "active" if rng.random() < 0.85 else "completed",
+                    "required_skills": ", ".join(skills),
+                    "created_at": created_at,
+                    "updated_at": created_at + timedelta(days=rng.randrange(30)),
+                }
+
+        insert_rows(db, Project, projects(), "projects")
+        insert_rows(db, ProjectSkill, (
+            {"project_id": project_id, "skill_id": skill_ids[name]}
+            for project_id, skills in project_skills.items() for name in skills
+        ), "project skills")
+
+        first_student = next_id(db, Student)
+        student_ids = range(first_student, first_student + students_count)
+        student_skills = {}
+
+        def students():
+            for student_id in student_ids:
+                skills = rng.sample(SKILLS, rng.randint(2, 6))
+                student_skills[student_id] = skills
+                yield {
+                    "id": student_id,
+                    "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    "email": f"student{student_id}@{BENCH_EMAIL_DOMAIN}",
+                    "password": password,
+                    "branch": rng.choice(DEPARTMENTS),
+                    "semester": str(rng.randint(1, 8)),
+                    "bio": "Interested in research.",
+                    "skills_summary": ", ".join(skills),
+                }
+
+        insert_rows(db, Student, students(), "students")
+        insert_rows(db, StudentSkill, (
+            {"student_id": student_id, "skill_id": skill_ids[name]}
+            for student_id, skills in student_skills.items() for name in skills
+        ), "student skills")
+
+        def applications():
+            # About applications / students per student; squaring the random
+            # number makes the older projects much more popular than the rest
+            per_student = applications_count / max(students_count, 1)
+            application_id = next_id(db, Application)
+            remaining = applications_count
+            for student_id in student_ids:
+                if remaining <= 0:
+                    break
+                count = min(remaining, rng.randint(0, int(2 * per_student)), projects_count)
+                chosen = set()
+                while len(chosen) < count:
+                    chosen.add(project_ids[int(projects_count * rng.random() ** 2)])
+                for project_id in chosen:
+                    yield {
+                        "id": application_id,
+                        "project_id": project_id,
+                        "student_id": student_id,
+                        "status": rng.choice(STATUSES),
+                        "applied_at": random_time(rng, now),
+                    }
+                    application_id += 1
+                remaining -= count
+
+        insert_rows(db, Application, applications(), "applications")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    seed(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 1.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 42,
+    )
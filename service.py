@@ -1,11 +1,20 @@
 from sqlalchemy.orm import Session
 from model import Student
 from schemas import StudentRegisterRequest, StudentUpdateRequest
-from model import Professor, Project, Student
+from model import Application, Professor, Project, Student
 from schemas import ProfessorRegisterRequest, ProfessorUpdateRequest, ProjectCreateRequest
-from utils import hash_password, create_access_token, check_password
+from utils import hash_password, create_access_token, check_password, needs_rehash
+from password_pool import hash_password_async, check_password_async
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from catalog import browse_catalog, professor_options
+from cache_backend import cache_key
+from cache import read_cache, invalidate, shared_get_or_compute, shared_get_or_compute_many
+from skills import set_project_skills, set_student_skills
+from ranking import invalidate_student
+from auth import token_claims
 
 
 def register_student(db: Session, data: StudentRegisterRequest) -> str:
@@ -29,6 +38,7 @@ def register_professor(db: Session, data: ProfessorRegisterRequest) -> str:
     hashed_pw = hash_password(data.password)
     new_prof = Professor(name=data.name, email=data.email, password=hashed_pw)
     db.add(new_prof)
+    invalidate(db, "professors")
     db.commit()
     db.refresh(new_prof)
     return None  # Success
@@ -52,9 +62,8 @@ def authenticate_user(db: Session, email: str, password: str, role: str):
     return None
 
 def create_user_jwt(user, role: str):
-    # Minimal user-id and role in token; add more claims if needed
-    data = {"sub": str(user.id), "role": role, "id": user.id, "email": user.email, "name": user.name}
-    return create_access_token(data)
+    # Access token only; login uses auth.issue_tokens for access + refresh
+    return create_access_token(token_claims(user, role))
 
 def update_professor_profile(db: Session, professor_id: int, update_data: ProfessorUpdateRequest) -> str:
     prof = db.query(Professor).filter(Professor.id == professor_id).first()
@@ -67,6 +76,9 @@ def update_professor_profile(db: Session, professor_id: int, update_data: Profes
             setattr(prof, field, value)
             updated = True
     if updated:
+        # Name/department show up in the dropdowns and on the catalog cards
+        invalidate(db, "professors")
+        invalidate(db, "catalog")
         db.commit()
         return None  # Success
     else:
@@ -87,6 +99,11 @@ def create_project(db: Session, professor_id: int, project_data: ProjectCreateRe
         required_skills=project_data.required_skills
     )
     db.add(new_project)
+    db.flush()
+    set_project_skills(db, new_project.id, project_data.required_skills)
+    invalidate(db, "project", new_project.id)
+    invalidate(db, "catalog")
+    invalidate(db, "professor_counts", professor_id)
     db.commit()
     db.refresh(new_project)
     return new_project
@@ -112,6 +129,191 @@ def update_student_profile(db: Session, student_id: int, update: StudentUpdateRe
         else:
             setattr(student, field, value)
 
+    if update.skills_summary is not None:
+        set_student_skills(db, student_id, update.skills_summary)
+        invalidate_student(db, student_id)
     db.commit()
     db.refresh(student)
     return None
+
+# --- Read-through cache ---
+# Hot reads served from cache.py: project rows and the professor list from the
+# in-process cache, catalog pages and dashboard counters from the shared
+# backend. The writers above (and the application handlers in controller.py)
+# call cache.invalidate before commit.
+# Called through run_sync from the request handlers, like the functions above.
+
+def project_detail(db: Session, project_id: int):
+    # Everything the project modals show, as a plain dict (None if missing)
+    def load():
+        project = db.get(Project, project_id)
+        if not project:
+            return None
+        return {
+            "id": project.id,
+            "professor_id": project.professor_id,
+            "title": project.title,
+            "status": project.status,
+            "applications_open": project.applications_open,
+            "introduction": project.introduction,
+            "problem_definition": project.problem_definition,
+            "objective": project.objective,
+            "methodology": project.methodology,
+            "scope": project.scope,
+            "timeline": project.timeline,
+            "required_skills": project.required_skills,
+            "updated_at": project.updated_at,
+        }
+    return read_cache.get_or_load(db, "project", project_id, load)
+
+
+VALIDATOR_FIELDS = ("professor_id", "status", "applications_open", "updated_at")
+
+
+def project_validators(db: Session, project_id: int):
+    # What the detail endpoints check before project_detail (access and the
+    # ETag): from the cached detail when there is one, else without reading
+    # the Text columns (None if missing)
+    project = read_cache.peek(db, "project", project_id)
+    if project is None:
+        project = db.query(*(getattr(Project, field) for field in VALIDATOR_FIELDS)).filter(
+            Project.id == project_id
+        ).first()
+        project = dict(project._mapping) if project else None
+    return project and {field: project[field] for field in VALIDATOR_FIELDS}
+
+
+def catalog_page(db: Session, search: str = None, professor_id: int = None, department: str = None,
+                 skill: str = None, cursor: int = None):
+    # (rows, next_cursor, truncated) for one browse page (see
+    # catalog.browse_catalog); rows as plain dicts so they can be stored by
+    # any backend
+    def load():
+        search_professor_ids = ()
+        if search and search.strip():
+            needle = search.strip().lower()
+            search_professor_ids = [id_ for id_, name, _ in professor_list(db) if needle in (name or "").lower()]
+        rows, next_cursor, truncated = browse_catalog(
+            db, search=search, professor_id=professor_id, department=department, skill=skill, cursor=cursor,
+            search_professor_ids=search_professor_ids,
+        )
+        return [dict(row._mapping) for row in rows], next_cursor, truncated
+    key = cache_key(search or "", professor_id, department or "", skill or "", cursor)
+    return shared_get_or_compute("catalog", key, load)
+
+
+def professor_list(db: Session):
+    return read_cache.get_or_load(db, "professors", "all", lambda: professor_options(db))
+
+
+def student_application_counts(db: Session, student_id: int):
+    # Per-status counts for the student dashboard in one grouped query
+    def load():
+        rows = db.execute(
+            select(Application.status, func.count(Application.id))
+            .where(Application.student_id == student_id)
+            .group_by(Application.status)
+        )
+        by_status = {status_name: count for status_name, count in rows}
+        return {
+            "total_applications": sum(by_status.values()),
+            "accepted": by_status.get("accepted", 0),
+            "shortlisted": by_status.get("shortlisted", 0),
+            "pending": by_status.get("pending", 0),
+            "rejected": by_status.get("rejected", 0),
+        }
+    return shared_get_or_compute("application_counts", student_id, load)
+
+
+def professor_dashboard_counts(db: Session, professor_id: int):
+    def load():
+        by_status = dict(
+            db.query(Project.status, func.count(Project.id))
+            .filter(Project.professor_id == professor_id)
+            .group_by(Project.status)
+            .all()
+        )
+        student_applied = (
+            db.query(func.count(Application.id))
+            .join(Project, Application.project_id == Project.id)
+            .filter(Project.professor_id == professor_id)
+            .scalar()
+        )
+        return {
+            "total_projects": sum(by_status.values()),
+            "active_projects": by_status.get("active", 0),
+            "student_applied": student_applied or 0,
+        }
+    return shared_get_or_compute("professor_counts", professor_id, load)
+
+
+def project_application_counts(db: Session, project_ids):
+    # {project_id: number of applications}; the cached ids come back in one
+    # multi-get, the rest in one grouped query
+    def load(missing):
+        rows = db.execute(
+            select(Application.project_id, func.count(Application.id))
+            .where(Application.project_id.in_(missing))
+            .group_by(Application.project_id)
+        )
+        counts = dict(rows.all())
+        return {project_id: counts.get(project_id, 0) for project_id in missing}
+    return shared_get_or_compute_many("project_application_counts", project_ids, load)
+
+# --- Async equivalents ---
+# The request handlers hold an AsyncSession. Most of these run the functions
+# above on the session's sync facade via run_sync, so every round trip goes
+# through the async driver and the event loop is never blocked on the database.
+# Registration and login are written out so bcrypt runs in password_pool.
+
+async def register_student_async(db: AsyncSession, data: StudentRegisterRequest) -> str:
+    if data.password != data.confirm_password:
+        return "Passwords do not match."
+    if await db.scalar(select(Student.id).where(Student.email == data.email)):
+        return "Email already registered."
+    hashed_pw = await hash_password_async(data.password)
+    db.add(Student(name=data.name, email=data.email, password=hashed_pw))
+    await db.commit()
+    return None  # Success
+
+
+async def register_professor_async(db: AsyncSession, data: ProfessorRegisterRequest) -> str:
+    if data.password != data.confirm_password:
+        return "Passwords do not match."
+    if await db.scalar(select(Professor.id).where(Professor.email == data.email)):
+        return "Email already registered."
+    hashed_pw = await hash_password_async(data.password)
+    db.add(Professor(name=data.name, email=data.email, password=hashed_pw))
+    await db.run_sync(invalidate, "professors")
+    await db.commit()
+    return None  # Success
+
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str, role: str):
+    UserModel = Student if role == "student" else Professor
+    user = await db.scalar(select(UserModel).where(UserModel.email == email))
+
+    if user and await check_password_async(password, user.password):
+        # Transparently move old hashes to the configured BCRYPT_ROUNDS
+        if needs_rehash(user.password):
+            user.password = await hash_password_async(password)
+            await db.commit()
+        return user
+
+    OppositeModel = Professor if role == "student" else Student
+    if await db.scalar(select(OppositeModel.id).where(OppositeModel.email == email)):
+        return "role_mismatch"
+
+    return None
+
+
+async def update_professor_profile_async(db: AsyncSession, professor_id: int, update_data: ProfessorUpdateRequest) -> str:
+    return await db.run_sync(update_professor_profile, professor_id, update_data)
+
+
+async def create_project_async(db: AsyncSession, professor_id: int, project_data: ProjectCreateRequest):
+    return await db.run_sync(create_project, professor_id, project_data)
+
+
+async def update_student_profile_async(db: AsyncSession, student_id: int, update: StudentUpdateRequest):
+    return await db.run_sync(update_student_profile, student_id, update)
@@ -0,0 +1,109 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from model import Skill, ProjectSkill, StudentSkill
+from ranking import invalidate_project
+
+# Attempts at inserting new skills while concurrent requests insert the same ones
+SKILL_INSERT_ATTEMPTS = 3
+
+
+def parse_skills(value: str):
+    # "Python, SQL ,python" -> ["Python", "SQL"] (first spelling wins)
+    seen = {}
+    for part in (value or "").split(","):
+        name = part.strip()
+        if name and name.lower() not in seen:
+            seen[name.lower()] = name[:100]
+    return list(seen.values())
+
+
+def get_or_create_skills(db: Session, names):
+    # Returns {slug: Skill} for the given names, inserting the missing ones
+    wanted = {name.lower()[:100]: name for name in names}
+    if not wanted:
+        return {}
+    query = db.query(Skill).filter(Skill.slug.in_(wanted))
+    for attempt in range(SKILL_INSERT_ATTEMPTS):
+        found = {skill.slug: skill for skill in query}
+        missing = [Skill(name=name, slug=slug) for slug, name in wanted.items() if slug not in found]
+        if not missing:
+            return found
+        try:
+            # The savepoint keeps a conflict from rolling back the caller's
+            # transaction
+            with db.begin_nested():
+                db.add_all(missing)
+        except IntegrityError:
+            if attempt == SKILL_INSERT_ATTEMPTS - 1:
+                raise
+            # A concurrent request inserted some of the same skills first. A
+            # locking read sees its committed rows even under MySQL's
+            # repeatable read; whatever is still missing is inserted again.
+            query = query.with_for_update(read=True)
+            continue
+        found.update((skill.slug, skill) for skill in missing)
+        return found
+
+
+def set_project_skills(db: Session, project_id: int, value: str):
+    # Replaces the project's skill links; the caller commits
+    skills = get_or_create_skills(db, parse_skills(value))
+    db.query(ProjectSkill).filter(ProjectSkill.project_id == project_id).delete(synchronize_session=False)
+    db.add_all(ProjectSkill(project_id=project_id, skill_id=skill.id) for skill in skills.values())
+    invalidate_project(db, project_id)
+
+
+def set_student_skills(db: Session, student_id: int, value: str):
+    skills = get_or_create_skills(db, parse_skills(value))
+    db.query(StudentSkill).filter(StudentSkill.student_id == student_id).delete(synchronize_session=False)
+    db.add_all(StudentSkill(student_id=student_id, skill_id=skill.id) for skill in skills.values())
+
+
+def project_skill_names(db: Session, project_ids):
+    # {project_id: [skill name, ...]} in one query
+    result = {project_id: [] for project_id in project_ids}
+    if not result:
+        return result
+    rows = (
+        db.query(ProjectSkill.project_id, Skill.name)
+        .join(Skill, ProjectSkill.skill_id == Skill.id)
+        .filter(ProjectSkill.project_id.in_(result))
+        .order_by(Skill.name)
+    )
+    for project_id, name in rows:
+        result[project_id].append(name)
+    return result
+
+
+def student_skill_names(db: Session, student_ids):
+    result = {student_id: [] for student_id in student_ids}
+    if not result:
+        return result
+    rows = (
+        db.query(StudentSkill.student_id, Skill.name)
+        .join(Skill, StudentSkill.skill_id == Skill.id)
+        .filter(StudentSkill.student_id.in_(result))
+        .order_by(Skill.name)
+    )
+    for student_id, name in rows:
+        result[student_id].append(name)
+    return result
+
+
+def projects_needing_skill(db: Session, skill_name: str):
+    # Project ids linked to the skill; served from ix_project_skill_skill_id
+    return [
+        project_id
+        for (project_id,) in db.query(ProjectSkill.project_id)
+        .join(Skill, ProjectSkill.skill_id == Skill.id)
+        .filter(Skill.slug == skill_name.strip().lower())
+    ]
+
+
+def students_with_skill(db: Session, skill_name: str):
+    return [
+        student_id
+        for (student_id,) in db.query(StudentSkill.student_id)
+        .join(Skill, StudentSkill.skill_id == Skill.id)
+        .filter(Skill.slug == skill_name.strip().lower())
+    ]
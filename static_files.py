@@ -0,0 +1,45 @@
+import os
+import re
+from mimetypes import guess_type
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from compression import accepted_encodings
+
+# Files whose name carries a content hash (bundles from build_assets.py,
+# uploaded profile photos and thumbnails) never change under the same URL
+HASHED_NAME = re.compile(r"(^|[.\-_])[0-9a-f]{12,}$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, no-cache"  # cache, but check the ETag every time
+
+# Precompressed variants, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class CachedStaticFiles(StaticFiles):
+    # StaticFiles plus a Cache-Control policy and .br/.gz variants chosen by
+    # Accept-Encoding. ETag / If-None-Match handling comes from StaticFiles.
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+        stem = os.path.splitext(os.path.basename(full_path))[0]
+        headers = {
+            "Cache-Control": IMMUTABLE if HASHED_NAME.search(stem) else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            variant = f"{full_path}{suffix}"
+            if encoding in accepted and os.path.isfile(variant):
+                full_path, stat_result = variant, os.stat(variant)
+                headers["Content-Encoding"] = encoding
+                break
+
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
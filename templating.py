@@ -0,0 +1,171 @@
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from fastapi.templating import Jinja2Templates
+from starlette.responses import HTMLResponse
+from starlette.templating import _TemplateResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, nodes, pass_context
+from jinja2.ext import Extension
+from markupsafe import Markup
+from assets import asset_url
+from uploads import thumbnail_url
+from cache_backend import cache_key, get_cache_backend, run_with_backend
+
+# The one template environment shared by main.py and controller.py
+
+TEMPLATE_DIR = "templates"
+
+# Compiled templates survive worker restarts here (cold starts skip compiling)
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", ".jinja_cache")
+
+# Production can turn off the per-render mtime check on template files
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "1") not in ("0", "false", "no")
+
+# Rendered {% cache %} fragments: a per-worker LRU in front of the shared
+# cache backend (cache_backend.py), which keeps them for FRAGMENT_TTL
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "20000"))
+FRAGMENT_TTL = int(os.getenv("FRAGMENT_TTL", "3600"))
+
+
+class FragmentCache:
+    # LRU of rendered fragments. Keys include everything the fragment shows
+    # (e.g. project id + updated_at) and the template's source hash, so
+    # entries never need invalidating; old versions simply age out.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE_SIZE)
+
+
+def template_version(environment, name):
+    # Hash of the template source, part of every fragment key: edited
+    # templates get new keys, so the shared cache never serves markup from an
+    # older deploy
+    if not name:
+        return ""
+    source = environment.loader.get_source(environment, name)[0]
+    version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    environment.fragment_versions[name] = version
+    return version
+
+
+class FragmentCacheExtension(Extension):
+    # {% cache "project-card", project.id, project.updated_at %} ... {% endcache %}
+    # The body is rendered once per distinct key and reused afterwards, by
+    # every worker. Fragment names must be unique within a template.
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        # template name -> hash of its source at the last compile
+        environment.extend(fragment_versions={})
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        version = template_version(self.environment, parser.name)
+        key = [nodes.Const(version), parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render_cached", [nodes.Tuple(key, "load")]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key, caller):
+        key = cache_key(*key)
+        value = fragment_cache.get(key)
+        if value is None:
+            value = get_cache_backend().get_or_compute("fragment", key, FRAGMENT_TTL, lambda: str(caller()))
+            fragment_cache.set(key, value)
+        return Markup(value)
+
+
+@pass_context
+def prefetch_fragments(context, name, items, *attributes):
+    # {{ prefetch_fragments("project-card", projects, "id", "updated_at") }}
+    # before a loop of {% cache "project-card", project.id, project.updated_at %}:
+    # fetches every card from the shared backend in one round trip instead of
+    # one per card. The attributes must match the cache tag's key expressions.
+    environment = context.environment
+    # Not recorded yet when the template came from the bytecode cache
+    version = environment.fragment_versions.get(context.name) or template_version(environment, context.name)
+    keys = [
+        cache_key(version, name, *(environment.getattr(item, attribute) for attribute in attributes))
+        for item in items
+    ]
+    missing = [key for key in keys if fragment_cache.get(key) is None]
+    for key, value in get_cache_backend().peek_many("fragment", missing).items():
+        fragment_cache.set(key, value)
+    return ""
+
+
+class DeferredTemplateResponse(_TemplateResponse):
+    # Rendered when sent rather than when built: {% cache %} fragments and
+    # prefetch_fragments read the shared cache backend, and rendering under
+    # run_with_backend keeps those round trips off the event loop
+    def __init__(self, template, context, status_code=200, headers=None, media_type=None, background=None):
+        self.template = template
+        self.context = context
+        HTMLResponse.__init__(self, None, status_code, headers, media_type, background)
+
+    async def __call__(self, scope, receive, send):
+        self.body = self.render(await run_with_backend(self.template.render, self.context))
+        self.raw_headers = [(name, value) for name, value in self.raw_headers if name != b"content-length"]
+        self.raw_headers.append((b"content-length", str(len(self.body)).encode("latin-1")))
+        await super().__call__(scope, receive, send)
+
+
+class Templates(Jinja2Templates):
+    # TemplateResponse(name, context, ...) as used by the handlers, with
+    # rendering deferred to DeferredTemplateResponse
+    def TemplateResponse(self, name, context, status_code=200, headers=None, media_type=None, background=None):
+        for context_processor in self.context_processors:
+            context.update(context_processor(context["request"]))
+        return DeferredTemplateResponse(
+            self.get_template(name), context, status_code=status_code, headers=headers,
+            media_type=media_type, background=background,
+        )
+
+
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+templates = Templates(env=Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    extensions=[FragmentCacheExtension],
+))
+templates.env.filters["thumb"] = thumbnail_url
+templates.env.globals["asset_url"] = asset_url
+templates.env.globals["prefetch_fragments"] = prefetch_fragments
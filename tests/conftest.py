@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+# A throwaway SQLite database seeded by seed_bench_data, set before the app
+# modules are imported (database.py reads DATABASE_URL at import time)
+_database_dir = tempfile.mkdtemp(prefix="arc-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["CACHE_BACKEND_URL"] = "memory://"
+
+import pytest
+from starlette.testclient import TestClient
+from bench_load import bench_users
+from cache import read_cache
+from cache_backend import get_cache_backend
+from main import app
+from seed_bench_data import BENCH_PASSWORD, seed
+from templating import fragment_cache
+
+TEST_SCALE = 0.002  # 400 students, 40 professors, 100 projects, 4000 applications
+
+
+@pytest.fixture(scope="session")
+def users():
+    seed(TEST_SCALE, seed_value=7)
+    return bench_users()
+
+
+def _login(users, role):
+    client = TestClient(app)
+    response = client.post("/login", data={
+        "email": users[role].email, "password": BENCH_PASSWORD, "role": role,
+    }, follow_redirects=False)
+    assert response.status_code == 302, response.text
+    return client
+
+
+@pytest.fixture(scope="session")
+def student_client(users):
+    return _login(users, "student")
+
+
+@pytest.fixture(scope="session")
+def professor_client(users):
+    return _login(users, "professor")
+
+
+def _empty_caches():
+    for namespace in read_cache.policies:
+        read_cache.clear(namespace)
+    read_cache._versions_checked_at = float("-inf")
+    get_cache_backend()._data.clear()
+    fragment_cache.clear()
+
+
+@pytest.fixture
+def cold_caches():
+    # Call to empty every result cache, so the next request does all of its
+    # own reads (the search and recommendation indexes stay loaded)
+    return _empty_caches
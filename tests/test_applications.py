@@ -0,0 +1,62 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _all_pages(client, url):
+    applications, cursor = [], None
+    while True:
+        page = client.get(url + (f"&cursor={cursor}" if cursor else "")).json()
+        applications += page["applications"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return applications
+
+
+def test_match_sort_pages_through_every_application(professor_client):
+    newest = _all_pages(professor_client, "/api/professor/applications?sort=newest")
+    by_match = _all_pages(professor_client, "/api/professor/applications?sort=match")
+    assert sorted(app["id"] for app in by_match) == sorted(app["id"] for app in newest)
+    assert len({app["id"] for app in by_match}) == len(by_match)
+    assert [app["match"] for app in by_match] == sorted((app["match"] for app in by_match), reverse=True)
+
+
+def test_match_sort_is_reachable_from_the_page(professor_client):
+    page = professor_client.get("/professor/applications?sort=match")
+    assert '<option value="match" selected' in page.text
+
+
+def test_unknown_sort_is_rejected(professor_client):
+    assert professor_client.get("/api/professor/applications?sort=salary").status_code == 400
+
+
+def test_application_apis_reject_the_other_role(student_client, professor_client):
+    assert student_client.get("/api/professor/applications").status_code == 403
+    assert professor_client.get("/api/student/applications").status_code == 403
+
+
+def test_bulk_status_update_rejects_students(users, student_client):
+    response = student_client.post("/api/professor/applications/status", json={
+        "application_ids": [users["application_id"]], "status": "accepted",
+    })
+    assert response.status_code == 403
+
+
+def test_export_rejects_students(student_client):
+    assert student_client.get("/professor/applications/export?format=csv").status_code == 403
+
+
+def test_concurrent_double_apply_shows_already_applied(users, student_client, monkeypatch):
+    # The other request inserted the application after this one's check
+    project_id = users["open_project_ids"][0]
+    assert student_client.post("/student/apply-project", data={"project_id": project_id},
+                               follow_redirects=False).status_code in (303, 200)
+    real_scalar = AsyncSession.scalar
+
+    async def scalar(self, statement, *args, **kwargs):
+        if "application.id" in str(statement).lower():
+            return None
+        return await real_scalar(self, statement, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "scalar", scalar)
+    response = student_client.post("/student/apply-project", data={"project_id": project_id}, follow_redirects=False)
+    assert response.status_code == 200
+    assert "already applied" in response.text
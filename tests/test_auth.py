@@ -0,0 +1,40 @@
+from starlette.testclient import TestClient
+from auth import ACCESS_COOKIE
+from database import SessionLocal
+from main import app
+from model import Student
+from seed_bench_data import BENCH_PASSWORD
+
+
+def _login(email):
+    client = TestClient(app)
+    response = client.post("/login", data={"email": email, "password": BENCH_PASSWORD, "role": "student"},
+                           follow_redirects=False)
+    assert response.status_code == 302, response.text
+    return client
+
+
+def test_logout_all_ends_other_sessions(users):
+    db = SessionLocal()
+    try:
+        # Not the fixtures' student, whose sessions the other tests use
+        email = db.query(Student.email).filter(Student.id != users["student"].id).order_by(Student.id).first()[0]
+    finally:
+        db.close()
+    laptop, phone = _login(email), _login(email)
+    phone.cookies.delete(ACCESS_COOKIE)
+    assert phone.get("/dashboard/student").status_code == 200  # refreshed
+    assert laptop.get("/logout/all", follow_redirects=False).status_code == 302
+    # Once its access token has expired, the other device cannot refresh it
+    phone.cookies.delete(ACCESS_COOKIE)
+    assert phone.get("/dashboard/student", follow_redirects=False).status_code in (302, 401)
+    assert _login(email).get("/dashboard/student").status_code == 200
+
+
+def test_logout_revokes_the_token_in_this_worker(student_client, users):
+    client = _login(users["student"].email)
+    token = client.cookies[ACCESS_COOKIE]
+    assert client.get("/dashboard/student").status_code == 200  # now known not to be revoked
+    client.get("/logout", follow_redirects=False)
+    client.cookies.set(ACCESS_COOKIE, token)
+    assert client.get("/dashboard/student", follow_redirects=False).status_code in (302, 401)
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from sqlalchemy import select
+from database import SessionLocal, engine
+from model import CacheVersion, Project
+from cache import invalidate
+from cache_backend import MemoryBackend, RedisBackend, run_with_backend
+from test_query_plans import captured_sql
+
+
+def test_missing_project_is_not_cached(users, student_client):
+    db = SessionLocal()
+    try:
+        project_id = db.execute(select(Project.id).order_by(Project.id.desc())).scalar() + 1
+        assert "not found" in student_client.get(f"/api/student/project/{project_id}").text
+        db.add(Project(id=project_id, professor_id=users["professor"].id, title="Created after a 404",
+                       status="active", applications_open=True))
+        db.commit()
+    finally:
+        db.close()
+    assert student_client.get(f"/api/student/project/{project_id}").json()["title"] == "Created after a 404"
+
+
+def test_not_modified_reads_no_text_columns(users, professor_client, cold_caches):
+    url = f"/api/professor/project/{users['project_id']}"
+    etag = professor_client.get(url).headers["ETag"]
+    cold_caches()
+    with captured_sql() as statements:
+        response = professor_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not [statement for statement, _ in statements if "introduction" in statement]
+
+
+def test_invalidate_survives_a_concurrent_first_insert(users):
+    # Another worker inserts the namespace's row between our UPDATE (which
+    # found nothing) and our INSERT
+    version = select(CacheVersion.version).where(CacheVersion.name == "professors")
+    with engine.connect() as connection:
+        before = connection.execute(version).scalar()
+    db = SessionLocal()
+    real_execute = db.execute
+    calls = []
+
+    def execute(statement, *args, **kwargs):
+        calls.append(statement)
+        if len(calls) == 1:
+            return type("Result", (), {"rowcount": 0})()
+        return real_execute(statement, *args, **kwargs)
+
+    db.execute = execute
+    try:
+        invalidate(db, "professors")
+        db.commit()
+        assert real_execute(version).scalar() == before + 1
+    finally:
+        db.close()
+
+
+def test_generations_survive_eviction():
+    backend = MemoryBackend(max_entries=2)
+    assert backend.get_or_compute("x", "a", 60, lambda: "old") == "old"
+    backend.invalidate("x")
+    backend.set_many({f"filler:{n}": n for n in range(10)}, 60)
+    assert backend.get_or_compute("x", "a", 60, lambda: "new") == "new"
+
+
+def test_lost_generation_does_not_revive_old_entries():
+    backend = MemoryBackend()
+    assert backend.get_or_compute("x", "a", 60, lambda: "old") == "old"
+    backend.invalidate("x")
+    backend._generations.clear()  # e.g. FLUSHDB, or an allkeys-* policy on Redis
+    assert backend.peek_many("x", ["a"]) == {}
+    assert backend.get_or_compute("x", "a", 60, lambda: "new") == "new"
+
+
+def test_savepoint_rollback_keeps_queued_invalidations(users):
+    db = SessionLocal()
+    try:
+        invalidate(db, "professors", users["professor"].id)
+        with db.begin_nested() as savepoint:
+            savepoint.rollback()
+        assert db.info["cache_invalidate"] == {"professors": {users["professor"].id}}
+        db.rollback()
+        assert "cache_invalidate" not in db.info
+    finally:
+        db.close()
+
+
+def test_redis_round_trips_leave_the_event_loop_thread():
+    threads = []
+
+    class Client:
+        def mget(self, keys):
+            threads.append(threading.current_thread())
+            return [None] * len(keys)
+
+    backend = RedisBackend("redis://localhost:6379/0")
+    backend._client = Client()
+    backend.get("x")  # scripts: no event loop, called directly
+    asyncio.run(run_with_backend(backend.get, "x"))
+    assert threads[0] is threading.main_thread()
+    assert threads[1] is not threading.main_thread()
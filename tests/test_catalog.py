@@ -0,0 +1,27 @@
+import catalog
+from catalog import browse_catalog
+from database import SessionLocal
+
+
+def test_filters_apply_before_the_search_candidate_limit(users, monkeypatch):
+    db = SessionLocal()
+    try:
+        with_skill, _, truncated = browse_catalog(db, search="learning", skill="python")
+        assert with_skill and not truncated
+        # Fewer candidates than the unfiltered query matches, but enough for
+        # every match that has the skill
+        monkeypatch.setattr(catalog, "CATALOG_SEARCH_CANDIDATES", len(with_skill) + 1)
+        rows, _, truncated = browse_catalog(db, search="learning", skill="python")
+        assert [row.id for row in rows] == [row.id for row in with_skill] and not truncated
+        rows, _, truncated = browse_catalog(db, search="learning")
+        assert len(rows) == len(with_skill) + 1 and truncated
+    finally:
+        db.close()
+
+
+def test_truncated_search_is_shown(student_client, cold_caches, monkeypatch):
+    # "learning" matches more open projects than this, but only 3 with Python
+    monkeypatch.setattr(catalog, "CATALOG_SEARCH_CANDIDATES", 4)
+    cold_caches()
+    assert "Only the best matches" in student_client.get("/student/browse-projects?q=learning").text
+    assert "Only the best matches" not in student_client.get("/student/browse-projects?q=learning&skill=python").text
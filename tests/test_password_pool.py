@@ -0,0 +1,27 @@
+import asyncio
+import threading
+from time import perf_counter
+import pytest
+import password_pool
+from password_pool import PasswordPoolBusy
+
+
+def test_waiters_beyond_the_cap_are_turned_away(monkeypatch):
+    monkeypatch.setattr(password_pool, "_slots", None)
+    monkeypatch.setattr(password_pool, "PASSWORD_QUEUE_LIMIT", 1)
+    monkeypatch.setattr(password_pool, "PASSWORD_MAX_WAITERS", 1)
+    release = threading.Event()
+
+    async def storm():
+        running = asyncio.ensure_future(password_pool._run(release.wait, 5))
+        await asyncio.sleep(0.05)  # takes the only slot
+        waiting = asyncio.ensure_future(password_pool._run(lambda: "hashed"))
+        await asyncio.sleep(0.05)  # waits for it
+        start = perf_counter()
+        with pytest.raises(PasswordPoolBusy):
+            await password_pool._run(lambda: "hashed")
+        assert perf_counter() - start < 0.5
+        release.set()
+        assert await running and await waiting == "hashed"
+
+    asyncio.run(storm())
@@ -0,0 +1,87 @@
+from sqlalchemy import insert, update
+from cache_backend import get_cache_backend
+from database import SessionLocal, engine
+from model import Project
+from project_index import GENERATION_KEY, ProjectIndexSync
+from recommend import recommend_projects
+
+
+def _new_project(users, title):
+    return Project(professor_id=users["professor"].id, title=title, status="active", applications_open=True)
+
+
+def test_commit_during_first_load_is_kept(users):
+    applied = {}
+    sync = ProjectIndexSync(lambda project_id, fields: applied.__setitem__(project_id, fields))
+    db = SessionLocal()
+    other = SessionLocal()
+    try:
+        # The project is committed after the load has read its rows but
+        # before it applies them
+        real_query = db.query
+
+        def query(*args, **kwargs):
+            rows = list(real_query(*args, **kwargs))
+            other.add(_new_project(users, "Committed during the load"))
+            other.commit()
+            return type("Rows", (), {"yield_per": lambda self, size: rows})()
+
+        db.query = query
+        sync.ensure_current(db)
+        assert sync.loaded
+        assert any(fields and fields["title"] == "Committed during the load" for fields in applied.values())
+    finally:
+        db.close()
+        other.close()
+
+
+def test_other_workers_commits_are_read(users):
+    applied = {}
+    sync = ProjectIndexSync(lambda project_id, fields: applied.__setitem__(project_id, fields))
+    db = SessionLocal()
+    try:
+        sync.ensure_current(db)
+        # Another worker: no ORM hooks here, only the shared generation
+        with engine.begin() as connection:
+            project_id = connection.execute(insert(Project).values(
+                professor_id=users["professor"].id, title="From another worker", status="active",
+            )).inserted_primary_key[0]
+        get_cache_backend().incr(GENERATION_KEY)
+        sync._checked_at = float("-inf")
+        sync.ensure_current(db)
+        assert applied[project_id]["title"] == "From another worker"
+    finally:
+        db.close()
+
+
+def test_savepoint_rollback_keeps_pending_changes(users):
+    db = SessionLocal()
+    try:
+        project = _new_project(users, "Saved before a savepoint rollback")
+        db.add(project)
+        db.flush()
+        with db.begin_nested() as savepoint:
+            savepoint.rollback()
+        assert project.id in db.info["project_index_pending"]
+        db.rollback()
+        assert "project_index_pending" not in db.info
+    finally:
+        db.close()
+
+
+def test_recommendations_recheck_closed_projects(users):
+    db = SessionLocal()
+    try:
+        recommended = [row.id for row in recommend_projects(db, users["student"].id)]
+        assert recommended
+        # Another worker closes the top project; this worker's index still has it
+        statement = update(Project).where(Project.id == recommended[0])
+        with engine.begin() as connection:
+            connection.execute(statement.values(applications_open=False))
+        try:
+            assert recommended[0] not in [row.id for row in recommend_projects(db, users["student"].id)]
+        finally:
+            with engine.begin() as connection:
+                connection.execute(statement.values(applications_open=True))
+    finally:
+        db.close()
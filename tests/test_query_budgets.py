@@ -0,0 +1,53 @@
+import pytest
+from database import SessionLocal
+from model import Application
+from query_audit import QueryBudgetExceeded, query_budget
+
+# SQL statement budgets for the busiest pages, measured with empty caches (the
+# worst case for one request). Lower a budget when a page gets cheaper; raise
+# one only together with the change that needs it.
+
+
+@pytest.mark.parametrize("url, budget", [
+    ("/dashboard/student", 6),
+    ("/student/browse-projects", 3),
+    ("/student/browse-projects?skill=python", 3),
+    ("/student/my-applications", 1),
+])
+def test_student_page_budget(student_client, cold_caches, url, budget):
+    student_client.get(url)  # loads the in-process search/recommendation indexes
+    cold_caches()
+    with query_budget(budget):
+        response = student_client.get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("url, budget", [
+    ("/dashboard/professor", 5),
+    ("/professor/applications", 6),
+    ("/professor/applications?sort=match", 7),
+])
+def test_professor_page_budget(professor_client, cold_caches, url, budget):
+    professor_client.get(url)
+    cold_caches()
+    with query_budget(budget):
+        response = professor_client.get(url)
+    assert response.status_code == 200
+
+
+def test_budget_exceeded(student_client, cold_caches):
+    cold_caches()
+    with pytest.raises(QueryBudgetExceeded, match="budget is 5"):
+        with query_budget(5):
+            student_client.get("/dashboard/student")
+
+
+def test_budget_catches_n_plus_one(users):
+    db = SessionLocal()
+    try:
+        with pytest.raises(QueryBudgetExceeded, match="Application.project lazy-loaded 5 times"):
+            with query_budget(100):
+                for application in db.query(Application).limit(5):
+                    application.project
+    finally:
+        db.close()
@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+import pytest
+from database import engine, statement_listeners
+
+# Runs EXPLAIN QUERY PLAN on every SQL statement the routes actually issue
+# (captured through database.statement_listeners, with their parameters) and
+# fails when a plan reads a whole table. Caches are emptied before each
+# request so the loaders run too.
+
+# Tables that may be read in full, with the reason
+ALLOWED_SCANS = {
+    "professor": "professor list for the browse filter dropdowns, cached in the 'professors' namespace",
+    "cache_version": "one row per cache namespace, read once a second by cache.ReadThroughCache",
+}
+
+
+@contextmanager
+def captured_sql():
+    statements = []
+    listener = lambda statement, parameters, seconds: statements.append((statement, parameters))
+    statement_listeners.append(listener)
+    try:
+        yield statements
+    finally:
+        statement_listeners.remove(listener)
+
+
+def full_scans(statement, parameters):
+    # Tables the SQLite plan reads without an index. A LIKE with a leading
+    # wildcard counts too: no index can serve it, and SQLite may still report
+    # an index search on some other, unselective condition of the query.
+    if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+        return []
+    if parameters and isinstance(parameters, list):
+        parameters = parameters[0]  # executemany: one set is enough for the plan
+    scanned = []
+    if " LIKE " in statement.upper() and any(
+        isinstance(value, str) and value.startswith("%") for value in parameters or ()
+    ):
+        scanned.append("<LIKE '%...'>")
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters or ()).fetchall()
+    for row in plan:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail and detail != "SCAN CONSTANT ROW":
+            scanned.append(detail.split()[1])
+    return scanned
+
+
+def requests(users):
+    project_id = users["project_id"]
+    application_id = users["application_id"]
+    student = users["student"]
+    professor = users["professor"]
+    return {
+        "student dashboard": ("student", "GET", "/dashboard/student", None),
+        "student profile": ("student", "GET", "/profile/student", None),
+        "browse": ("student", "GET", "/student/browse-projects", None),
+        "browse next page": ("student", "GET", f"/student/browse-projects?cursor={project_id}", None),
+        "browse by skill": ("student", "GET", "/student/browse-projects?skill=python", None),
+        "browse by text": ("student", "GET", "/student/browse-projects?q=learning", None),
+        "browse by text and skill": ("student", "GET", "/student/browse-projects?q=learning&skill=python", None),
+        "browse by professor name": ("student", "GET", f"/student/browse-projects?q={professor.name.split()[-1]}", None),
+        "browse by professor": ("student", "GET", f"/student/browse-projects?professor={professor.id}", None),
+        "browse by department": ("student", "GET", "/student/browse-projects?department=Physics", None),
+        "my applications": ("student", "GET", "/student/my-applications?status=pending", None),
+        "my applications page 2": ("student", "GET", "/api/student/applications?cursor=20260101000000000000-1000", None),
+        "student project detail": ("student", "GET", f"/api/student/project/{project_id}", None),
+        "search": ("student", "GET", "/api/student/search?q=deep+learning", None),
+        "student stats": ("student", "GET", "/api/student/stats", None),
+        "recent applications": ("student", "GET", "/api/student/recent-applications", None),
+        "apply": ("student", "POST", "/student/apply-project", {"data": {"project_id": users["open_project_ids"][-1]}}),
+        "student profile update": ("student", "POST", "/profile/student/update", {"data": {
+            "name": student.name, "email": student.email, "bio": "Interested in research.", "skills_summary": "Python, SQL",
+        }}),
+        "professor dashboard": ("professor", "GET", "/dashboard/professor", None),
+        "professor profile": ("professor", "GET", "/profile/professor", None),
+        "my projects": ("professor", "GET", "/professor/my-projects", None),
+        "applications inbox": ("professor", "GET", f"/professor/applications?project_id={project_id}&status=pending", None),
+        "applications by match": ("professor", "GET", "/professor/applications?sort=match&status=pending", None),
+        "applications page 2": ("professor", "GET", "/api/professor/applications?cursor=20260101000000000000-1000", None),
+        "professor project detail": ("professor", "GET", f"/api/professor/project/{project_id}", None),
+        "export": ("professor", "GET", f"/professor/applications/export?status=pending", None),
+        "status update": ("professor", "POST", "/professor/application/update-status", {"data": {
+            "application_id": application_id, "status": "shortlisted",
+        }}),
+        "bulk status update": ("professor", "POST", "/api/professor/applications/status", {"json": {
+            "application_ids": [application_id, application_id + 1], "status": "pending",
+        }}),
+        "post project": ("professor", "POST", "/professor/post-project", {"data": {
+            "title": "Plan check project", "introduction": "Query plans.", "required_skills": "Python, Rust",
+            "status": "active", "applications_open": "true",
+        }}),
+        "professor profile update": ("professor", "POST", "/profile/professor/update", {"data": {
+            "name": professor.name, "email": professor.email, "department": professor.department or "",
+        }}),
+    }
+
+
+REQUEST_NAMES = list(requests({
+    "project_id": 0, "application_id": 0, "open_project_ids": [0],
+    "student": type("Stub", (), {"id": 0, "name": "", "email": ""}),
+    "professor": type("Stub", (), {"id": 0, "name": "Dr. Stub", "email": "", "department": ""}),
+}))
+
+
+@pytest.mark.parametrize("name", REQUEST_NAMES)
+def test_query_plans(name, users, student_client, professor_client, cold_caches):
+    role, method, url, kwargs = requests(users)[name]
+    client = student_client if role == "student" else professor_client
+    # The search and recommendation indexes read every project once per
+    # process by design; load them before capturing
+    student_client.get("/dashboard/student")
+    student_client.get("/api/student/search?q=warm")
+    cold_caches()
+    with captured_sql() as statements:
+        response = client.request(method, url, follow_redirects=False, **(kwargs or {}))
+    assert response.status_code < 500, response.text
+    assert statements, "no SQL captured"
+    failures = [
+        f"{', '.join(tables)}: {' '.join(statement.split())}"
+        for statement, parameters in statements
+        if (tables := [table for table in full_scans(statement, parameters) if table not in ALLOWED_SCANS])
+    ]
+    assert not failures, "full table scans:\n" + "\n".join(failures)
+
+
+def test_full_scans_are_detected(users):
+    assert full_scans("SELECT id FROM project WHERE timeline = ?", ("16 weeks",)) == ["project"]
+    assert full_scans("SELECT id FROM project WHERE professor_id = ?", (1,)) == []
+    assert full_scans("SELECT id FROM project WHERE professor_id = ? AND lower(title) LIKE lower(?)", (1, "%ai%")) == [
+        "<LIKE '%...'>"
+    ]
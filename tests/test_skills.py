@@ -0,0 +1,66 @@
+from sqlalchemy import event, insert
+from cache import invalidate
+from database import SessionLocal, engine
+from model import Project, Skill
+from skills import get_or_create_skills
+
+
+def test_skill_inserted_concurrently_is_reused(users):
+    db = SessionLocal()
+
+    def other_request_inserts_first(session, flush_context, instances):
+        with engine.begin() as connection:
+            connection.execute(insert(Skill).values(name="Quantum Knitting", slug="quantum knitting"))
+
+    event.listen(db, "before_flush", other_request_inserts_first, once=True)
+    try:
+        found = get_or_create_skills(db, ["Quantum Knitting", "Zig"])
+        db.commit()
+        assert set(found) == {"quantum knitting", "zig"}
+        assert db.query(Skill).filter(Skill.slug == "quantum knitting").count() == 1
+        assert found["quantum knitting"].id is not None and found["zig"].id is not None
+    finally:
+        db.close()
+
+
+def _others_insert_after_each_read(db, *names):
+    # Another request inserts the next skill right after each of our skill
+    # reads. It is written on this session's connection, since SQLite would
+    # block a second writer while the session holds its own writes.
+    pending = list(names)
+
+    @event.listens_for(db, "do_orm_execute")
+    def read_then_insert(orm_execute_state):
+        if pending and orm_execute_state.is_select:
+            rows = orm_execute_state.invoke_statement().freeze()
+            name = pending.pop(0)
+            orm_execute_state.session.execute(insert(Skill).values(name=name, slug=name.lower()))
+            return rows()
+
+
+def test_second_conflict_is_retried(users):
+    db = SessionLocal()
+    _others_insert_after_each_read(db, "Lattice Brewing", "Tidal Modelling")
+    try:
+        found = get_or_create_skills(db, ["Lattice Brewing", "Tidal Modelling", "Kelp Farming"])
+        db.commit()
+        assert set(found) == {"lattice brewing", "tidal modelling", "kelp farming"}
+        assert all(skill.id is not None for skill in found.values())
+    finally:
+        db.close()
+
+
+def test_conflict_keeps_pending_index_and_cache_work(users):
+    db = SessionLocal()
+    try:
+        project = Project(professor_id=users["professor"].id, title="Saved before a skill conflict", status="active")
+        db.add(project)
+        db.flush()
+        invalidate(db, "professors", users["professor"].id)
+        _others_insert_after_each_read(db, "Origami Robotics")
+        get_or_create_skills(db, ["Origami Robotics"])
+        assert project.id in db.info["project_index_pending"]
+        assert db.info["cache_invalidate"]["professors"] == {users["professor"].id}
+        db.rollback()
+    finally:
+        db.close()
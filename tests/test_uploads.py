@@ -0,0 +1,68 @@
+import io
+import logging
+import pytest
+from PIL import Image
+import uploads
+
+
+@pytest.fixture
+def photo_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "PHOTO_DIR", str(tmp_path))
+    monkeypatch.setattr(uploads, "THUMB_DIR", str(tmp_path / "thumbs"))
+    return tmp_path
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 400), "teal").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _update_photo(client, users, filename, content, **kwargs):
+    student = users["student"]
+    return client.post("/profile/student/update", data={"name": student.name, "email": student.email},
+                       files={"profile_pic": (filename, content)}, follow_redirects=False, **kwargs)
+
+
+def test_oversized_upload_is_refused_before_parsing(student_client, users, photo_dir):
+    response = _update_photo(student_client, users, "big.png", b"0" * (uploads.MAX_UPLOAD_BYTES + 200 * 1024))
+    assert response.status_code == 413
+    assert not list(photo_dir.iterdir())
+
+
+def test_oversized_chunked_upload_is_refused(student_client, photo_dir):
+    boundary = "arcboundary"
+
+    def body():
+        yield f'--{boundary}\r\nContent-Disposition: form-data; name="profile_pic"; filename="big.png"\r\n\r\n'.encode()
+        for _ in range(uploads.MAX_UPLOAD_BYTES // (1024 * 1024) + 2):
+            yield b"0" * (1024 * 1024)
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = student_client.post("/profile/student/update", content=body(), follow_redirects=False,
+                                   headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+
+
+def test_non_image_is_rejected(student_client, users, photo_dir):
+    response = _update_photo(student_client, users, "photo.png", b"not an image at all")
+    assert "not a valid image" in response.text
+    assert not list(photo_dir.iterdir())
+
+
+def test_photo_is_stored_under_its_real_format(student_client, users, photo_dir):
+    assert _update_photo(student_client, users, "photo.gif", _png()).status_code in (200, 302, 303)
+    stored = [path.name for path in photo_dir.iterdir() if path.is_file()]
+    assert len(stored) == 1 and stored[0].endswith(".png")
+    url = uploads.PHOTO_URL_PREFIX + stored[0]
+    assert uploads.thumbnail_url(url).startswith(uploads.PHOTO_URL_PREFIX + "thumbs/")
+
+
+def test_thumbnail_failures_are_logged(photo_dir, caplog):
+    broken = photo_dir / "broken.png"
+    broken.write_bytes(b"\x89PNG\r\n\x1a\n truncated")
+    with caplog.at_level(logging.ERROR, logger="arc.uploads"):
+        uploads.make_thumbnail(str(broken))
+    assert "Could not make a thumbnail" in caplog.text
+    assert not list((photo_dir / "thumbs").iterdir())
+    assert uploads.thumbnail_url(uploads.PHOTO_URL_PREFIX + "broken.png") == uploads.PHOTO_URL_PREFIX + "broken.png"
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+from tempfile import NamedTemporaryFile
+from time import monotonic
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import PlainTextResponse
+
+PHOTO_DIR = "static/profile_photos"
+THUMB_DIR = os.path.join(PHOTO_DIR, "thumbs")
+PHOTO_URL_PREFIX = "/static/profile_photos/"
+
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+# Pillow format -> extension the photo is stored under
+IMAGE_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Room for the other profile form fields next to the photo
+MAX_FORM_OVERHEAD_BYTES = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+# How long a missing thumbnail is remembered before checking the disk again
+THUMB_RECHECK_SECONDS = 60
+
+# Profile photos render at 110px; 256px covers high-DPI screens
+THUMB_SIZE = (256, 256)
+
+
+logger = logging.getLogger("arc.uploads")
+
+
+class UploadRejected(Exception):
+    # The message is shown to the user on the profile page
+    pass
+
+
+class UploadLimitMiddleware:
+    # Caps multipart bodies before Starlette parses them (it spools file
+    # parts to disk as they arrive, so a check in the handler comes too
+    # late): by Content-Length up front, and by counting the body as it
+    # streams for chunked requests. Either way the answer is a 413.
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES + MAX_FORM_OVERHEAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers") or ()) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+        message = f"Upload is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await PlainTextResponse(message, status_code=413)(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            event = await receive()
+            if event["type"] == "http.request":
+                received += len(event.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside form parsing; FastAPI passes HTTPExceptions on
+                    raise HTTPException(status_code=413, detail=message)
+            return event
+
+        await self.app(scope, limited_receive, send)
+
+
+async def save_profile_photo(upload: UploadFile):
+    # Streams the upload to disk in chunks (file I/O in the threadpool), names
+    # it by SHA-256 of the content so identical photos share one file, and
+    # returns (public url, path on disk)
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    if ext == ".jpeg":
+        ext = ".jpg"
+    if ext not in ALLOWED_EXTENSIONS:
+        raise UploadRejected("Profile photo must be a JPG, PNG, GIF or WEBP image.")
+
+    os.makedirs(PHOTO_DIR, exist_ok=True)
+    tmp = await run_in_threadpool(NamedTemporaryFile, dir=PHOTO_DIR, suffix=".part", delete=False)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise UploadRejected(f"Profile photo is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+            digest.update(chunk)
+            await run_in_threadpool(tmp.write, chunk)
+        await run_in_threadpool(tmp.close)
+        # Stored under the extension of what the file really is
+        ext = await run_in_threadpool(_image_extension, tmp.name)
+
+        filename = f"{digest.hexdigest()[:32]}{ext}"
+        path = os.path.join(PHOTO_DIR, filename)
+        if await run_in_threadpool(os.path.exists, path):
+            # Same bytes already stored: reuse that file
+            await run_in_threadpool(os.remove, tmp.name)
+        else:
+            await run_in_threadpool(os.replace, tmp.name, path)
+    except BaseException:
+        tmp.close()
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
+    return PHOTO_URL_PREFIX + filename, path
+
+
+def _image_extension(path: str) -> str:
+    # Checks the structure of the whole file (verify() decodes no pixels);
+    # Pillow's decompression bomb check runs on open
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            image.verify()
+    except Exception as e:
+        raise UploadRejected("Profile photo is not a valid image.") from e
+    if image_format not in IMAGE_FORMATS:
+        raise UploadRejected("Profile photo must be a JPG, PNG, GIF or WEBP image.")
+    return IMAGE_FORMATS[image_format]
+
+
+def thumbnail_path(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(THUMB_DIR, f"{name}.jpg")
+
+
+# Photo name -> True once its thumbnail exists, or the time it was last found
+# missing. Names are content hashes, so a thumbnail never goes stale.
+_thumbnails = {}
+
+
+def make_thumbnail(path: str):
+    # Run as a background task after the response is sent, so failures are
+    # logged here; the page keeps showing the full photo
+    name = os.path.splitext(os.path.basename(path))[0]
+    target = thumbnail_path(path)
+    tmp = target + ".part"
+    try:
+        if not os.path.exists(target):
+            os.makedirs(THUMB_DIR, exist_ok=True)
+            with Image.open(path) as image:
+                image = image.convert("RGB")
+                image.thumbnail(THUMB_SIZE)
+                image.save(tmp, "JPEG", quality=85, optimize=True)
+            os.replace(tmp, target)
+        _thumbnails[name] = True
+    except Exception:
+        logger.exception("Could not make a thumbnail of %s", path)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def thumbnail_url(url: str) -> str:
+    # Jinja filter: the thumbnail for an uploaded photo when it exists,
+    # otherwise the original (or external) URL unchanged. The disk is only
+    # checked for photos this worker did not make a thumbnail of.
+    if not url or not url.startswith(PHOTO_URL_PREFIX):
+        return url
+    name = os.path.splitext(url[len(PHOTO_URL_PREFIX):])[0]
+    known = _thumbnails.get(name)
+    if known is None or (known is not True and monotonic() - known > THUMB_RECHECK_SECONDS):
+        known = True if os.path.exists(os.path.join(THUMB_DIR, f"{name}.jpg")) else monotonic()
+        _thumbnails[name] = known
+    if known is True:
+        return f"{PHOTO_URL_PREFIX}thumbs/{name}.jpg"
+    return url